@@ -0,0 +1,149 @@
+"""
+Compares SQLite's default PRAGMAs with the `database_preferences/pragmas`
+profiles on a synthetic library: bulk insert time with the write profile and FTS
+query latency with the read profile.
+
+Usage: python -m benchmarks.database_pragmas [--galleries N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from library_of_h.database_manager.constants import (FTS5_INSERT_TEMPLATE,
+                                                     MIGRATIONS)
+from library_of_h.preferences import Preferences
+
+_FTS_INSERT = FTS5_INSERT_TEMPLATE.format(condition="gallery_database_id = ?")
+
+
+def _connect(path: str, pragmas: dict) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA foreign_keys = ON")
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+def _insert(connection: sqlite3.Connection, galleries: int, batch_size: int) -> float:
+    for migration in MIGRATIONS:
+        for sql_query in migration:
+            connection.execute(sql_query)
+
+    random.seed(0)
+    connection.execute('INSERT INTO "Sources" VALUES (1, "hitomi")')
+    connection.execute('INSERT INTO "Types" VALUES (1, "manga")')
+    connection.execute('INSERT INTO "Languages" VALUES (1, "english")')
+    connection.execute('INSERT INTO "Characters" VALUES (1, "---")')
+    connection.execute('INSERT INTO "Groups" VALUES (1, "---")')
+    connection.execute('INSERT INTO "Series" VALUES (1, "---")')
+    connection.executemany(
+        'INSERT INTO "Artists" VALUES (?, ?)',
+        ((i, f"artist{i}") for i in range(1, 5001)),
+    )
+    connection.executemany(
+        'INSERT INTO "Tags" VALUES (?, ?)', ((i, f"f:tag{i}") for i in range(1, 501))
+    )
+
+    start = time.perf_counter()
+    for gallery in range(1, galleries + 1):
+        if gallery % batch_size == 1 or batch_size == 1:
+            connection.execute("BEGIN")
+        connection.execute(
+            'INSERT INTO "Galleries" VALUES (?, 1, ?, ?, ?, 1, ?, ?, ?, ?, ?, NULL)',
+            (
+                gallery,
+                gallery,
+                f"title {gallery}",
+                f"jtitle {gallery}",
+                1_600_000_000 + gallery,
+                1_500_000_000 + gallery,
+                random.randrange(1, 200),
+                f"/library/hitomi/{gallery}/",
+                random.randrange(1_000_000, 100_000_000),
+            ),
+        )
+        for table in ("Character", "Group", "Language", "Series"):
+            connection.execute(f'INSERT INTO "{table}_Gallery" VALUES (1, ?)', (gallery,))
+        connection.execute(
+            'INSERT INTO "Artist_Gallery" VALUES (?, ?)',
+            (random.randrange(1, 5001), gallery),
+        )
+        connection.executemany(
+            'INSERT OR IGNORE INTO "Tag_Gallery" VALUES (?, ?)',
+            ((random.randrange(1, 501), gallery) for _ in range(8)),
+        )
+        connection.execute(_FTS_INSERT, (gallery,))
+        if gallery % batch_size == 0 or gallery == galleries:
+            connection.execute("COMMIT")
+    return time.perf_counter() - start
+
+
+def _query(connection: sqlite3.Connection, queries: int) -> list[float]:
+    random.seed(1)
+    latencies = []
+    for _ in range(queries):
+        term = random.choice(
+            (f"tag{random.randrange(1, 501)}", f"artist{random.randrange(1, 5001)}")
+        )
+        start = time.perf_counter()
+        connection.execute(
+            "SELECT * FROM GalleriesFTS5 WHERE GalleriesFTS5 MATCH ? "
+            "ORDER BY rank LIMIT 100",
+            (term,),
+        ).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--galleries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Galleries per transaction, the write thread commits whenever its "
+        "queue runs empty, which is usually after every gallery.",
+    )
+    arguments = parser.parse_args()
+
+    preferences = Preferences.get_instance()
+    profiles = {
+        "sqlite defaults": ({}, {}),
+        "preferences": (
+            preferences["database_preferences", "pragmas", "write"],
+            preferences["database_preferences", "pragmas", "read"],
+        ),
+    }
+
+    print(f"galleries: {arguments.galleries}, batch size: {arguments.batch_size}")
+    for name, (write_pragmas, read_pragmas) in profiles.items():
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "LoH_galleries.db")
+
+            connection = _connect(path, write_pragmas)
+            insert_time = _insert(connection, arguments.galleries, arguments.batch_size)
+            connection.close()
+
+            connection = _connect(path, read_pragmas)
+            latencies = _query(connection, arguments.queries)
+            connection.close()
+
+        latencies.sort()
+        print(
+            f"{name:>16}: insert {insert_time:7.2f} s "
+            f"({arguments.galleries / insert_time:7.0f} galleries/s), "
+            f"FTS query median {statistics.median(latencies) * 1000:6.2f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Runs a headless download session against a local `MockServer`, the whole
+pipeline from the item to the database: files and bytes per second, CPU time per
+file and the queue gaps, the idle time between the end of a file's transfer and
+the first request for the next file.
+
+The request cooldown of the network access managers is set to
+`--request-cooldown`, 0 by default, so that the pipeline is measured rather than
+the cooldown.
+
+Usage: python -m benchmarks.downloader [--service SERVICE] [--type TYPE]
+       [--request-cooldown MILLISECONDS] [--timeout SECONDS] [mock server options]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+from PySide6 import QtCore as qtc
+
+from benchmarks.mock_server import (MockServerProcess, add_config_arguments,
+                                    config_from_arguments)
+from library_of_h.constants import SERVICES
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.downloader.base_classes.network_access_manager import \
+    NetworkAccessManagerBase
+from library_of_h.downloader.main import SERVICE_CLASSES
+from library_of_h.preferences import Preferences
+
+
+def _queue_gaps(requests: list) -> list[float]:
+    # Single session, the image requests do not overlap.
+    images = sorted(
+        (request for request in requests if request.kind == "image"),
+        key=lambda request: request.start,
+    )
+    return [
+        (request.start - previous.end) * 1000
+        for previous, request in zip(images, images[1:])
+        if previous.method == "GET" and previous.status in (200, 206)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--service", choices=SERVICES, default=SERVICES[0])
+    parser.add_argument("--type", default="Tag(s)")
+    parser.add_argument(
+        "--request-cooldown", type=int, default=0, metavar="MILLISECONDS"
+    )
+    parser.add_argument("--timeout", type=int, default=600, metavar="SECONDS")
+    add_config_arguments(parser)
+    arguments = parser.parse_args()
+
+    module_name, class_name = SERVICE_CLASSES[arguments.service]
+    constants = importlib.import_module(module_name.rsplit(".", 1)[0] + ".constants")
+    if arguments.type not in constants.DOWNLOAD_TYPES:
+        parser.error(f"argument --type: invalid choice: {arguments.type!r}")
+    config = config_from_arguments(arguments)
+
+    server = MockServerProcess(config)
+    url = server.start()
+
+    qtc.QThreadPool.globalInstance().setMaxThreadCount(4)
+    app = qtc.QCoreApplication(sys.argv[:1])
+    NetworkAccessManagerBase.set_mock_server_url(url)
+    NetworkAccessManagerBase._REQUEST_COOLDOWN = arguments.request_cooldown
+
+    # Unique items, so that the session journal never resumes an earlier run.
+    if arguments.type == "Gallery ID(s)":
+        first_id = int(time.time())
+        items = ",".join(
+            str(gallery_id)
+            for gallery_id in range(first_id, first_id + config.galleries_per_item)
+        )
+    else:
+        items = f"benchmark-{time.time_ns()}"
+
+    summary = {}
+    with tempfile.TemporaryDirectory() as directory:
+        preferences = Preferences.get_instance()
+        preferences["database_preferences", "location"] = directory
+        for download_type in constants.DOWNLOAD_TYPES:
+            preferences[
+                "download_preferences",
+                "destination_formats",
+                arguments.service,
+                download_type,
+            ] = os.path.join(directory, "{gallery_id}", "")
+        if DatabaseManager.get_instance() is None:
+            raise SystemExit("Failed to open the database.")
+
+        service = getattr(importlib.import_module(module_name), class_name)(None)
+        service.session_ended_signal.connect(summary.update)
+        service.session_ended_signal.connect(app.quit)
+
+        def _timeout() -> None:
+            print(f"Timed out after {arguments.timeout} s, canceling.", file=sys.stderr)
+            service.cancel()
+            qtc.QTimer.singleShot(5000, app.quit)
+
+        qtc.QTimer.singleShot(arguments.timeout * 1000, _timeout)
+        qtc.QTimer.singleShot(
+            0,
+            partial(
+                service.download_requested_signal.emit,
+                items,
+                arguments.type,
+                constants.ORDER_BY[0],
+            ),
+        )
+        # The progress JSON lines are not part of the report.
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            app.exec()
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+
+        DatabaseManager.clean_up()
+        qtc.QThreadPool.globalInstance().waitForDone()
+
+    requests = server.stop()
+    files = summary.get("files downloaded", 0)
+    size = summary.get("total download size", 0)
+    gaps = _queue_gaps(requests)
+    errors = [request for request in requests if request.status not in (200, 206)]
+
+    print(
+        f"service:       {arguments.service}, {arguments.type}, "
+        f"{config.galleries_per_item} galleries x {config.files_per_gallery} files "
+        f"x {config.file_size / 1024:.0f} KiB"
+    )
+    bandwidth = (
+        f"{config.bandwidth / 1024 / 1024:.1f} MiB/s"
+        if config.bandwidth
+        else "unlimited"
+    )
+    print(
+        f"server:        latency {config.latency * 1000:.0f} ms, bandwidth "
+        f"{bandwidth}, error rate {config.error_rate}"
+    )
+    print(f"files:         {files} in {wall_time:.2f} s")
+    print(f"files/s:       {files / wall_time:.1f}")
+    print(f"bytes/s:       {size / wall_time / 1024 / 1024:.2f} MiB/s")
+    if files:
+        print(f"CPU per file:  {cpu_time / files * 1000:.2f} ms")
+    if len(gaps) > 1:
+        quantiles = statistics.quantiles(gaps, n=20, method="inclusive")
+        print(
+            f"queue gaps:    mean {statistics.mean(gaps):.1f} ms, "
+            f"p50 {statistics.median(gaps):.1f} ms, p95 {quantiles[18]:.1f} ms, "
+            f"max {max(gaps):.1f} ms"
+        )
+    print(
+        f"requests:      {len(requests)}, "
+        f"{sum(request.kind == 'image' for request in requests)} for images, "
+        f"{len(errors)} errors or resets"
+    )
+
+
+if __name__ == "__main__":
+    main()
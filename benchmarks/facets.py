@@ -0,0 +1,81 @@
+"""
+Times the facet counts query of `DatabaseManager.get_facets` on a synthetic
+library, for an unfiltered and some filtered queries.
+
+Usage: python -m benchmarks.facets [--galleries N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.database_pragmas import _connect, _insert
+from library_of_h.database_manager.constants import (COMPLETION_DIMENSIONS,
+                                                     FACET_MATCHED_CONDITION,
+                                                     FACET_SELECT_TEMPLATE,
+                                                     FACETS_QUERY_TEMPLATE,
+                                                     WHERE_TEMPLATE)
+from library_of_h.database_manager.query_parser import compile_query
+from library_of_h.explorer.constants import FACETS_LIMIT
+from library_of_h.preferences import Preferences
+
+_USER_QUERIES = ("", "tag=f:tag1", "f:tag1 || f:tag2", "pages>100", "artist=artist1")
+
+
+def _facets_query(user_query: str) -> tuple[str, list]:
+    # Mirrors `DatabaseManager.get_facets`.
+    compiled_query = compile_query(user_query)
+    facets = " UNION ALL ".join(
+        FACET_SELECT_TEMPLATE.format(
+            dimension=dimension,
+            table=table,
+            id=id_,
+            name=name,
+            junction=junction,
+            matched="" if compiled_query is None else FACET_MATCHED_CONDITION,
+            limit=FACETS_LIMIT,
+        )
+        for dimension, (table, id_, name, junction) in COMPLETION_DIMENSIONS.items()
+    )
+    if compiled_query is None:
+        return facets, []
+    return (
+        FACETS_QUERY_TEMPLATE.format(
+            where=WHERE_TEMPLATE.format(conditions=compiled_query.where),
+            facets=facets,
+        ),
+        compiled_query.bind_values(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--galleries", type=int, default=100_000)
+    arguments = parser.parse_args()
+
+    preferences = Preferences.get_instance()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "LoH_galleries.db")
+        connection = _connect(
+            path, preferences["database_preferences", "pragmas", "write"]
+        )
+        _insert(connection, arguments.galleries, 1000)
+        connection.close()
+
+        connection = _connect(
+            path, preferences["database_preferences", "pragmas", "read"]
+        )
+        for user_query in _USER_QUERIES:
+            query, bind_values = _facets_query(user_query)
+            start = time.perf_counter()
+            rows = connection.execute(query, bind_values).fetchall()
+            print(
+                f"{user_query!r:>20}: {(time.perf_counter() - start) * 1000:7.1f} ms, "
+                f"{len(rows)} rows"
+            )
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Feeds synthetic log lines through `LogsHighlighter`.
+
+Usage: python -m benchmarks.logs_highlighter [--lines N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtGui as qtg
+from PySide6 import QtWidgets as qtw
+
+from library_of_h.logs.custom_sub_classes.logs_highlighter import (
+    LogsHighlighter, _tokenize)
+
+_MESSAGES = (
+    "Begin file download: URL=https://aa.hitomi.la/webp/1/23/{n}.webp",
+    "Finished file download: LOCATION=/home/user/Library of H/Hitomi/{n}/{n}.webp",
+    "Begin gallery download: GALLERY ID={n}",
+    "[Size Mismatch] Error downloading file: re-downloading.",
+    '[Unknown] Unable to get remote file size: FILE="/tmp/{n}.webp"',
+    "[Unknown] Received text/html: GALLERY ID={n}, URL=https://ltn.hitomi.la/{n}.js",
+    "Inserting `{n}` into the database.",
+)
+_NAMES = (
+    "DOWNLOADER:DOWNLOADER:HITOMI",
+    "DOWNLOADER:NETWORK:NHENTAI",
+    "DATABASE",
+    "EXPLORER:BROWSER",
+)
+_LEVELS = ("INFO", "INFO", "INFO", "WARNING", "ERROR", "DEBUG")
+
+
+def _make_lines(count: int) -> list[str]:
+    random.seed(0)
+    return [
+        f"<{random.choice(_LEVELS)}><{random.choice(_NAMES)}>"
+        f"<2024-01-01 {i // 3600 % 24:02}:{i // 60 % 60:02}:{i % 60:02}>"
+        + random.choice(_MESSAGES).format(n=random.randrange(1_000_000))
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=100_000)
+    arguments = parser.parse_args()
+
+    app = qtw.QApplication([])
+    text = "\n".join(_make_lines(arguments.lines))
+
+    document = qtg.QTextDocument()
+    document.setPlainText(text)
+    highlighter = LogsHighlighter(document)
+    start = time.perf_counter()
+    highlighter.rehighlight()
+    highlight_time = time.perf_counter() - start
+
+    # The Logs widget keeps 1000 lines, those are highlighted from the cache
+    # when highlighted again.
+    document = qtg.QTextDocument()
+    document.setPlainText("\n".join(text.splitlines()[-1000:]))
+    highlighter = LogsHighlighter(document)
+    start = time.perf_counter()
+    highlighter.rehighlight()
+    cached_time = time.perf_counter() - start
+
+    print(f"lines:                  {arguments.lines}")
+    print(
+        f"highlight:              {highlight_time:.3f} s "
+        f"({arguments.lines / highlight_time:,.0f} lines/s)"
+    )
+    print(f"1000 lines from cache:  {cached_time * 1000:.1f} ms")
+    print(f"tokenize cache:         {_tokenize.cache_info()}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+Local HTTP server standing in for the Hitomi and nhentai APIs and CDNs, to run
+the downloader without reaching hitomi.la or nhentai.net.
+
+It serves synthetic gg.js, galleries/{id}.js and nozomi files, nhentai gallery
+and category pages and API JSON, and images, which support Range requests.
+Responses can be delayed, throttled and replaced by errors. The downloader is
+pointed at it with `NetworkAccessManagerBase.set_mock_server_url`, the original
+host of a request is then the first segment of its path.
+
+Every item has `galleries_per_item` galleries with IDs derived from its name and
+every gallery ID exists, with `files_per_gallery` files of `file_size` bytes.
+
+A 403 or 404 on a Hitomi image makes the downloader refresh gg.js, which
+rewrites gg.py; the served gg.js has the values of the current gg.py.
+
+Usage: python -m benchmarks.mock_server [--port N] [--galleries N] [--files N]
+       [--file-size BYTES] [--latency S] [--bandwidth BYTES] [--error-rate P]
+       [--errors 403,404,500,503,reset]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from library_of_h.downloader.services.hitomi import gg
+
+ERRORS = ("403", "404", "500", "503", "reset")
+_CHUNK_SIZE = 64 * 1024  # Bytes written at a time, bandwidth is throttled by chunk.
+_NHENTAI_PAGE_SIZE = 25  # Galleries per category page, as on nhentai.
+
+
+@dataclass
+class MockServerConfig:
+    galleries_per_item: int = 10
+    files_per_gallery: int = 20
+    file_size: int = 256 * 1024  # Bytes.
+    latency: float = 0.0  # Seconds before each response.
+    bandwidth: int = 0  # Bytes per second of each response, 0 for unlimited.
+    error_rate: float = 0.0  # Probability of a response being replaced by an error.
+    errors: tuple[str, ...] = ("503", "reset")  # Injected errors, see `ERRORS`.
+    seed: int = 0
+
+
+class RequestRecord(NamedTuple):
+    start: float  # `time.monotonic()` when the request was read.
+    end: float  # `time.monotonic()` when the response was sent.
+    method: str
+    host: str
+    path: str
+    # "gg", "gallery", "nozomi", "page", "image", "other" or "not found".
+    kind: str
+    status: int  # 0 if the connection was reset.
+    bytes_sent: int
+
+
+def _item_gallery_ids(item: str, galleries: int) -> list[int]:
+    first_id = (zlib.crc32(item.encode("utf-8")) % 100_000 + 1) * 1000
+    return list(range(first_id, first_id + galleries))
+
+
+def _gg_js() -> bytes:
+    default = gg.m(-1)
+    cases = [g for g in range(1 << 12) if gg.m(g) != default]
+    switched = gg.m(cases[0]) if cases else default
+    return (
+        "gg = {\n"
+        "m: function(g) {\n"
+        f"var o = {default};\n"
+        "switch (g) {\n"
+        + "".join(f"case {g}:\n" for g in cases)
+        + f"o = {switched}; break;\n"
+        "}\n"
+        "return o;\n"
+        "},\n"
+        "s: function(h) { var m = /(..)(.)$/.exec(h); "
+        "return parseInt(m[2]+m[1], 16).toString(10); },\n"
+        f"b: '{gg.b}'\n"
+        "};\n"
+    ).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    server: "MockServer"
+    # Keeps connections alive, like the CDNs.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._respond(head=False)
+
+    def do_HEAD(self) -> None:
+        self._respond(head=True)
+
+    def _reset(self) -> None:
+        # Closing with a zero linger time sends a RST instead of a FIN.
+        self.connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+        )
+        self.connection.close()
+        self.close_connection = True
+
+    def _respond(self, head: bool) -> None:
+        start = time.monotonic()
+        host, _, path = self.path.lstrip("/").partition("/")
+        url = urlsplit("/" + path)
+        path = unquote(url.path)
+        kind, status, body, content_type = self.server.route(
+            host, path, parse_qs(url.query)
+        )
+        error = self.server.draw_error() if kind != "other" else None
+        if self.server.config.latency:
+            time.sleep(self.server.config.latency)
+
+        headers = {"Content-Type": content_type}
+        if error is not None and error != "reset":
+            status, body = int(error), b""
+        elif kind == "image":
+            headers["Accept-Ranges"] = "bytes"
+            if match := re.fullmatch(
+                r"bytes=(\d+)-(\d*)", self.headers.get("Range", "")
+            ):
+                size = len(body)
+                first = int(match[1])
+                last = min(int(match[2] or size - 1), size - 1)
+                if first > last:
+                    status, body = 416, b""
+                    headers["Content-Range"] = f"bytes */{size}"
+                else:
+                    status = 206
+                    headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+                    body = body[first : last + 1]
+
+        bytes_sent = 0
+        try:
+            if error == "reset" and (head or kind != "image"):
+                status = 0
+                self._reset()
+            else:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    if error == "reset":
+                        # Images are cut halfway, which leaves a partial file.
+                        bytes_sent = self._write(memoryview(body)[: len(body) // 2])
+                        status = 0
+                        self._reset()
+                    else:
+                        bytes_sent = self._write(memoryview(body))
+        except OSError:  # The client aborted the request.
+            self.close_connection = True
+        self.server.record(
+            RequestRecord(
+                start,
+                time.monotonic(),
+                self.command,
+                host,
+                path,
+                kind,
+                status,
+                bytes_sent,
+            )
+        )
+
+    def _write(self, body: memoryview) -> int:
+        bandwidth = self.server.config.bandwidth
+        start = time.monotonic()
+        for offset in range(0, len(body), _CHUNK_SIZE):
+            chunk = body[offset : offset + _CHUNK_SIZE]
+            self.wfile.write(chunk)
+            if bandwidth:
+                delay = start + (offset + len(chunk)) / bandwidth - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        return len(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    The server, see the module's docstring. Every response is recorded in
+    `requests`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[MockServerConfig] = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config or MockServerConfig()
+        self.requests: list[RequestRecord] = []
+
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._thread: Optional[threading.Thread] = None
+        self._gg_js = _gg_js()
+        self._image = random.Random(self.config.seed).randbytes(self.config.file_size)
+
+    # <PRIVATE METHODS>
+    def _hitomi_gallery_js(self, gallery_id: int) -> bytes:
+        galleryinfo = {
+            "id": str(gallery_id),
+            "title": f"Mock gallery {gallery_id}",
+            "japanese_title": None,
+            "artists": [{"artist": "mock artist"}],
+            "groups": None,
+            "type": "manga",
+            "language": "english",
+            "parodys": None,
+            "characters": None,
+            "tags": [{"tag": "mock", "female": "1", "male": ""}],
+            "date": "2022-01-01 00:00:00-05",
+            "files": [
+                {
+                    "name": f"{page_n:03}.jpg",
+                    "hash": hashlib.sha256(
+                        f"{gallery_id}/{page_n}".encode()
+                    ).hexdigest(),
+                    "hasavif": 0,
+                    "haswebp": 1,
+                }
+                for page_n in range(1, self.config.files_per_gallery + 1)
+            ],
+        }
+        return f"var galleryinfo = {json.dumps(galleryinfo)}".encode("utf-8")
+
+    def _nhentai_gallery_json(self, gallery_id: int) -> bytes:
+        gallery = {
+            "id": gallery_id,
+            "media_id": str(gallery_id),
+            "title": {"english": f"Mock gallery {gallery_id}", "japanese": None},
+            "tags": [
+                {"type": "artist", "name": "mock artist"},
+                {"type": "category", "name": "manga"},
+                {"type": "language", "name": "english"},
+                {"type": "tag", "name": "mock"},
+            ],
+            "upload_date": 1640995200,
+            "images": {"pages": [{"t": "j"}] * self.config.files_per_gallery},
+        }
+        return json.dumps(gallery).encode("utf-8")
+
+    @staticmethod
+    def _nhentai_thumbnail(gallery_id: int, href: str) -> str:
+        # The first number of the thumbnail's URL is the images' CDN server.
+        return (
+            f'<a href="{href}" class="cover"><noscript>'
+            f'<img src="https://t3.nhentai.net/galleries/{gallery_id}/thumb.jpg">'
+            "</noscript></a>"
+        )
+
+    def _nhentai_category_page(self, item: str, page_n: int) -> bytes:
+        gallery_ids = _item_gallery_ids(item, self.config.galleries_per_item)
+        page = gallery_ids[
+            (page_n - 1) * _NHENTAI_PAGE_SIZE : page_n * _NHENTAI_PAGE_SIZE
+        ]
+        if not page:
+            body = "<h3>No results, sorry.</h3>"
+        else:
+            body = f'<span class="count">{len(gallery_ids):,}</span>' + "".join(
+                self._nhentai_thumbnail(gallery_id, f"/g/{gallery_id}/")
+                for gallery_id in page
+            )
+        return f"<html><body>{body}</body></html>".encode("utf-8")
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def draw_error(self) -> Optional[str]:
+        """
+        Returns
+        --------
+            Optional[str]:
+                The error to reply to a request with, see `ERRORS`, None to reply
+                normally.
+        """
+        with self._lock:
+            if self._random.random() < self.config.error_rate:
+                return self._random.choice(self.config.errors)
+        return None
+
+    def record(self, request: RequestRecord) -> None:
+        with self._lock:
+            self.requests.append(request)
+
+    def route(
+        self, host: str, path: str, query: dict[str, list[str]]
+    ) -> tuple[str, int, bytes, str]:
+        """
+        Returns
+        --------
+            tuple[str, int, bytes, str]:
+                Kind of the request, as in `RequestRecord`, HTTP status, body and
+                content type of the response.
+        """
+        if host == "ltn.hitomi.la":
+            if path == "/gg.js":
+                return "gg", 200, self._gg_js, "application/javascript"
+            if match := re.fullmatch(r"/galleries/(\d+)\.js", path):
+                return (
+                    "gallery",
+                    200,
+                    self._hitomi_gallery_js(int(match[1])),
+                    "application/javascript",
+                )
+            if path.endswith(".nozomi"):
+                gallery_ids = _item_gallery_ids(
+                    path.rsplit("/", 1)[-1].removesuffix(".nozomi"),
+                    self.config.galleries_per_item,
+                )
+                return (
+                    "nozomi",
+                    200,
+                    struct.pack(f">{len(gallery_ids)}i", *gallery_ids),
+                    "application/octet-stream",
+                )
+        elif host.endswith(".hitomi.la") or re.fullmatch(r"i\d*\.nhentai\.net", host):
+            return "image", 200, self._image, "image/webp"
+        elif host in ("nhentai.net", "www.nhentai.net"):
+            if match := re.fullmatch(r"/api/gallery/(\d+)", path):
+                return (
+                    "gallery",
+                    200,
+                    self._nhentai_gallery_json(int(match[1])),
+                    "application/json",
+                )
+            if match := re.fullmatch(r"/g/(\d+)/?", path):
+                gallery_id = int(match[1])
+                return (
+                    "page",
+                    200,
+                    (
+                        "<html><body>"
+                        + self._nhentai_thumbnail(gallery_id, f"/g/{gallery_id}/1/")
+                        + "</body></html>"
+                    ).encode("utf-8"),
+                    "text/html",
+                )
+            if match := re.fullmatch(r"/[a-z]+/([^/]+)(?:/popular[a-z-]*)?/?", path):
+                return (
+                    "page",
+                    200,
+                    self._nhentai_category_page(
+                        match[1], int(query.get("page", ["1"])[0])
+                    ),
+                    "text/html",
+                )
+        else:
+            # Connectivity checks, like the network access managers' retry URL.
+            return "other", 200, b"", "text/plain"
+        return "not found", 404, b"", "text/plain"
+
+    def start(self) -> str:
+        """
+        Serves on a background thread.
+
+        Returns
+        --------
+            str:
+                URL of the server.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def stop(self) -> list[RequestRecord]:
+        """
+        Returns
+        --------
+            list[RequestRecord]:
+                The recorded requests.
+        """
+        self.shutdown()
+        self.server_close()
+        return self.requests
+
+    # </PUBLIC METHODS>
+
+
+def _serve(config: MockServerConfig, connection) -> None:
+    # Runs in the child process of `MockServerProcess`.
+    server = MockServer(config)
+    connection.send(server.start())
+    connection.recv()
+    connection.send(server.stop())
+
+
+class MockServerProcess:
+    """
+    Runs a `MockServer` in a child process, so that the time it spends serving is
+    not counted with the downloader's CPU time. Started before Qt is, the child
+    is forked.
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None) -> None:
+        self._config = config or MockServerConfig()
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self._config, child_connection), daemon=True
+        )
+
+    def start(self) -> str:
+        """
+        Returns
+        --------
+            str:
+                URL of the server.
+        """
+        self._process.start()
+        return self._connection.recv()
+
+    def stop(self) -> list[RequestRecord]:
+        """
+        Returns
+        --------
+            list[RequestRecord]:
+                The recorded requests.
+        """
+        self._connection.send(None)
+        requests = self._connection.recv()
+        self._process.join()
+        return requests
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockServerConfig()
+    parser.add_argument(
+        "--galleries", type=int, default=defaults.galleries_per_item, metavar="N"
+    )
+    parser.add_argument(
+        "--files", type=int, default=defaults.files_per_gallery, metavar="N"
+    )
+    parser.add_argument(
+        "--file-size", type=int, default=defaults.file_size, metavar="BYTES"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=defaults.latency, metavar="SECONDS"
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=int,
+        default=defaults.bandwidth,
+        metavar="BYTES",
+        help="per response, 0 for unlimited",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=defaults.error_rate, metavar="P"
+    )
+    parser.add_argument(
+        "--errors",
+        type=lambda errors: tuple(errors.split(",")),
+        default=defaults.errors,
+        help=f"comma separated, from {','.join(ERRORS)}",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_arguments(arguments: argparse.Namespace) -> MockServerConfig:
+    if unknown := set(arguments.errors) - set(ERRORS):
+        raise SystemExit(f"Unknown errors: {', '.join(sorted(unknown))}")
+    return MockServerConfig(
+        galleries_per_item=arguments.galleries,
+        files_per_gallery=arguments.files,
+        file_size=arguments.file_size,
+        latency=arguments.latency,
+        bandwidth=arguments.bandwidth,
+        error_rate=arguments.error_rate,
+        errors=arguments.errors,
+        seed=arguments.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    add_config_arguments(parser)
+    arguments = parser.parse_args()
+
+    server = MockServer(config_from_arguments(arguments), arguments.port)
+    print(f"Serving on http://127.0.0.1:{server.server_port}, Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    print(f"requests: {len(server.requests)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Times `PrefixIndex.complete` on synthetic tag names, one lookup per keystroke
+of typing random tags.
+
+Usage: python -m benchmarks.prefix_index [--names N] [--lookups N]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from library_of_h.database_manager.constants import COMPLETION_SCAN_LIMIT
+from library_of_h.database_manager.prefix_index import PrefixIndex
+from library_of_h.explorer.constants import COMPLETION_LIMIT
+
+
+def _make_names(count: int) -> list[str]:
+    random.seed(0)
+    names = set()
+    while len(names) < count:
+        names.add(
+            random.choice(("female:", "male:", ""))
+            + "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 12)))
+        )
+    return list(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    arguments = parser.parse_args()
+
+    names = _make_names(arguments.names)
+    index = PrefixIndex(COMPLETION_SCAN_LIMIT)
+    start = time.perf_counter()
+    index.load("tag", ((name, random.randrange(1, 5000)) for name in names))
+    print(f"load: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    prefixes = []
+    while len(prefixes) < arguments.lookups:
+        name = random.choice(names)
+        prefixes.extend(name[:i] for i in range(1, len(name) + 1))
+    timings = []
+    for prefix in prefixes[: arguments.lookups]:
+        start = time.perf_counter()
+        index.complete("tag", prefix, COMPLETION_LIMIT)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        f"{len(timings)} lookups: "
+        f"median {timings[len(timings) // 2] * 1000:.3f} ms, "
+        f"p99 {timings[len(timings) * 99 // 100] * 1000:.3f} ms, "
+        f"max {timings[-1] * 1000:.3f} ms"
+    )
+
+    start = time.perf_counter()
+    for name in names[:1000]:
+        index.add("tag", name + "x")
+    print(f"1000 inserts: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
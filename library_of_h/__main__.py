@@ -1,3 +1,7 @@
+import time
+
+started_at = time.perf_counter()
+
 from . import main
 
-main.main()
+main.main(started_at)
@@ -10,8 +10,16 @@ SERVICES = (
 
 APP_STATE_FILE_NAME = "library of H.state"
 APP_LOG_FILE_NAME = "library of H.logs"
+APP_LOG_STORE_FILE_NAME = "library of H.logs.sqlite3"
+DOWNLOAD_JOURNAL_FILE_NAME = "library of H.downloads.sqlite3"
 USER_PREFERENCES_FILE_NAME = "preferences.json"
 
+LOGS_WIDGET_FLUSH_INTERVAL = 250  # Milliseconds between appends to the Logs widget.
+LOG_STORE_MAX_SESSIONS = 20  # Sessions kept in the log store, older ones are deleted.
+LOG_STORE_SEARCH_LIMIT = 500  # Records fetched per search request in the Logs tab.
+# Unfinished download sessions kept in the journal, older ones are deleted.
+DOWNLOAD_JOURNAL_MAX_SESSIONS = 20
+
 
 SYSTEM = platform.system()
 if SYSTEM == "Windows":
@@ -47,6 +55,10 @@ if testing:
 
 APP_STATE_LOCATION = os.path.join(APP_STATE_DIRECTORY, APP_STATE_FILE_NAME)
 APP_LOGS_LOCATION = os.path.join(APP_LOGS_DIRECTORY, APP_LOG_FILE_NAME)
+APP_LOG_STORE_LOCATION = os.path.join(APP_LOGS_DIRECTORY, APP_LOG_STORE_FILE_NAME)
+DOWNLOAD_JOURNAL_LOCATION = os.path.join(
+    APP_STATE_DIRECTORY, DOWNLOAD_JOURNAL_FILE_NAME
+)
 USER_PREFERENCES_LOCATION = os.path.join(
     USER_PREFERENCES_DIRECTORY, USER_PREFERENCES_FILE_NAME
 )
@@ -1,4 +1,159 @@
 FTS5_TABLE_NAME = "GalleriesFTS5"
+# Indexes the `GalleriesView` rows matching {condition}. The rowid is set
+# explicitly, `content_rowid` is not used by inserts, they would be given the next
+# rowid instead of their gallery's once a gallery was deleted.
+FTS5_INSERT_TEMPLATE = f"""
+    INSERT INTO
+        {FTS5_TABLE_NAME} (
+            rowid,
+            "gallery_database_id",
+            "gallery",
+            "artist",
+            "character",
+            "group",
+            "jtitle",
+            "language",
+            "series",
+            "tag",
+            "title",
+            "udate",
+            "ddate",
+            "pages",
+            "size_in_bytes",
+            "source",
+            "type",
+            "location"
+        )
+    SELECT
+        "gallery_database_id",
+        *
+    FROM
+        GalleriesView
+    WHERE
+        {{condition}}
+"""
+
+# PRAGMAs that can be set per connection role in
+# `database_preferences/pragmas/<role>`.
+CONNECTION_PRAGMAS = (
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "synchronous",
+    "temp_store",
+    "wal_autocheckpoint",
+)
+
+MAINTENANCE_CHECK_INTERVAL = 60_000  # Milliseconds between idle maintenance checks.
+MAINTENANCE_IDLE_TIME = 30  # Seconds without writes before maintenance runs.
+FTS5_MERGE_PAGES = 500  # Pages written by each incremental FTS5 merge step.
+ANALYSIS_LIMIT = 1000  # Rows sampled per index by ANALYZE.
+
+# Name columns that are completed in the Explorer's filter and counted as facets
+# by dimension: (table, id column, name column, gallery junction table).
+COMPLETION_DIMENSIONS = {
+    "artist": ("Artists", "artist_id", "artist_name", "Artist_Gallery"),
+    "character": ("Characters", "character_id", "character_name", "Character_Gallery"),
+    "group": ("Groups", "group_id", "group_name", "Group_Gallery"),
+    "series": ("Series", "series_id", "series_name", "Series_Gallery"),
+    "tag": ("Tags", "tag_id", "tag_name", "Tag_Gallery"),
+}
+COMPLETION_SCAN_LIMIT = 2000  # Most names matching a prefix ranked by count.
+COMPLETION_QUERY_TEMPLATE = """
+SELECT
+    "{table}"."{name}", COUNT(DISTINCT "{junction}"."gallery_id")
+FROM
+    "{table}"
+INNER JOIN
+    "{junction}"
+ON
+    ("{junction}"."{id}" = "{table}"."{id}")
+GROUP BY
+    "{table}"."{name}"
+"""
+
+FACETS_CACHE_SIZE = 32  # Facet results of distinct queries kept until a write.
+# Galleries matched by the {where} condition, counted per dimension by the
+# `FACET_SELECT_TEMPLATE`s joined with UNION ALL as {facets}.
+FACETS_QUERY_TEMPLATE = f"""
+WITH
+    "Matched"("gallery_id")
+AS MATERIALIZED (
+    SELECT
+        rowid
+    FROM
+        {FTS5_TABLE_NAME}
+    {{where}}
+)
+{{facets}}
+"""
+# {matched} restricts the counted galleries to "Matched", empty to count all.
+FACET_SELECT_TEMPLATE = """
+SELECT
+    '{dimension}' "dimension", "{table}"."{name}" "name", "count"
+FROM (
+    SELECT
+        "{junction}"."{id}" "id", COUNT(1) "count"
+    FROM
+        "{junction}"
+    {matched}
+    GROUP BY
+        "{junction}"."{id}"
+    ORDER BY
+        "count" DESC
+    LIMIT {limit}
+)
+INNER JOIN
+    "{table}"
+ON
+    ("{table}"."{id}" = "id")
+"""
+FACET_MATCHED_CONDITION = 'WHERE "gallery_id" IN "Matched"'
+
+QUERY_STATS_SIZE = 10_000  # Most recent queries kept by the query statistics.
+SLOW_QUERY_THRESHOLD = 0.1  # Seconds, plans of slower queries are captured.
+
+BULK_INSERT_MAX_ID_QUERY = 'SELECT COALESCE(MAX("gallery_database_id"), 0) FROM "Galleries"'
+# Indexes the galleries inserted after the `BULK_INSERT_MAX_ID_QUERY` result.
+BULK_INSERT_FTS5_QUERY = FTS5_INSERT_TEMPLATE.format(
+    condition='"gallery_database_id" > ?'
+)
+# Each gallery of a bulk insert is inserted under a savepoint, rolled back if one
+# of its queries fails so that it is not left half inserted.
+BULK_INSERT_SAVEPOINT_QUERY = 'SAVEPOINT "bulk_insert_gallery"'
+BULK_INSERT_ROLLBACK_QUERY = 'ROLLBACK TO "bulk_insert_gallery"'
+BULK_INSERT_RELEASE_QUERY = 'RELEASE "bulk_insert_gallery"'
+# Bound with (`gallery_id`, `source`).
+INSERT_FTS5_QUERY = FTS5_INSERT_TEMPLATE.format(condition="gallery = ? AND source = ?")
+
+SIZES_CACHE_FILE_NAME = "LoH_sizes_cache.json"  # Next to the database file.
+LOCATIONS_QUERY = 'SELECT "location" FROM "Galleries"'
+SYNC_WITH_DISK_QUERY = """
+    SELECT
+        "gallery_database_id",
+        "location",
+        "size_in_bytes"
+    FROM
+        "Galleries"
+"""
+# Bound with (`gallery_database_id`,), the full-text search row is removed by the
+# "Galleries_BefDel" trigger.
+DELETE_GALLERY_QUERY = 'DELETE FROM "Galleries" WHERE "gallery_database_id" = ?'
+# Bound with (`gallery_database_id`,), (size, `gallery_database_id`) and
+# (`gallery_database_id`,) in order, the FTS5 row is removed before the update so
+# that its old tokens are read back from the view.
+UPDATE_SIZE_QUERIES = (
+    f"DELETE FROM {FTS5_TABLE_NAME} WHERE rowid = ?",
+    """
+    UPDATE
+        "Galleries"
+    SET
+        "size_in_bytes" = ?
+    WHERE
+        "gallery_database_id" = ?
+""",
+    FTS5_INSERT_TEMPLATE.format(condition='"gallery_database_id" = ?'),
+)
 
 SELECT_TEMPLATE = f"""\
 SELECT
@@ -9,16 +164,17 @@ FROM
 {{sort_by}} {{sort_order}}
 {{limit_offset}}
 """
-WHERE_TEMPLATE = f"""
+WHERE_TEMPLATE = """
 WHERE
-{{match}}
-{{conditionals}}
+{conditions}
 """
 
-MATCH_TEMPLATE = f"""
-{FTS5_TABLE_NAME}
-{{query}}
-"""
+MATCH_TEMPLATE = f"{FTS5_TABLE_NAME} MATCH ?"
+# Used instead of `MATCH_TEMPLATE` for matches within OR or negated conditions.
+MATCH_ROWIDS_TEMPLATE = (
+    f"rowid {{operator}} "
+    f"(SELECT rowid FROM {FTS5_TABLE_NAME} WHERE {FTS5_TABLE_NAME} MATCH ?)"
+)
 
 SELECT_MAPPING = {
     "artist": f'"artist"',
@@ -321,7 +477,7 @@ CREATE_QUERIES = [
         )
 """,
     """
-    CREATE TRIGGER
+    CREATE TRIGGER IF NOT EXISTS
         "Galleries_AftDel"
     AFTER
         DELETE
@@ -456,3 +612,98 @@ CREATE_QUERIES = [
         "Tag_Gallery" ("gallery_id")
 """,
 ]
+
+# Schema migrations, `MIGRATIONS[n - 1]` upgrades a database from
+# `PRAGMA user_version` n - 1 to n. Only ever append to this list: each migration
+# runs in its own transaction along with the `user_version` update, so an
+# interrupted upgrade resumes from the last completed migration.
+MIGRATIONS = [
+    # 1: Initial schema, databases created before versioning are adopted as is.
+    CREATE_QUERIES,
+    # 2: "Language_Gallery" was missing the indexes the other link tables have,
+    # making every lookup of a gallery in `GalleriesView` scan it.
+    [
+        """
+    CREATE INDEX IF NOT EXISTS
+        "IX_Languages_language_name"
+    ON
+        "Languages" ("language_name" COLLATE NOCASE)
+""",
+        """
+    CREATE INDEX IF NOT EXISTS
+        "IX_Language_Gallery_language"
+    ON
+        "Language_Gallery" ("language_id")
+""",
+        """
+    CREATE INDEX IF NOT EXISTS
+        "IX_Language_Gallery_gallery"
+    ON
+        "Language_Gallery" ("gallery_id")
+""",
+    ],
+    # 3: "Tags"."tag_name" was not unique, so every download inserted its tags
+    # again and linked the gallery to all the copies. Merges the copies into the
+    # oldest one and makes the names unique.
+    [
+        """
+    UPDATE OR IGNORE
+        "Tag_Gallery"
+    SET
+        "tag_id" = (
+            SELECT
+                MIN("Copies"."tag_id")
+            FROM
+                "Tags" "Copies"
+            INNER JOIN
+                "Tags"
+            ON
+                ("Tags"."tag_name" = "Copies"."tag_name")
+            WHERE
+                "Tags"."tag_id" = "Tag_Gallery"."tag_id"
+        )
+""",
+        """
+    DELETE FROM
+        "Tags"
+    WHERE
+        "tag_id" NOT IN (
+            SELECT
+                MIN("tag_id")
+            FROM
+                "Tags"
+            GROUP BY
+                "tag_name"
+        )
+""",
+        """
+    CREATE UNIQUE INDEX IF NOT EXISTS
+        "UX_Tags_tag_name"
+    ON
+        "Tags" ("tag_name")
+""",
+    ],
+    # 4: "Galleries_AftDel" removed the full-text search row after the gallery,
+    # when its tokens could not be read back from `GalleriesView` anymore, and
+    # looked it up by scanning the whole index. Deleted galleries were left in the
+    # index, the rebuild removes them.
+    [
+        'DROP TRIGGER IF EXISTS "Galleries_AftDel"',
+        f"""
+    CREATE TRIGGER IF NOT EXISTS
+        "Galleries_BefDel"
+    BEFORE
+        DELETE
+    ON
+        "Galleries"
+    BEGIN
+        DELETE
+        FROM
+            {FTS5_TABLE_NAME}
+        WHERE
+            rowid = old.gallery_database_id;
+    END
+""",
+        f"INSERT INTO {FTS5_TABLE_NAME}({FTS5_TABLE_NAME}) VALUES('rebuild')",
+    ],
+]
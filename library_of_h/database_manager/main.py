@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import queue
@@ -10,26 +11,51 @@ from typing import (Callable, Generator, Iterator, Literal, Optional, Sequence,
                     Union)
 from weakref import proxy
 
-import more_itertools
 import sqlparse
 from PySide6 import QtCore as qtc
 from PySide6 import QtSql
 from PySide6 import QtWidgets as qtw
 
 from library_of_h.custom_widgets.progress_dialog import ProgressDialog
-from library_of_h.database_manager.constants import (CREATE_QUERIES,
-                                                     MATCH_TEMPLATE,
-                                                     NUMERICAL_FILTER_OPTIONS,
+from library_of_h.database_manager.constants import (ANALYSIS_LIMIT,
+                                                     BULK_INSERT_FTS5_QUERY,
+                                                     BULK_INSERT_MAX_ID_QUERY,
+                                                     BULK_INSERT_RELEASE_QUERY,
+                                                     BULK_INSERT_ROLLBACK_QUERY,
+                                                     BULK_INSERT_SAVEPOINT_QUERY,
+                                                     COMPLETION_DIMENSIONS,
+                                                     COMPLETION_QUERY_TEMPLATE,
+                                                     COMPLETION_SCAN_LIMIT,
+                                                     CONNECTION_PRAGMAS,
+                                                     DELETE_GALLERY_QUERY,
+                                                     FACET_MATCHED_CONDITION,
+                                                     FACET_SELECT_TEMPLATE,
+                                                     FACETS_CACHE_SIZE,
+                                                     FACETS_QUERY_TEMPLATE,
+                                                     FTS5_MERGE_PAGES,
+                                                     FTS5_TABLE_NAME,
+                                                     INSERT_FTS5_QUERY,
+                                                     LOCATIONS_QUERY,
+                                                     MAINTENANCE_CHECK_INTERVAL,
+                                                     MAINTENANCE_IDLE_TIME,
+                                                     MIGRATIONS,
                                                      ORDER_BY_MAPPING,
+                                                     QUERY_STATS_SIZE,
                                                      SELECT_MAPPING,
                                                      SELECT_TEMPLATE,
-                                                     SEX_MAPPING,
-                                                     TEXT_FILTER_OPTIONS,
-                                                     VALID_KEYS,
+                                                     SIZES_CACHE_FILE_NAME,
+                                                     SLOW_QUERY_THRESHOLD,
+                                                     SYNC_WITH_DISK_QUERY,
+                                                     UPDATE_SIZE_QUERIES,
                                                      WHERE_TEMPLATE)
+from library_of_h.database_manager.prefix_index import PrefixIndex
+from library_of_h.database_manager.query_handle import QueryHandle
+from library_of_h.database_manager.query_parser import compile_query
+from library_of_h.database_manager.query_stats import (InstrumentedQueue,
+                                                       QueryStats)
+from library_of_h.database_manager.size_scanner import (SizeScanner,
+                                                        directory_size)
 from library_of_h.logger import MainType, get_logger
-from library_of_h.miscellaneous.functions import (Bytes_from_value_and_unit,
-                                                  relative_time_to_timestamp)
 from library_of_h.preferences import Preferences
 
 
@@ -42,6 +68,11 @@ class DatabaseManager(qtc.QObject):
     _update_progress_dialog_signal = qtc.Signal()
     _write_thread_closed_signal = qtc.Signal()
     _read_operation_finished_signal = qtc.Signal(object, list)
+    # Emitted with a callback to call on the main thread once a job finished.
+    _job_finished_signal = qtc.Signal(object)
+    _maintenance_progress_signal = qtc.Signal(str)
+    # Emitted with whether the maintenance ran to completion.
+    maintenance_finished_signal = qtc.Signal(bool)
 
     def __init__(self) -> None:
         raise RuntimeError("Use the classmethod 'get_instance' to get an instance.")
@@ -57,11 +88,7 @@ class DatabaseManager(qtc.QObject):
                     + QtSql.QSqlDatabase.database(connection).lastError().text()
                 )
                 yield None
-            if not db.exec("PRAGMA foreign_keys = ON;"):
-                self._logger.error(
-                    f"[Context Manager] Error setting PRAGMA foreign_keys: "
-                    + QtSql.QSqlDatabase.database(connection).lastError().text()
-                )
+            if not self._set_connection_pragmas(db, "read"):
                 yield None
             else:
                 yield db
@@ -81,11 +108,7 @@ class DatabaseManager(qtc.QObject):
                     or "UNKNOWN"
                 )
                 yield None
-            if not db.exec("PRAGMA foreign_keys = ON;"):
-                self._logger.error(
-                    f"[Context Manager] Error setting PRAGMA foreign_keys: "
-                    + db.lastError().text()
-                )
+            if not self._set_connection_pragmas(db, "write"):
                 yield None
             else:
                 yield db
@@ -147,6 +170,59 @@ class DatabaseManager(qtc.QObject):
     # </CLASS METHODS>
 
     # <PRIVATE METHODS>
+    def _bulk_insert(
+        self,
+        galleries: list[tuple["GalleryMetadataBase", int, int]],
+        inserted_callback: Optional[Callable],
+        db: QtSql.QSqlDatabase,
+    ) -> None:
+        """
+        Write job inserting `galleries` in a single transaction, preparing each
+        distinct query once, and then their full-text search rows at once.
+        Galleries whose "Galleries" row already exists are skipped.
+        """
+        prepared_queries: dict[str, QtSql.QSqlQuery] = {}
+        inserted = 0
+        try:
+            with self._write_transaction_context_manager(db) as res:
+                if res is False:
+                    return
+
+                query = QtSql.QSqlQuery(db)
+                if not query.exec(BULK_INSERT_MAX_ID_QUERY) or not query.next():
+                    self._logger.error(
+                        f"[{query.lastError().text()}] "
+                        f"Error reading from database: "
+                        f'QUERY="{query.lastQuery()}"'
+                    )
+                    return
+                max_gallery_database_id = query.value(0)
+                query.finish()
+
+                for gallery_metadata, size_in_bytes, download_date in galleries:
+                    if self._insert_gallery(
+                        db,
+                        prepared_queries,
+                        gallery_metadata,
+                        size_in_bytes,
+                        download_date,
+                    ):
+                        inserted += 1
+                        self._add_to_prefix_index(gallery_metadata)
+
+                query = QtSql.QSqlQuery(db)
+                query.prepare(BULK_INSERT_FTS5_QUERY)
+                query.addBindValue(max_gallery_database_id)
+                self._write(query)
+
+            self._last_write_time = time.monotonic()
+            self._writes_since_maintenance += inserted
+            self._write_generation += 1
+        finally:
+            # Also on failure, the importers wait for every batch they queued.
+            if inserted_callback is not None:
+                self._job_finished_signal.emit(partial(inserted_callback, inserted))
+
     def _call_callback(
         self, callback: Callable, results: list[QtSql.QSqlRecord] = None
     ):
@@ -164,7 +240,7 @@ class DatabaseManager(qtc.QObject):
         parent: qtw.QWidget = None,
         f: qtc.Qt.WindowType = qtc.Qt.WindowType.Dialog,
     ):
-        if hasattr(self, "_progress_dialog"):
+        if hasattr(self, "_progress_dialog") or not self._has_gui():
             return
 
         self._progress_dialog = ProgressDialog(
@@ -173,43 +249,161 @@ class DatabaseManager(qtc.QObject):
         self._progress_dialog.setWindowTitle("Database progress")
         self._progress_dialog.open()
 
-    def _create_tables_if_not_exist(self) -> bool:
+    def _exec_prepared(
+        self,
+        db: QtSql.QSqlDatabase,
+        prepared_queries: dict[str, QtSql.QSqlQuery],
+        query_str: str,
+        bind_values: Sequence,
+    ) -> Optional[QtSql.QSqlQuery]:
+        """
+        Executes `query_str` with `bind_values`, preparing it on `db` the first
+        time and keeping it in `prepared_queries` for write jobs that run the same
+        queries many times.
+
+        Returns
+        --------
+            Optional[QtSql.QSqlQuery]:
+                The executed query, None if it failed.
+        """
+        if (query := prepared_queries.get(query_str)) is None:
+            query = QtSql.QSqlQuery(db)
+            query.prepare(query_str)
+            prepared_queries[query_str] = query
+        for i, bind_value in enumerate(bind_values):
+            query.bindValue(i, bind_value)
+        if not query.exec():
+            self._logger.error(
+                f"[{query.lastError().text()}] "
+                f"Error writing to database: "
+                f'QUERY="{query.lastQuery()}", BIND VALUES={tuple(bind_values)}'
+            )
+            return None
+        return query
+
+    @staticmethod
+    def _has_gui() -> bool:
+        # False when running headless, under a `QCoreApplication`.
+        return isinstance(qtc.QCoreApplication.instance(), qtw.QApplication)
+
+    def _insert_gallery(
+        self,
+        db: QtSql.QSqlDatabase,
+        prepared_queries: dict[str, QtSql.QSqlQuery],
+        gallery_metadata: "GalleryMetadataBase",
+        size_in_bytes: int,
+        download_date: int,
+    ) -> bool:
+        """
+        Inserts a gallery of `_bulk_insert` under a savepoint, which is rolled
+        back if one of its queries fails.
+
+        Returns
+        --------
+            bool:
+                True if the gallery was inserted, False if it failed or was
+                already in the database.
+        """
+        if (
+            self._exec_prepared(db, prepared_queries, BULK_INSERT_SAVEPOINT_QUERY, ())
+            is None
+        ):
+            return False
+
+        gallery_queries, names_queries = self._gallery_insert_queries(
+            gallery_metadata, size_in_bytes, download_date
+        )
+        inserted = True
+        for i, (query_str, bind_values) in enumerate(gallery_queries + names_queries):
+            query = self._exec_prepared(db, prepared_queries, query_str, bind_values)
+            if query is None:
+                self._exec_prepared(
+                    db, prepared_queries, BULK_INSERT_ROLLBACK_QUERY, ()
+                )
+                inserted = False
+                break
+            if i == len(gallery_queries) - 1 and not query.numRowsAffected():
+                # Already in the database, its names are left as they are.
+                inserted = False
+                break
+
+        self._exec_prepared(db, prepared_queries, BULK_INSERT_RELEASE_QUERY, ())
+        return inserted
+
+    def _migrate(self) -> bool:
+        """
+        Brings the schema up to date by running the `MIGRATIONS` newer than the
+        database's `PRAGMA user_version`, usually there are none.
+        """
+
         def _execute() -> bool:
             # Nested function to have `db` and the query be removed due to out
             # of scope: https://doc.qt.io/qt-6/qsqldatabase.html#removeDatabase
-            with self._write_open_context_manager("create") as db:
+            with self._write_open_context_manager("migrate") as db:
                 if db is None:
                     return False
 
-                with self._write_transaction_context_manager(db) as res:
-                    if res is False:
+                query = QtSql.QSqlQuery(db)
+                if not query.exec("PRAGMA user_version") or not query.next():
+                    self._logger.error(
+                        f"[{query.lastError().text()}] "
+                        "Error reading database schema version."
+                    )
+                    return False
+                version = query.value(0)
+                query.finish()
+                if version >= len(MIGRATIONS):
+                    return True
+
+                self._create_progress_dialog(
+                    "Upgrading database...",
+                    None,
+                    0,
+                    sum(len(migration) for migration in MIGRATIONS[version:]),
+                )
+                qtc.QCoreApplication.processEvents()
+
+                for version, migration in enumerate(
+                    MIGRATIONS[version:], start=version + 1
+                ):
+                    if not db.transaction():
+                        self._logger.error(
+                            f"[{db.lastError().text()}] "
+                            "Error starting database transaction for migration."
+                        )
                         return False
 
-                    for sql_query in CREATE_QUERIES:
-                        QtSql.QSqlQuery(sql_query, db)
-                        self._update_progress_dialog_signal.emit()
+                    for sql_query in (*migration, f"PRAGMA user_version = {version}"):
+                        if not query.exec(sql_query):
+                            self._logger.error(
+                                f"[{query.lastError().text()}] "
+                                f"Error migrating database to version {version}: "
+                                f'QUERY="{query.lastQuery()}"'
+                            )
+                            query.finish()
+                            db.rollback()
+                            return False
+                        self._update_progress_dialog_slot()
+                        qtc.QCoreApplication.processEvents()
+
+                    query.finish()
+                    if not db.commit():
+                        self._logger.error(
+                            f"[{db.lastError().text()}] "
+                            f"Error commiting migration to version {version}."
+                        )
+                        return False
+                    self._logger.info(f"Migrated database to version {version}.")
 
-            self._delete_progress_dialog()
             return True
 
-        QtSql.QSqlDatabase.addDatabase("QSQLITE", "create")
-        QtSql.QSqlDatabase.database("create").setDatabaseName(self._database_file_path)
+        QtSql.QSqlDatabase.addDatabase("QSQLITE", "migrate")
+        QtSql.QSqlDatabase.database("migrate").setDatabaseName(self._database_file_path)
 
-        self._create_progress_dialog(
-            "Waiting on database create operations...", None, 0, 0
-        )
-        # A non blocking sleep for 50 milliseconds to have the progress dialog
-        # visualize before running a blocking function.
-        event_loop = qtc.QEventLoop()  # Start a new event loop temporarily.
-        # Quit the event loop after 50 ms.
-        qtc.QTimer.singleShot(50, event_loop.quit)
-        event_loop.exec()
-        # This should run before the single shot timer times out. Resulting in
-        # something being shown in the progress dialog window, as opposed to an
-        # empty frame.
         res = _execute()
+        self._delete_progress_dialog()
 
-        QtSql.QSqlDatabase.removeDatabase("create")
+        QtSql.QSqlDatabase.removeDatabase("migrate")
         return res
 
     def _delete_progress_dialog(self) -> None:
@@ -219,165 +413,6 @@ class DatabaseManager(qtc.QObject):
             self._progress_dialog.deleteLater()
             del self._progress_dialog
 
-    def _get_where(self, user_query: str, bind_values: list) -> tuple[str, str]:
-        """
-        Parses `user_query` string to create a valid SQL query.
-
-        Parameters
-        -----------
-            user_query (str):
-                A custom query that looks like 'key1=value1 value2 key2>value3 ...'
-
-        Returns
-        --------
-        tuple[
-            Iterator[
-                Union[
-                    Operator:
-                        SQL operation from python-sql.
-                    Literal["||"]
-                    Literal["&&"]:
-                        Represent logical operators OR and AND, respectively.
-                ]
-            ]:
-                Stores user input query as SQL queries that include rows in the
-                result, separated by logical operators.
-            list[
-                Operator:
-                    SQL operation from python-sql.
-            ]:
-                Stores user input query as SQL queries that exclude rows from the
-                result.
-        ]
-        """
-        text_match_queries = []
-        numerical_where_queries = []
-        numerical_where_bind_values = []
-        logical_operator = None
-
-        try:
-            # See if the user input a gallery ID.
-            gallery = int(user_query)
-        except ValueError:
-            pass
-        else:
-            bind_values.append(gallery)
-            return '"gallery" = ?'
-
-        for parsed_query in _parse_query(user_query):
-            if parsed_query in ("&&", "||"):
-                logical_operator = "AND" if parsed_query == "&&" else "OR"
-
-            elif isinstance(parsed_query, tuple):
-                (user_key, operator, value) = parsed_query
-                if not value:
-                    raise ValueError(f"No value passed for operation.")
-                value = value.lower()
-
-                if user_key == "" and operator in ("<", ">"):
-                    # For value only queries that use comparision operators since
-                    # they're parsed as keyword queries without the keyword.
-
-                    if value.startswith(("d", "u")):
-                        # Flip the operator because it makes sense that way for
-                        # date filtering.
-                        operator = ">" if operator == "<" else "<"
-                        prefix = value[0]
-                        value = _parse_date_time_format(value[1:])
-                        user_key = "ddate" if prefix == "d" else "udate"
-                    elif value.startswith("p"):
-                        value = int(value[1:])
-                        user_key = "pages"
-
-                    if user_key:
-                        if logical_operator:
-                            numerical_where_queries.append(logical_operator)
-                        numerical_where_queries.append(f'"{user_key}" {operator} ?')
-                        numerical_where_bind_values.append(value)
-
-                elif user_key in TEXT_FILTER_OPTIONS:
-                    if operator not in TEXT_FILTER_OPTIONS[user_key]:
-                        raise ValueError(
-                            f"Wrong comparision operator used for key {user_key}."
-                        )
-                    wildcard = "*" if "~=" in operator else ""
-                    value = value.strip("\"'")  # See if needed or not.
-
-                    if operator.startswith("!"):
-                        if logical_operator == "OR":
-                            text_match_queries.append("OR")
-                        text_match_queries.append(f"NOT {user_key} : {value}{wildcard}")
-                    else:
-                        if logical_operator == "OR":
-                            text_match_queries.append("OR")
-                        text_match_queries.append(f"{user_key} : {value}{wildcard}")
-
-                elif user_key in NUMERICAL_FILTER_OPTIONS:
-                    if operator not in NUMERICAL_FILTER_OPTIONS[user_key]:
-                        raise KeyError(
-                            f"Wrong comparision operator used for key {user_key}."
-                        )
-                    if user_key in ("ddate", "udate"):
-                        value = _parse_date_time_format(value)
-                        # Flip the operator because it makes sense that way for
-                        # date filtering.
-                        operator = ">" if operator == "<" else "<"
-                        if logical_operator:
-                            numerical_where_queries.append(logical_operator)
-                        numerical_where_queries.append(f'"{user_key}" {operator} ?')
-                        numerical_where_bind_values.append(value)
-                    elif user_key == "size":
-                        *value, unit = value
-                        value = Bytes_from_value_and_unit("".join(value), unit)
-                    else:
-                        value = int(value)
-                        if logical_operator is not None:
-                            numerical_where_queries.append(logical_operator)
-                        numerical_where_queries.append(f'"{user_key}" {operator} ?')
-                        numerical_where_bind_values.append(value)
-
-                if user_key == "":
-                    raise ValueError("Comparison operator found with no key.")
-
-            else:
-                value = parsed_query
-
-                if value.startswith("-"):
-                    if logical_operator == "OR":
-                        text_match_queries.append(logical_operator)
-                    text_match_queries.append(f"NOT {value}*")
-                else:
-                    if logical_operator == "OR":
-                        text_match_queries.append(logical_operator)
-                    text_match_queries.append(f"{value}*")
-
-        if text_match_queries and numerical_where_queries:
-            numerical_where_queries.insert(0, "AND")
-
-        if text_match_queries:
-            bind_values.append(
-                " ".join(
-                    more_itertools.rstrip(
-                        text_match_queries, lambda x: str(x) in ("OR", "AND")
-                    )
-                )
-            )
-        bind_values.extend(numerical_where_bind_values)
-
-        if text_match_queries:
-            text_match_queries = "MATCH ?"
-        else:
-            text_match_queries = ""
-
-        return (
-            text_match_queries,
-            " ".join(
-                more_itertools.rstrip(
-                    numerical_where_queries, lambda x: str(x) in ("OR", "AND")
-                )
-            ),
-        )
-
     def _initialize(self, *args, **kwargs) -> bool:
         super().__init__(*args, **kwargs)
 
@@ -386,10 +421,20 @@ class DatabaseManager(qtc.QObject):
             sub_types=[],
         )
 
-        self._queries_iter = iter(CREATE_QUERIES)
-
-        self.write_query_queue = queue.Queue()
-        self.read_query_queue = queue.Queue()
+        self.write_query_queue = InstrumentedQueue()
+        self.read_query_queue = InstrumentedQueue()
+        self._query_stats = QueryStats(QUERY_STATS_SIZE)
+        # Loaded on the read thread when completions are first requested.
+        self._prefix_index = PrefixIndex(COMPLETION_SCAN_LIMIT)
+        self._prefix_index_requested = False
+        # Incremented by the write thread on every write, facets computed before
+        # a write are outdated.
+        self._write_generation = 0
+        self._facets_cache = {}
+        self._syncing_with_disk = False
+        self._explain_slow_queries = Preferences.get_instance()[
+            "database_preferences", "explain_slow_queries"
+        ]
 
         directory = qtc.QDir(
             qtc.QDir.cleanPath(
@@ -405,10 +450,11 @@ class DatabaseManager(qtc.QObject):
             self._logger.error(f"Failed to mkpath directory: LOCATION={directory}")
             return False
         self._database_file_path = directory.absoluteFilePath("LoH_galleries.db")
+        self._sizes_cache_file_path = directory.absoluteFilePath(SIZES_CACHE_FILE_NAME)
 
         if not self._set_journal_mode_wal():
             return False
-        if not self._create_tables_if_not_exist():
+        if not self._migrate():
             return False
 
         qtc.QThreadPool.globalInstance().start(self._threaded_execute_write_queries)
@@ -416,31 +462,259 @@ class DatabaseManager(qtc.QObject):
 
         self._update_progress_dialog_signal.connect(self._update_progress_dialog_slot)
         self._write_thread_closed_signal.connect(self._remove_databases)
+        self._maintenance_progress_signal.connect(self._maintenance_progress_slot)
+        self.maintenance_finished_signal.connect(self._maintenance_finished_slot)
+
+        # Maintenance runs once the database has been written to and has been
+        # idle for a while, and once per session for databases from before it
+        # existed.
+        self._last_write_time = time.monotonic()
+        self._writes_since_maintenance = 1
+        self._maintenance_running = False
+        self._maintenance_canceled = False
+        self._maintenance_progress_dialog_shown = False
+        self._maintenance_timer = qtc.QTimer(self)
+        self._maintenance_timer.setInterval(MAINTENANCE_CHECK_INTERVAL)
+        self._maintenance_timer.timeout.connect(self._maintenance_timer_timeout_slot)
+        self._maintenance_timer.start()
         self._read_operation_finished_signal.connect(self._call_callback)
+        self._job_finished_signal.connect(self._call_callback)
 
         return True
 
-    def _read(self, query: QtSql.QSqlQuery) -> list:
+    def _load_prefix_index(self, db: QtSql.QSqlDatabase) -> None:
+        query = QtSql.QSqlQuery(db)
+        query.setForwardOnly(True)
+        for dimension, (table, id_, name, junction) in COMPLETION_DIMENSIONS.items():
+            if not query.exec(
+                COMPLETION_QUERY_TEMPLATE.format(
+                    table=table, id=id_, name=name, junction=junction
+                )
+            ):
+                self._logger.error(
+                    f"[{query.lastError().text()}] "
+                    f"Error loading completions: "
+                    f'QUERY="{query.lastQuery()}"'
+                )
+                self._prefix_index_requested = False
+                return
+            names_and_counts = []
+            while query.next():
+                names_and_counts.append((query.value(0), query.value(1)))
+            query.finish()
+            self._prefix_index.load(dimension, names_and_counts)
+
+    def _facets_read(
+        self,
+        key: tuple,
+        write_generation: int,
+        facets_callback: Callable,
+        results: list[QtSql.QSqlRecord],
+    ) -> None:
+        facets = {dimension: [] for dimension in COMPLETION_DIMENSIONS}
+        for record in results:
+            facets[record.value("dimension")].append(
+                (record.value("name"), record.value("count"))
+            )
+        for names_and_counts in facets.values():
+            names_and_counts.sort(key=lambda name_and_count: -name_and_count[1])
+
+        if len(self._facets_cache) >= FACETS_CACHE_SIZE:
+            del self._facets_cache[next(iter(self._facets_cache))]
+        self._facets_cache[key] = (write_generation, facets)
+        facets_callback(facets)
+
+    def _maintenance_analyze(self, query: QtSql.QSqlQuery) -> Optional[bool]:
+        self._maintenance_progress_signal.emit("Gathering query planner statistics...")
+        if not query.exec(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}"):
+            return None
+        if not query.exec(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ):
+            return None
+        # `PRAGMA optimize` only re-analyzes tables whose statistics are stale.
+        statement = "PRAGMA optimize" if query.next() else "ANALYZE"
+        query.finish()
+        return None if not query.exec(statement) else False
+
+    def _maintenance_checkpoint(self, query: QtSql.QSqlQuery) -> Optional[bool]:
+        self._maintenance_progress_signal.emit("Checkpointing write-ahead log...")
+        # Passive, so that it never waits on the readers.
+        return None if not query.exec("PRAGMA wal_checkpoint(PASSIVE)") else False
+
+    def _maintenance_merge_fts5(self, query: QtSql.QSqlQuery) -> Optional[bool]:
+        self._maintenance_progress_signal.emit("Merging full-text search index...")
+
+        def _total_changes() -> Optional[int]:
+            if not query.exec("SELECT total_changes()") or not query.next():
+                return None
+            total_changes = query.value(0)
+            query.finish()
+            return total_changes
+
+        if (total_changes := _total_changes()) is None:
+            return None
+        # A negative page count merges segments of any level, incrementally
+        # working towards what the 'optimize' command produces in one go.
+        if not query.exec(
+            f"INSERT INTO {FTS5_TABLE_NAME}({FTS5_TABLE_NAME}, rank) "
+            f"VALUES('merge', -{FTS5_MERGE_PAGES})"
+        ):
+            return None
+        if (new_total_changes := _total_changes()) is None:
+            return None
+        # Fewer than 2 changes means there was nothing left to merge.
+        return new_total_changes - total_changes >= 2
+
+    def _maintenance_step(
+        self,
+        steps: tuple[Callable[[QtSql.QSqlQuery], Optional[bool]], ...],
+        db: QtSql.QSqlDatabase,
+    ) -> None:
+        """
+        Runs the first of `steps` on the write thread and enqueues the rest, one
+        at a time so that other writes are not held up for long.
+
+        Parameters
+        -----------
+            steps (tuple[Callable[[QtSql.QSqlQuery], Optional[bool]], ...]):
+                Remaining steps. A step returns True if it has to be run again,
+                False if it is done and None if it failed.
+            db (QtSql.QSqlDatabase):
+                The write connection.
+        """
+        if self._maintenance_canceled:
+            self.maintenance_finished_signal.emit(False)
+            return
+        if not steps:
+            self._writes_since_maintenance = 0
+            self.maintenance_finished_signal.emit(True)
+            return
+
+        query = QtSql.QSqlQuery(db)
+        repeat = steps[0](query)
+        if repeat is None:
+            self._logger.warning(
+                f"[{query.lastError().text()}] "
+                f"Database maintenance failed: "
+                f'QUERY="{query.lastQuery()}"'
+            )
+            self.maintenance_finished_signal.emit(False)
+            return
+        query.finish()
+
+        self.write_query_queue.put(
+            partial(self._maintenance_step, steps if repeat else steps[1:])
+        )
+
+    def _read(
+        self, query: QtSql.QSqlQuery, handle: Optional[QueryHandle] = None
+    ) -> Optional[list]:
+        """
+        Executes the prepared forward-only `query` and steps through its rows.
+
+        Returns
+        --------
+            Optional[list]:
+                The records of `query`, None if `handle` got cancelled meanwhile.
+        """
         if not query.exec():
             self._logger.error(
                 f"[{query.lastError().text()}] "
                 f"Error reading from database: "
                 f'QUERY="{query.lastQuery()}"'
             )
-            self.read_query_queue = queue.Queue()  # Empty queue.
+            self.read_query_queue = InstrumentedQueue()  # Empty queue.
             return []
 
-        model = QtSql.QSqlQueryModel()
-        model.setQuery(query)
-
-        results = [model.record(i) for i in range(model.rowCount())]
+        results = []
+        while query.next():
+            if handle is not None and handle.is_cancelled():
+                query.finish()
+                return None
+            results.append(query.record())
+        query.finish()
 
         return results
 
+    def _record_query(
+        self,
+        db: QtSql.QSqlDatabase,
+        kind: Literal["read", "write", "job"],
+        query_str: str,
+        bind_values: Sequence,
+        wait: float,
+        execution: float,
+        rows: int,
+    ) -> None:
+        """
+        Records a query that was run into the query statistics, along with its
+        `EXPLAIN QUERY PLAN` if it was slow and `explain_slow_queries` is enabled.
+        Called from the read and write threads.
+        """
+        plan = None
+        if (
+            self._explain_slow_queries
+            and kind != "job"
+            and execution >= SLOW_QUERY_THRESHOLD
+        ):
+            query = QtSql.QSqlQuery(db)
+            query.prepare(f"EXPLAIN QUERY PLAN {query_str}")
+            for bind_value in bind_values:
+                query.addBindValue(bind_value)
+            if query.exec():
+                plan = []
+                while query.next():
+                    plan.append(query.value("detail"))
+                query.finish()
+                self._logger.info(
+                    f"Slow {kind} query ({execution * 1000:.1f} ms): "
+                    f'QUERY="{" ".join(query_str.split())}", '
+                    f"PLAN={plan}"
+                )
+            else:
+                self._logger.warning(
+                    f"[{query.lastError().text()}] "
+                    f"Error explaining query plan: "
+                    f'QUERY="{query.lastQuery()}"'
+                )
+
+        self._query_stats.record(kind, query_str, wait, execution, rows, plan)
+
     def _remove_databases(self):
         QtSql.QSqlDatabase.removeDatabase("write")
         QtSql.QSqlDatabase.removeDatabase("read")
 
+    def _set_connection_pragmas(
+        self, db: QtSql.QSqlDatabase, role: Literal["read", "write"]
+    ) -> bool:
+        """
+        Enables foreign keys and sets the PRAGMAs of `role`'s profile from
+        `database_preferences/pragmas` on a newly opened connection.
+        """
+        pragmas = {"foreign_keys": "ON"}
+        for name, value in Preferences.get_instance()[
+            "database_preferences", "pragmas", role
+        ].items():
+            if name not in CONNECTION_PRAGMAS or not re.fullmatch(r"-?\w+", str(value)):
+                self._logger.warning(
+                    f"Ignoring invalid {role} connection PRAGMA: {name}={value}"
+                )
+                continue
+            pragmas[name] = value
+
+        query = QtSql.QSqlQuery(db)
+        for name, value in pragmas.items():
+            if not query.exec(f"PRAGMA {name} = {value}"):
+                self._logger.error(
+                    f"[{query.lastError().text()}] "
+                    f"Error setting PRAGMA {name}: "
+                    f'QUERY="{query.lastQuery()}"'
+                )
+                return False
+            query.finish()
+        return True
+
     def _set_journal_mode_wal(self) -> bool:
         QtSql.QSqlDatabase.addDatabase("QSQLITE", "PRAGMA")
         QtSql.QSqlDatabase.database("PRAGMA").setDatabaseName(self._database_file_path)
@@ -472,6 +746,136 @@ class DatabaseManager(qtc.QObject):
         QtSql.QSqlDatabase.removeDatabase("PRAGMA")
         return exec_res
 
+    def _sync_with_disk(
+        self,
+        galleries: list[tuple[int, str, Optional[int]]],
+        directories: Optional[list[str]],
+        delete_missing: bool,
+        synced_callback: Optional[Callable],
+    ) -> None:
+        """
+        Finds which of `galleries`, (gallery_database_id, location,
+        size_in_bytes) tuples, under `directories` are missing from the disk or
+        changed size, and queues their updates. Runs on the thread pool.
+        """
+        if directories is not None:
+            prefixes = tuple(
+                os.path.join(os.path.normpath(directory), "")
+                for directory in directories
+            )
+            galleries = [
+                gallery
+                for gallery in galleries
+                if os.path.join(os.path.normpath(gallery[1]), "").startswith(prefixes)
+            ]
+
+        scanner = SizeScanner(self._sizes_cache_file_path)
+        missing = []
+        sizes = []
+        resized = []
+        for gallery_database_id, location, size_in_bytes in galleries:
+            if (size := scanner.size(location)) is not None:
+                if size != size_in_bytes:
+                    sizes.append((gallery_database_id, size))
+                    resized.append((location, size))
+            elif not os.path.exists(location) and os.path.isdir(
+                os.path.dirname(os.path.normpath(location))
+            ):
+                # Only if its parent is still there, a whole unmounted drive is
+                # not taken as its galleries having been deleted.
+                missing.append((gallery_database_id, location))
+
+        try:
+            scanner.save()
+        except OSError as e:
+            self._logger.warning(
+                f"[{e}] Error saving gallery sizes cache: "
+                f'FILE="{self._sizes_cache_file_path}"'
+            )
+
+        summary = {
+            "galleries": len(galleries),
+            "missing": missing,
+            "deleted": len(missing) if delete_missing else 0,
+            "resized": len(sizes),
+            "sizes": resized,
+        }
+        if summary["deleted"] or summary["resized"]:
+            self.write_query_queue.put(
+                partial(
+                    self._update_from_disk,
+                    [gallery_database_id for gallery_database_id, _ in missing]
+                    if delete_missing
+                    else [],
+                    sizes,
+                    partial(self._synced_with_disk, summary, synced_callback),
+                )
+            )
+        else:
+            self._synced_with_disk(summary, synced_callback)
+
+    def _sync_with_disk_read(
+        self,
+        directories: Optional[list[str]],
+        delete_missing: bool,
+        synced_callback: Optional[Callable],
+        db: QtSql.QSqlDatabase,
+    ) -> None:
+        query = QtSql.QSqlQuery(db)
+        query.setForwardOnly(True)
+        if not query.exec(SYNC_WITH_DISK_QUERY):
+            self._logger.error(
+                f"[{query.lastError().text()}] "
+                f"Error reading gallery locations: "
+                f'QUERY="{query.lastQuery()}"'
+            )
+            self._synced_with_disk(
+                {
+                    "galleries": 0,
+                    "missing": [],
+                    "deleted": 0,
+                    "resized": 0,
+                    "sizes": [],
+                },
+                synced_callback,
+            )
+            return
+
+        galleries = []
+        while query.next():
+            size_in_bytes = query.value(2)
+            galleries.append(
+                (
+                    query.value(0),
+                    query.value(1),
+                    # NULL sizes are read as empty strings.
+                    size_in_bytes if isinstance(size_in_bytes, int) else None,
+                )
+            )
+        query.finish()
+        qtc.QThreadPool.globalInstance().start(
+            partial(
+                self._sync_with_disk,
+                galleries,
+                directories,
+                delete_missing,
+                synced_callback,
+            )
+        )
+
+    def _synced_with_disk(
+        self, summary: dict, synced_callback: Optional[Callable]
+    ) -> None:
+        # Called on the thread pool or the write thread.
+        self._logger.info(
+            f"Synced galleries with disk: GALLERIES={summary['galleries']}, "
+            f"MISSING={len(summary['missing'])}, DELETED={summary['deleted']}, "
+            f"RESIZED={summary['resized']}"
+        )
+        self._syncing_with_disk = False
+        if synced_callback is not None:
+            self._job_finished_signal.emit(partial(synced_callback, summary))
+
     def _threaded_execute_read_queries(self) -> None:
         QtSql.QSqlDatabase.addDatabase("QSQLITE", "read")
         QtSql.QSqlDatabase.database("read").setDatabaseName(self._database_file_path)
@@ -483,8 +887,30 @@ class DatabaseManager(qtc.QObject):
             while True:
                 value = self.read_query_queue.get(block=True, timeout=None)
                 while True:
+                    wait = self.read_query_queue.last_wait
                     if value is None:
                         return
+                    elif callable(value):
+                        # Jobs run their own queries on the read connection.
+                        started_at = time.perf_counter()
+                        value(db)
+                        self._record_query(
+                            db,
+                            "job",
+                            getattr(value, "func", value).__name__,
+                            (),
+                            wait,
+                            time.perf_counter() - started_at,
+                            0,
+                        )
+                        try:
+                            value = self.read_query_queue.get(block=False, timeout=None)
+                        except queue.Empty:
+                            break
+                        continue
+                    handle = None
+                    if len(value) == 4:
+                        query_str, bind_values, callback, handle = value
                     elif len(value) == 3:
                         query_str = value[0]
                         bind_values = value[1]
@@ -494,22 +920,33 @@ class DatabaseManager(qtc.QObject):
                         bind_values = ()
                         callback = value[1]
 
-                    query = QtSql.QSqlQuery(db)
-                    query.prepare(query_str)
-                    for bind_value in bind_values:
-                        query.addBindValue(bind_value, QtSql.QSql.ParamTypeFlag.Out)
-
-                    self._read_operation_finished_signal.emit(
-                        callback, self._read(query)
-                    )
+                    if handle is None or not handle.is_cancelled():
+                        query = QtSql.QSqlQuery(db)
+                        query.setForwardOnly(True)
+                        query.prepare(query_str)
+                        for bind_value in bind_values:
+                            query.addBindValue(bind_value, QtSql.QSql.ParamTypeFlag.Out)
+
+                        started_at = time.perf_counter()
+                        results = self._read(query, handle)
+                        if results is not None:
+                            self._record_query(
+                                db,
+                                "read",
+                                query_str,
+                                bind_values,
+                                wait,
+                                time.perf_counter() - started_at,
+                                len(results),
+                            )
+                            self._read_operation_finished_signal.emit(callback, results)
+                        query.clear()
 
                     try:
                         value = self.read_query_queue.get(block=False, timeout=None)
                     except queue.Empty:
                         break
 
-                    query.clear()
-
     def _threaded_execute_write_queries(self) -> None:
         QtSql.QSqlDatabase.addDatabase("QSQLITE", "write")
         QtSql.QSqlDatabase.database("write").setDatabaseName(self._database_file_path)
@@ -518,8 +955,29 @@ class DatabaseManager(qtc.QObject):
             if db is None:
                 return
 
+            job = None
             while True:
+                if job is not None:
+                    # Jobs run outside of the batch transactions, WAL checkpoints
+                    # can't run inside one.
+                    started_at = time.perf_counter()
+                    job(db)
+                    self._record_query(
+                        db,
+                        "job",
+                        getattr(job, "func", job).__name__,
+                        (),
+                        job_wait,
+                        time.perf_counter() - started_at,
+                        0,
+                    )
+                    job = None
+
                 value = self.write_query_queue.get(block=True, timeout=None)
+                if callable(value):
+                    job = value
+                    job_wait = self.write_query_queue.last_wait
+                    continue
                 query = QtSql.QSqlQuery(db)
 
                 with self._write_transaction_context_manager(db) as res:
@@ -527,23 +985,37 @@ class DatabaseManager(qtc.QObject):
                         return
 
                     while True:
-                        if isinstance(value, tuple):
+                        wait = self.write_query_queue.last_wait
+                        if value is None:
+                            self._delete_progress_dialog()
+                            self._write_thread_closed_signal.emit()
+                            return
+                        elif isinstance(value, tuple):
                             query_str = value[0]
                             bind_values = value[1]
                         elif len(value) == 2:
                             query_str = value[0]
                             bind_values = ()
-                        elif value is None:
-                            self._delete_progress_dialog()
-                            self._write_thread_closed_signal.emit()
-                            return
 
                         query.prepare(query_str)
                         for bind_value in bind_values:
                             query.addBindValue(bind_value)
 
+                        started_at = time.perf_counter()
                         if not self._write(query):
                             break
+                        self._record_query(
+                            db,
+                            "write",
+                            query_str,
+                            bind_values,
+                            wait,
+                            time.perf_counter() - started_at,
+                            query.numRowsAffected(),
+                        )
+                        self._last_write_time = time.monotonic()
+                        self._writes_since_maintenance += 1
+                        self._write_generation += 1
 
                         try:
                             self._update_progress_dialog_signal.emit()
@@ -557,6 +1029,12 @@ class DatabaseManager(qtc.QObject):
                         except queue.Empty:
                             break
 
+                        if callable(value):
+                            # Committed first, run on the next iteration.
+                            job = value
+                            job_wait = self.write_query_queue.last_wait
+                            break
+
     def _update_progress_dialog_slot(self) -> None:
         try:
             self._progress_dialog.update_progress()
@@ -565,6 +1043,47 @@ class DatabaseManager(qtc.QObject):
             # created.
             pass
 
+    def _update_from_disk(
+        self,
+        deleted: list[int],
+        sizes: list[tuple[int, int]],
+        updated_callback: Callable,
+        db: QtSql.QSqlDatabase,
+    ) -> None:
+        """
+        Write job deleting the galleries with the `deleted` database IDs and
+        setting the sizes of `sizes`, (gallery_database_id, size_in_bytes)
+        tuples, in a single transaction.
+        """
+        prepared_queries: dict[str, QtSql.QSqlQuery] = {}
+        with self._write_transaction_context_manager(db) as res:
+            if res is False:
+                updated_callback()
+                return
+
+            for gallery_database_id in deleted:
+                self._exec_prepared(
+                    db, prepared_queries, DELETE_GALLERY_QUERY, (gallery_database_id,)
+                )
+            for gallery_database_id, size in sizes:
+                for query_str, bind_values in zip(
+                    UPDATE_SIZE_QUERIES,
+                    (
+                        (gallery_database_id,),
+                        (size, gallery_database_id),
+                        (gallery_database_id,),
+                    ),
+                ):
+                    self._exec_prepared(db, prepared_queries, query_str, bind_values)
+
+        if deleted:
+            # Gallery counts are reloaded on the next completion.
+            self._prefix_index_requested = False
+        self._last_write_time = time.monotonic()
+        self._writes_since_maintenance += len(deleted) + len(sizes)
+        self._write_generation += 1
+        updated_callback()
+
     def _write(self, query: QtSql.QSqlQuery) -> None:
         if not query.exec():
             self._logger.error(
@@ -572,19 +1091,96 @@ class DatabaseManager(qtc.QObject):
                 f"Error writing to database: "
                 f'QUERY="{query.lastQuery()}"'
             )
-            self.write_query_queue = queue.Queue()
+            self.write_query_queue = InstrumentedQueue()
             return False
         return True
 
     # </PRIVATE METHODS>
 
     # <PUBLIC METHODS>
+    def bulk_insert_into_database(
+        self,
+        galleries: list[tuple["GalleryMetadataBase", int, int]],
+        inserted_callback: Optional[Callable] = None,
+    ) -> None:
+        """
+        Inserts many galleries at once, much faster than `insert_into_database`
+        for each of them. Galleries that are already in the database are left
+        as they are.
+
+        Parameters
+        -----------
+            galleries (list[tuple[GalleryMetadataBase, int, int]]):
+                (metadata, size in bytes, download date timestamp) tuples.
+            inserted_callback (Optional[Callable]):
+                Function to call with the number of galleries inserted once
+                they are committed, galleries that were already in the database
+                or that failed are not counted.
+        """
+        self.write_query_queue.put(
+            partial(self._bulk_insert, galleries, inserted_callback)
+        )
+
+    def cancel_maintenance(self) -> None:
+        """Stops the running maintenance after its current step."""
+        self._maintenance_canceled = True
+
+    def complete(
+        self, dimension: str, prefix: str, limit: int
+    ) -> list[tuple[str, int]]:
+        """
+        Thread-safe prefix completion of the names of `dimension`, one of
+        `COMPLETION_DIMENSIONS`. The index is loaded on the read thread on the
+        first call, nothing is returned until then.
+
+        Parameters
+        -----------
+            dimension (str):
+                Dimension to complete, like "tag".
+            prefix (str):
+                Lowercase prefix of the names.
+            limit (int):
+                Maximum number of completions.
+
+        Returns
+        --------
+            list[tuple[str, int]]:
+                (name, gallery count) tuples, most galleries first.
+        """
+        if not self._prefix_index_requested:
+            self._prefix_index_requested = True
+            self.read_query_queue.put(self._load_prefix_index)
+        return self._prefix_index.complete(dimension, prefix, limit)
+
     def delete(self, **kwargs):
+        # Gallery counts are reloaded on the next completion.
+        self._prefix_index_requested = False
         for key, value in kwargs.items():
             self.write_query_queue.put(
                 (f'DELETE FROM "Galleries" WHERE "{key}"=?', (value,))
             )
 
+    def export_query_stats(self, file_path: str) -> bool:
+        """
+        Writes `get_query_stats` and the recorded queries to `file_path` as JSON.
+
+        Returns
+        --------
+            bool:
+                False if the file could not be written, True otherwise.
+        """
+        stats = self.get_query_stats()
+        stats["records"] = self._query_stats.records()
+        try:
+            with open(file_path, "w") as file:
+                json.dump(stats, file, indent=4)
+        except OSError as e:
+            self._logger.error(
+                f"Error exporting query statistics: LOCATION={file_path}, {e}"
+            )
+            return False
+        return True
+
     def get(
         self,
         get_callback: Callable,
@@ -596,8 +1192,7 @@ class DatabaseManager(qtc.QObject):
         offset: int = 0,
         sort_by: str = None,
         sort_order: str = "ASC",
-    ) -> bool:
-        s1 = time.time()
+    ) -> Optional[QueryHandle]:
         """
         Queries the directory with provided arguments.
 
@@ -612,7 +1207,8 @@ class DatabaseManager(qtc.QObject):
             count_callback (Callable):
                 Function to call when count operation ends.
             user_query (str):
-                A custom query that looks like 'key1:"value1, value2, ..." key2:"..." ...'
+                A custom query that looks like 'key1=value1 value2 key2>value3 ...',
+                see `query_parser` for the grammar.
             limit (int):
                 Limit for maximum number of records to get.
             offset (int):
@@ -624,71 +1220,60 @@ class DatabaseManager(qtc.QObject):
 
         Returns
         --------
-            bool:
-                True:
-                    An SQL query created based on the parameters was
-                    successfully added to the read query queue.
-                False:
+            Optional[QueryHandle]:
+                QueryHandle:
+                    The SQL queries created based on the parameters were
+                    successfully added to the read query queue, cancelling the
+                    handle drops them and their callbacks.
+                None:
                     No SQL query was created nor added to the read query queue.
                     Denotes a syntax error in the passed `filter`.
         """
         bind_values = []
-        text_match_query = ""
-        numerical_where_query = ""
+        where = ""
 
+        handle = None
         if count:
             if count_callback is None:
-                return False
-            self.get(
+                return None
+            # The count and the records are cancelled together.
+            handle = self.get(
                 get_callback=count_callback,
                 select="count",
                 count=False,
                 user_query=user_query,
             )
+            if handle is None:
+                return None
+        else:
+            handle = QueryHandle()
 
         try:
-            if user_query:
-                (
-                    text_match_query,
-                    numerical_where_query,
-                ) = self._get_where(user_query, bind_values)
+            compiled_query = compile_query(user_query)
         except (KeyError, ValueError):
             # One of the following raised an error due to wrong input:
             #   - Could not cast user value to `int()` when integer was expected,
             #   - Special character value(s) (example:>d30d, size<30M) was(were)
             #     not used properly.
             #   - Empty value for operation.
-            return False
+            return None
+
+        if compiled_query is not None:
+            where = WHERE_TEMPLATE.format(conditions=compiled_query.where)
+            bind_values = compiled_query.bind_values()
 
         if select == "count":
-            select = 'COUNT(1) "total_rows"'
-            if text_match_query or numerical_where_query:
-                if text_match_query:
-                    match = MATCH_TEMPLATE.format(
-                        query=text_match_query,
-                    )
-                else:
-                    match = ""
-                query = SELECT_TEMPLATE.format(
-                    select=select,
-                    where=WHERE_TEMPLATE.format(
-                        match=match,
-                        conditionals=numerical_where_query,
-                    ),
-                    sort_by="",
-                    sort_order="",
-                    limit_offset="",
-                )
-            else:
-                query = SELECT_TEMPLATE.format(
-                    select=select,
-                    where="",
-                    sort_by="",
-                    sort_order="",
-                    limit_offset="",
-                )
-            self.read_query_queue.put((query, bind_values, get_callback))
-            return True
+            query = SELECT_TEMPLATE.format(
+                select='COUNT(1) "total_rows"',
+                where=where,
+                sort_by="",
+                sort_order="",
+                limit_offset="",
+            )
+            self.read_query_queue.put(
+                (query, bind_values, handle.wrap(get_callback), handle)
+            )
+            return handle
 
         if select == "*":
             select = "*"
@@ -710,108 +1295,335 @@ class DatabaseManager(qtc.QObject):
             sort_by = ""
             sort_order = ""
 
-        if text_match_query or numerical_where_query:
-            if text_match_query:
-                match = MATCH_TEMPLATE.format(
-                    query=text_match_query,
-                )
-            else:
-                match = ""
+        query = SELECT_TEMPLATE.format(
+            select=select,
+            where=where,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit_offset=limit_offset,
+        )
+        self.read_query_queue.put(
+            (query, bind_values, handle.wrap(get_callback), handle)
+        )
+        return handle
 
-            query = SELECT_TEMPLATE.format(
-                select=select,
-                where=WHERE_TEMPLATE.format(
-                    match=match,
-                    conditionals=numerical_where_query,
-                ),
-                sort_by=sort_by,
-                sort_order=sort_order,
-                limit_offset=limit_offset,
+    def get_facets(
+        self, facets_callback: Callable, user_query: str = "", limit: int = 10
+    ) -> Optional[QueryHandle]:
+        """
+        Counts the galleries matching `user_query` per artist, character, group,
+        series and tag, by aggregating the link tables over the matched galleries.
+        Results are cached until the next write.
+
+        Parameters
+        -----------
+            facets_callback (Callable):
+                Function to call with a dict of dimension to a list of its `limit`
+                most common (name, gallery count) tuples, most galleries first.
+                Called right away if the result is cached.
+            user_query (str):
+                Same as `get`'s `user_query`.
+            limit (int):
+                Maximum number of names per dimension.
+
+        Returns
+        --------
+            Optional[QueryHandle]:
+                None if `user_query` could not be parsed, a handle to cancel the
+                query otherwise.
+        """
+        try:
+            compiled_query = compile_query(user_query)
+        except (KeyError, ValueError):
+            return None
+
+        key = (compiled_query, limit)
+        write_generation = self._write_generation
+        cached = self._facets_cache.pop(key, None)
+        if cached is not None and cached[0] == write_generation:
+            # Re-inserted as the most recently used.
+            self._facets_cache[key] = cached
+            facets_callback(cached[1])
+            return QueryHandle()
+
+        facets = " UNION ALL ".join(
+            FACET_SELECT_TEMPLATE.format(
+                dimension=dimension,
+                table=table,
+                id=id_,
+                name=name,
+                junction=junction,
+                matched="" if compiled_query is None else FACET_MATCHED_CONDITION,
+                limit=limit,
             )
+            for dimension, (table, id_, name, junction) in COMPLETION_DIMENSIONS.items()
+        )
+        if compiled_query is None:
+            query = facets
+            bind_values = []
         else:
-            query = SELECT_TEMPLATE.format(
-                select=select,
-                where="",
-                sort_by=sort_by,
-                sort_order=sort_order,
-                limit_offset=limit_offset,
+            query = FACETS_QUERY_TEMPLATE.format(
+                where=WHERE_TEMPLATE.format(conditions=compiled_query.where),
+                facets=facets,
             )
-        self.read_query_queue.put((query, bind_values, get_callback))
+            bind_values = compiled_query.bind_values()
+
+        handle = QueryHandle()
+        self.read_query_queue.put(
+            (
+                query,
+                bind_values,
+                handle.wrap(
+                    partial(self._facets_read, key, write_generation, facets_callback)
+                ),
+                handle,
+            )
+        )
+        return handle
+
+    def get_locations(self, locations_callback: Callable) -> QueryHandle:
+        """
+        Reads the location of every gallery straight from the "Galleries" table.
+
+        Parameters
+        -----------
+            locations_callback (Callable):
+                Function to call with the records, their "location" field is the
+                gallery's location.
+        """
+        handle = QueryHandle()
+        self.read_query_queue.put(
+            (LOCATIONS_QUERY, (), handle.wrap(locations_callback), handle)
+        )
+        return handle
+
+    def get_query_stats(self) -> dict:
+        """
+        Returns
+        --------
+            dict:
+                Current depths of the read and write query queues and the
+                per-fingerprint latency percentiles from `QueryStats.summary`.
+        """
+        return {
+            "queue_depths": {
+                "read": self.read_query_queue.qsize(),
+                "write": self.write_query_queue.qsize(),
+            },
+            "queries": self._query_stats.summary(),
+        }
+
+    def rescan_sizes(self) -> bool:
+        """
+        Recomputes the sizes of every gallery in the background, for files that
+        changed outside of the app. Galleries whose directory did not change
+        since the last rescan are not listed again.
+
+        Returns
+        --------
+            bool:
+                False if a rescan or a sync with the disk is already running, True
+                otherwise.
+        """
+        return self.sync_with_disk()
+
+    def run_maintenance(self, show_progress: bool = False) -> bool:
+        """
+        Merges the full-text search index's segments, refreshes the query
+        planner's statistics and checkpoints the write-ahead log, in steps queued
+        on the write thread. `maintenance_finished_signal` is emitted when done.
+
+        Parameters
+        -----------
+            show_progress (bool):
+                Whether to show a progress dialog that can cancel the maintenance.
+
+        Returns
+        --------
+            bool:
+                False if maintenance is already running, True otherwise.
+        """
+        if self._maintenance_running:
+            return False
+        self._maintenance_running = True
+        self._maintenance_canceled = False
+
+        if show_progress and self._has_gui():
+            self._create_progress_dialog("Optimizing database...", "Cancel", 0, 0)
+            self._progress_dialog.canceled.connect(self.cancel_maintenance)
+            self._maintenance_progress_dialog_shown = True
+
+        self.write_query_queue.put(
+            partial(
+                self._maintenance_step,
+                (
+                    self._maintenance_merge_fts5,
+                    self._maintenance_analyze,
+                    self._maintenance_checkpoint,
+                ),
+            )
+        )
+        return True
+
+    def sync_with_disk(
+        self,
+        directories: Optional[list[str]] = None,
+        delete_missing: bool = False,
+        synced_callback: Optional[Callable] = None,
+    ) -> bool:
+        """
+        Updates the sizes of the galleries that changed on the disk and finds the
+        ones that are missing from it, in the background. Galleries whose
+        directory did not change since the last sync are not listed again.
+
+        Parameters
+        -----------
+            directories (Optional[list[str]]):
+                Only the galleries under these directories are synced, all of
+                them if None.
+            delete_missing (bool):
+                Whether to delete the missing galleries from the database.
+            synced_callback (Optional[Callable]):
+                Function to call with a summary dict once the updates are
+                committed: "galleries" synced, "missing" (gallery_database_id,
+                location) tuples, the number of galleries "deleted" and
+                "resized", and the new "sizes", (location, size_in_bytes)
+                tuples, of the resized ones.
+
+        Returns
+        --------
+            bool:
+                False if a sync is already running, True otherwise.
+        """
+        if self._syncing_with_disk:
+            return False
+        self._syncing_with_disk = True
+        self.read_query_queue.put(
+            partial(
+                self._sync_with_disk_read, directories, delete_missing, synced_callback
+            )
+        )
         return True
 
-    def insert_into_database(self, gallery_metadata: "GalleryMetadataBase") -> None:
+    def insert_into_database(
+        self,
+        gallery_metadata: "GalleryMetadataBase",
+        size_in_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        -----------
+            gallery_metadata (GalleryMetadataBase):
+                Metadata of the downloaded gallery.
+            size_in_bytes (Optional[int]):
+                Total size of the gallery's files, computed from its location
+                if None.
+        """
+        if size_in_bytes is None:
+            try:
+                size_in_bytes = directory_size(gallery_metadata.location)
+            except OSError:
+                size_in_bytes = 0
+
+        gallery_queries, names_queries = self._gallery_insert_queries(
+            gallery_metadata, size_in_bytes, int(datetime.today().timestamp())
+        )
+        for query in gallery_queries + names_queries:
+            self.write_query_queue.put(query)
+        self._add_to_prefix_index(gallery_metadata)
+
+        bind_values = (gallery_metadata.gallery_id, gallery_metadata.source)
+        self.write_query_queue.put((INSERT_FTS5_QUERY, bind_values))
+
+    def _gallery_insert_queries(
+        self,
+        gallery_metadata: "GalleryMetadataBase",
+        size_in_bytes: int,
+        download_date: int,
+    ) -> tuple[list[tuple[str, tuple]], list[tuple[str, tuple]]]:
+        """
+        Returns
+        --------
+            tuple[list[tuple[str, tuple]], list[tuple[str, tuple]]]:
+                (query, bind values) tuples inserting `gallery_metadata`, the
+                last of which inserts its "Galleries" row, and (query, bind values)
+                tuples inserting its names, without its full-text search row.
+        """
         gallery_id = gallery_metadata.gallery_id
         source = gallery_metadata.source
+        queries = []
 
         for type in gallery_metadata.type:
-            self._insert_into_types(gallery_metadata.gallery_id, type)
-
-        self._insert_into_sources(gallery_metadata.gallery_id, source)
+            queries.extend(self._insert_into_types(gallery_metadata.gallery_id, type))
 
-        size_in_bytes = 0
-        for path, _, files in os.walk(gallery_metadata.location):
-            for file in files:
-                size_in_bytes += os.path.getsize(os.path.join(path, file))
+        queries.extend(self._insert_into_sources(gallery_metadata.gallery_id, source))
 
         try:
             nhentai_media_id = gallery_metadata.media_id
         except AttributeError:
             nhentai_media_id = None
 
-        self._insert_into_galleries(
-            gallery_id=gallery_id,
-            title=gallery_metadata.title,
-            japanese_title=gallery_metadata.japanese_title,
-            download_date=int(datetime.today().timestamp()),
-            upload_date=gallery_metadata.upload_date,
-            pages=gallery_metadata.pages,
-            location=gallery_metadata.location,
-            size_in_bytes=size_in_bytes,
-            type_=gallery_metadata.type,
-            source=source,
-            nhentai_media_id=nhentai_media_id,
+        queries.extend(
+            self._insert_into_galleries(
+                gallery_id=gallery_id,
+                title=gallery_metadata.title,
+                japanese_title=gallery_metadata.japanese_title,
+                download_date=download_date,
+                upload_date=gallery_metadata.upload_date,
+                pages=gallery_metadata.pages,
+                location=gallery_metadata.location,
+                size_in_bytes=size_in_bytes,
+                type_=gallery_metadata.type,
+                source=source,
+                nhentai_media_id=nhentai_media_id,
+            )
         )
+        gallery_queries = queries
+        queries = []
 
         for artist_name in gallery_metadata.artists:
-            self._insert_into_artists(gallery_id, artist_name, source)
+            queries.extend(self._insert_into_artists(gallery_id, artist_name, source))
 
         for character_name in gallery_metadata.characters:
-            self._insert_into_characters(gallery_id, character_name, source)
+            queries.extend(
+                self._insert_into_characters(gallery_id, character_name, source)
+            )
 
         for group_name in gallery_metadata.groups:
-            self._insert_into_groups(gallery_id, group_name, source)
+            queries.extend(self._insert_into_groups(gallery_id, group_name, source))
 
         for language_name in gallery_metadata.language:
-            self._insert_into_languages(gallery_id, language_name, source)
+            queries.extend(
+                self._insert_into_languages(gallery_id, language_name, source)
+            )
 
         for series_name in gallery_metadata.series:
-            self._insert_into_series(gallery_id, series_name, source)
+            queries.extend(self._insert_into_series(gallery_id, series_name, source))
 
         for tag_name in gallery_metadata.tags:
-            self._insert_into_tags(gallery_id, tag_name, source)
-
-        fts5_insert_query = """
-        INSERT INTO
-            GalleriesFTS5
-        SELECT
-            *
-        FROM
-            GalleriesView
-        WHERE
-            gallery = ?
-        AND
-            source = ?
-        """
-        bind_values = (gallery_id, source)
-        self.write_query_queue.put((fts5_insert_query, bind_values))
+            queries.extend(self._insert_into_tags(gallery_id, tag_name, source))
+
+        return gallery_queries, queries
+
+    def _add_to_prefix_index(self, gallery_metadata: "GalleryMetadataBase") -> None:
+        for artist_name in gallery_metadata.artists:
+            self._prefix_index.add("artist", artist_name.lower())
+        for character_name in gallery_metadata.characters:
+            self._prefix_index.add("character", character_name.lower())
+        for group_name in gallery_metadata.groups:
+            self._prefix_index.add("group", group_name.lower())
+        for series_name in gallery_metadata.series:
+            self._prefix_index.add("series", series_name.lower())
+        for tag_name in gallery_metadata.tags:
+            self._prefix_index.add("tag", tag_name.lower())
 
     def _insert_into_artists(
         self, gallery_id: int, artist_name: str, source: str
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         artist_name = artist_name.lower()
         query = 'INSERT OR IGNORE INTO "Artists" ("artist_name") VALUES (?)'
         bind_values = (artist_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -840,15 +1652,15 @@ class DatabaseManager(qtc.QObject):
             """
 
         bind_values = (artist_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     def _insert_into_characters(
         self, gallery_id: int, character_name: str, source: str
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         character_name = character_name.lower()
         query = 'INSERT OR IGNORE INTO "Characters" ("character_name") VALUES (?)'
         bind_values = (character_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -874,7 +1686,7 @@ class DatabaseManager(qtc.QObject):
             )
             """
         bind_values = (character_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     def _insert_into_galleries(
         self,
@@ -889,7 +1701,7 @@ class DatabaseManager(qtc.QObject):
         type_: int,
         source: int,
         nhentai_media_id: Optional[int] = None,
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         query = """
             INSERT OR IGNORE INTO "Galleries"
             (
@@ -924,15 +1736,15 @@ class DatabaseManager(qtc.QObject):
             type_,
             source,
         )
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     def _insert_into_groups(
         self, gallery_id: int, group_name: str, source: str
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         group_name = group_name.lower()
         query = 'INSERT OR IGNORE INTO "Groups" ("group_name") VALUES (?)'
         bind_values = (group_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -958,15 +1770,15 @@ class DatabaseManager(qtc.QObject):
             )
             """
         bind_values = (group_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     def _insert_into_languages(
         self, gallery_id: int, language_name: str, source: str
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         language_name = language_name.lower()
         query = 'INSERT OR IGNORE INTO "Languages" ("language_name") VALUES (?)'
         bind_values = (language_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -992,15 +1804,15 @@ class DatabaseManager(qtc.QObject):
             )
             """
         bind_values = (language_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     def _insert_into_series(
         self, gallery_id: int, series_name: str, source: str
-    ) -> None:
+    ) -> Iterator[tuple[str, tuple]]:
         series_name = series_name.lower()
         query = 'INSERT OR IGNORE INTO "Series" ("series_name") VALUES (?)'
         bind_values = (series_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -1026,19 +1838,23 @@ class DatabaseManager(qtc.QObject):
             )
             """
         bind_values = (series_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
-    def _insert_into_sources(self, gallery_id: int, source_name: str) -> None:
+    def _insert_into_sources(
+        self, gallery_id: int, source_name: str
+    ) -> Iterator[tuple[str, tuple]]:
         source_name = source_name.lower()
         query = 'INSERT OR IGNORE INTO "Sources" ("source_name") VALUES (?)'
         bind_values = (source_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
-    def _insert_into_tags(self, gallery_id: int, tag_name: str, source: str) -> None:
+    def _insert_into_tags(
+        self, gallery_id: int, tag_name: str, source: str
+    ) -> Iterator[tuple[str, tuple]]:
         tag_name = tag_name.lower()
         query = 'INSERT OR IGNORE INTO "Tags" ("tag_name") VALUES (?)'
         bind_values = (tag_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
         query = f"""
             INSERT OR IGNORE INTO
@@ -1064,141 +1880,39 @@ class DatabaseManager(qtc.QObject):
             )
             """
         bind_values = (tag_name, gallery_id, source)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
-    def _insert_into_types(self, gallery_id: int, type_name: str) -> None:
+    def _insert_into_types(
+        self, gallery_id: int, type_name: str
+    ) -> Iterator[tuple[str, tuple]]:
         type_name = type_name.lower()
         query = 'INSERT OR IGNORE INTO "Types" ("type_name") VALUES (?)'
         bind_values = (type_name,)
-        self.write_query_queue.put((query, bind_values))
+        yield query, bind_values
 
     # </PUBLIC METHODS>
 
-
-def _parse_date_time_format(value: str) -> int:
-    """
-    Checks user query date value against various accepted formats.
-
-    Parameters
-    -----------
-        value (str):
-            User query date value.
-
-    Return
-    -------
-        int:
-            UNIX timestamp representation of passed user query date value.
-
-    Raises
-    -------
-        ValueError:
-            User passed query date value is not in any acceptable format.
-    """
-    try:
-        # In the off-chance that the user passed a UNIX timestamp.
-        value = int(float(value))
-    except ValueError:
-        try:
-            # Check if the user passed relative time.
-            value = int(relative_time_to_timestamp(value))
-        except ValueError:
-            # Check if the user passed date in YYYY-MM-DD format.
-            value = int(datetime.strptime(value, "%Y-%m-%d").timestamp())
-    return value
-
-
-_COMPARISION_SPLIT_PATTERN = re.compile("(!~=|~=|>=|<=|!=|=|>|<)")
-_LOGICAL_SPLIT_PATTERN = re.compile(r" (&&|\|\|) ")
-_WHITE_SPACES_SUB_PATTERN = re.compile(r" {2,}")
-
-
-def _parse_query(
-    user_query: str,
-) -> Iterator[Union[tuple[str, str, str], Literal["&&"], Literal["||"]]]:
-    """
-    Parses user filter query into a usable standard based on grammar.
-    Grammar:
-        <key><operator><value> ['&&'|'||'|' ' <key><operator><value> [...]]
-        * No logical operator separation defaults to '&&'.
-    Possible operators:
-        - !~= (to be parsed as SQL NOT LIKE)
-        - ~= (to be parsed as SQL LIKE)
-        - >=
-        - <=
-        - !=
-        - =
-        - >
-        - <
-
-    Parameters
-    -----------
-        user_query (str):
-            User query to parse.
-
-    Returns
-    --------
-        Iterator[
-            Union[
-                tuple[
-                    str:
-                        Database column name.
-                    str:
-                        Comparision operator.
-                    str:
-                        Value to filter database column with.
-                ],
-                Literal["&&"],
-                Literal["||"]:
-                    Logical operators `AND` and `OR`, respectively.
-            ]
-        ]
-    """
-    # Say user_query = 'key1=val1 key2>val2 && key3<="val 3"'
-    # Replace more than one consecutive white space with a single ' '.
-    user_query = _WHITE_SPACES_SUB_PATTERN.sub(" ", user_query)
-
-    quotes = False
-    parsed_query = ""
-
-    for char in user_query:
-        #' 's within quotes are to be ignored during any operation involving ' '.
-        # This loop replaces them with a placeholder.
-        if quotes and char == " ":
-            parsed_query += "^q_ign^"
-            continue
-        elif char in ('"', "'"):
-            quotes = not quotes
-        parsed_query += char
-
-    # parsed_query = 'key1=val1 key2>val2 && key3<="val^q_ign^3"'
-
-    logical_split = _LOGICAL_SPLIT_PATTERN.split(parsed_query)
-    # logical_split = ['key1=val1 key2>val2', '&&', 'key3<="val^q_ign^3"']
-    temp = []
-    for split in logical_split:
-        # Replaces ' 's that separate <key><operator><value> pairs with '&&' and
-        # adds them to the main list.
-        split = split.replace(" ", " && ")
-        temp.extend(_LOGICAL_SPLIT_PATTERN.split(split))
-    logical_split = temp
-    # logical_split = ['key1=val1', '&&', 'key2>val2', '&&', 'key3<="val^q_ign^3"']
-
-    comparison_split = [
-        tuple(split)
-        if len(
-            split := _COMPARISION_SPLIT_PATTERN.split(
-                prt := part.replace("^q_ign^", " ")  # Re-placing replaced ' 's.
-            )
-        )
-        > 1
-        else prt
-        for part in logical_split
-    ]
-    # comparison_split = [
-    #   ('key1', '=', 'val1'),
-    #   '&&',
-    #   ('key1', '>', 'val2'),
-    #   '&&',
-    #   ('key3', '<=', '"val^q_ign^3"')
-    # ]
-    return more_itertools.strip(comparison_split, lambda x: x in ("&&", "||"))
+    # <SLOTS>
+    def _maintenance_finished_slot(self, completed: bool) -> None:
+        self._maintenance_running = False
+        if self._maintenance_progress_dialog_shown:
+            self._maintenance_progress_dialog_shown = False
+            self._delete_progress_dialog()
+        if completed:
+            self._logger.info("Database maintenance finished.")
+
+    def _maintenance_progress_slot(self, text: str) -> None:
+        if self._maintenance_progress_dialog_shown:
+            self._progress_dialog.setLabelText(text)
+
+    def _maintenance_timer_timeout_slot(self) -> None:
+        if (
+            not self._maintenance_running
+            and self._writes_since_maintenance
+            and time.monotonic() - self._last_write_time >= MAINTENANCE_IDLE_TIME
+            and self.write_query_queue.empty()
+            and self.read_query_queue.empty()
+        ):
+            self.run_maintenance()
+
+    # </SLOTS>
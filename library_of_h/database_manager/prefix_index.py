@@ -0,0 +1,67 @@
+import bisect
+import heapq
+import threading
+from typing import Iterable
+
+
+class PrefixIndex:
+    """
+    Thread-safe sorted arrays of the names of each dimension (artist, tag, ...)
+    along with their gallery counts, searched by prefix with `bisect`.
+    """
+
+    def __init__(self, scan_limit: int) -> None:
+        """
+        Parameters
+        -----------
+            scan_limit (int):
+                Maximum number of names matching a prefix, in alphabetical order,
+                that are ranked by gallery count. Keeps short prefixes fast.
+        """
+        self._scan_limit = scan_limit
+        self._names: dict[str, list[str]] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, dimension: str, name: str) -> None:
+        """Counts one more gallery for `name`, inserting it if it is new."""
+        with self._lock:
+            names = self._names.setdefault(dimension, [])
+            counts = self._counts.setdefault(dimension, {})
+            if name not in counts:
+                bisect.insort(names, name)
+                counts[name] = 0
+            counts[name] += 1
+
+    def complete(
+        self, dimension: str, prefix: str, limit: int
+    ) -> list[tuple[str, int]]:
+        """
+        Returns
+        --------
+            list[tuple[str, int]]:
+                At most `limit` (name, gallery count) tuples of the names of
+                `dimension` starting with `prefix`, most galleries first.
+        """
+        with self._lock:
+            names = self._names.get(dimension, [])
+            counts = self._counts.get(dimension, {})
+            start = bisect.bisect_left(names, prefix)
+            end = min(
+                bisect.bisect_left(names, prefix + "\U0010ffff", lo=start),
+                start + self._scan_limit,
+            )
+            return [
+                (name, counts[name])
+                for name in heapq.nlargest(
+                    limit, names[start:end], key=counts.__getitem__
+                )
+            ]
+
+    def load(self, dimension: str, names_and_counts: Iterable[tuple[str, int]]) -> None:
+        """Replaces the names of `dimension`."""
+        counts = dict(names_and_counts)
+        names = sorted(counts)
+        with self._lock:
+            self._names[dimension] = names
+            self._counts[dimension] = counts
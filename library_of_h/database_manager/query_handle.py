@@ -0,0 +1,36 @@
+import threading
+from typing import Callable
+
+
+class QueryHandle:
+    """
+    Handle of the read queries queued by a `DatabaseManager.get` call.
+
+    Once cancelled, its queued queries are skipped by the read thread, a running
+    query stops at its next row and callbacks that have not been called yet are
+    never called.
+    """
+
+    def __init__(self) -> None:
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Cancels the queries, safe to call more than once and from any thread."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def wrap(self, callback: Callable) -> Callable:
+        """
+        Returns
+        --------
+            Callable:
+                `callback`, that does nothing once the handle is cancelled.
+        """
+
+        def _callback(*args, **kwargs) -> None:
+            if not self._cancelled.is_set():
+                callback(*args, **kwargs)
+
+        return _callback
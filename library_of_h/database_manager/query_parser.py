@@ -0,0 +1,257 @@
+"""
+Tokenizer, parser and SQL compiler of the Explorer's search language.
+
+Grammar:
+    <term> [['&&'|'||'|' '] <term> [...]]
+    * No logical operator separation defaults to '&&', which binds tighter than
+      '||'.
+    <term>:
+        - <value>, or -<value> to exclude, full-text matched against every column.
+        - <key><operator><value>, see `TEXT_FILTER_OPTIONS` and
+          `NUMERICAL_FILTER_OPTIONS` for the operators of each key.
+        - <operator>d<date>, <operator>u<date> or <operator>p<pages>, short for
+          ddate, udate and pages comparisons.
+    Values with white spaces are quoted with '"' or "'".
+
+`compile_query` turns a query into a WHERE condition and a bind template, once
+per distinct query; relative dates in the bind template are resolved each time
+`CompiledQuery.bind_values` is called.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Union
+
+from library_of_h.database_manager.constants import (MATCH_ROWIDS_TEMPLATE,
+                                                     MATCH_TEMPLATE,
+                                                     NUMERICAL_FILTER_OPTIONS,
+                                                     SELECT_MAPPING,
+                                                     TEXT_FILTER_OPTIONS)
+from library_of_h.miscellaneous.functions import (Bytes_from_value_and_unit,
+                                                  relative_time_to_timestamp)
+
+BindValue = Union[int, str, Callable[[], int]]
+
+_TOKEN_PATTERN = re.compile(r"""(?:"[^"]*"?|'[^']*'?|[^\s"'])+""")
+_COMPARISON_PATTERN = re.compile(r"(\w*)(!~=|~=|>=|<=|!=|=|>|<)(.*)", re.DOTALL)
+_RELATIVE_TIME_PATTERN = re.compile(r"\d+[dwmy]")
+_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([bkmgtpezy]?)")
+_WHITE_SPACES_SUB_PATTERN = re.compile(r"\s+")
+
+# Key of the value only comparisons by the value's first character.
+_SHORTHAND_KEYS = {"d": "ddate", "u": "udate", "p": "pages"}
+_FLIPPED_OPERATORS = {"<": ">", ">": "<", "<=": ">=", ">=": "<=", "=": "="}
+
+
+class TextTerm(NamedTuple):
+    # Full-text column, None for every column.
+    column: Optional[str]
+    value: str
+    prefix: bool
+    negated: bool
+
+
+class Comparison(NamedTuple):
+    column: str
+    operator: str
+    value: BindValue
+
+
+# Terms of an AND group.
+Group = tuple[Union[TextTerm, Comparison], ...]
+
+
+class CompiledQuery(NamedTuple):
+    # Condition to use after WHERE.
+    where: str
+    bind_template: tuple[BindValue, ...]
+
+    def bind_values(self) -> list[Union[int, str]]:
+        return [
+            value() if callable(value) else value for value in self.bind_template
+        ]
+
+
+def _date_value(operator: str, value: str) -> tuple[str, BindValue]:
+    try:
+        # In the off-chance that the user passed a UNIX timestamp.
+        return operator, int(float(value))
+    except ValueError:
+        pass
+    if _RELATIVE_TIME_PATTERN.fullmatch(value):
+        # Flip the operator because '<30d' reads as "less than 30 days ago".
+        return _FLIPPED_OPERATORS[operator], lambda: int(
+            relative_time_to_timestamp(value)
+        )
+    # Raises ValueError if the date is not in YYYY-MM-DD format either.
+    return operator, int(datetime.strptime(value, "%Y-%m-%d").timestamp())
+
+
+def _fts5_string(term: TextTerm) -> str:
+    string = '"{}"{}'.format(
+        term.value.replace('"', '""'), "*" if term.prefix else ""
+    )
+    if term.column is not None:
+        return f"{term.column} : {string}"
+    return string
+
+
+def _parse_term(token: str) -> Union[TextTerm, Comparison]:
+    if not (match := _COMPARISON_PATTERN.fullmatch(token)):
+        negated = token.startswith("-")
+        value = token.lstrip("-").strip("\"'")
+        if not value:
+            raise ValueError("No value passed for operation.")
+        return TextTerm(None, value, True, negated)
+
+    key, operator, value = match.groups()
+    value = value.strip("\"'")
+    if not value:
+        raise ValueError("No value passed for operation.")
+
+    if key == "":
+        # Value only comparisons, like '<d30d' or '>p20'.
+        if value[0] not in _SHORTHAND_KEYS:
+            raise ValueError("Comparison operator found with no key.")
+        key = _SHORTHAND_KEYS[value[0]]
+        value = value[1:]
+
+    if key in TEXT_FILTER_OPTIONS:
+        if operator not in TEXT_FILTER_OPTIONS[key]:
+            raise ValueError(f"Wrong comparision operator used for key {key}.")
+        return TextTerm(key, value, "~=" in operator, operator.startswith("!"))
+
+    if key not in NUMERICAL_FILTER_OPTIONS:
+        raise KeyError(f"Unknown key {key}.")
+    if operator not in NUMERICAL_FILTER_OPTIONS[key]:
+        raise KeyError(f"Wrong comparision operator used for key {key}.")
+
+    if key in ("ddate", "udate"):
+        operator, value = _date_value(operator, value)
+    elif key == "size":
+        if not (match := _SIZE_PATTERN.fullmatch(value)):
+            raise ValueError(f"Invalid size {value}.")
+        size, unit = match.groups()
+        value = int(Bytes_from_value_and_unit(float(size), unit or "b"))
+    else:
+        value = int(value)
+    return Comparison(SELECT_MAPPING[key], operator, value)
+
+
+def tokenize(user_query: str) -> list[str]:
+    """
+    Splits `user_query` at white spaces that are not within quotes.
+    """
+    return _TOKEN_PATTERN.findall(user_query)
+
+
+def parse(user_query: str) -> tuple[Group, ...]:
+    """
+    Parses `user_query` into OR-ed groups of AND-ed terms.
+
+    Raises
+    -------
+        KeyError, ValueError:
+            `user_query` is not valid.
+    """
+    groups = []
+    group = []
+    for token in tokenize(user_query.lower()):
+        if token == "&&":
+            continue
+        if token == "||":
+            if group:
+                groups.append(tuple(group))
+            group = []
+            continue
+        group.append(_parse_term(token))
+    if group:
+        groups.append(tuple(group))
+    return tuple(groups)
+
+
+def _compile_groups(groups: tuple[Group, ...]) -> CompiledQuery:
+    split_groups = []
+    for group in groups:
+        text_terms = [term for term in group if isinstance(term, TextTerm)]
+        split_groups.append(
+            (
+                [_fts5_string(term) for term in text_terms if not term.negated],
+                [_fts5_string(term) for term in text_terms if term.negated],
+                [term for term in group if isinstance(term, Comparison)],
+            )
+        )
+
+    if all(positives for positives, *_ in split_groups) and (
+        len(split_groups) == 1 or not any(comparisons for *_, comparisons in split_groups)
+    ):
+        # The whole query is a single MATCH, so that results can be sorted by
+        # rank, FTS5 does not allow a leading NOT.
+        match = " OR ".join(
+            "({})".format(
+                " AND ".join(positives)
+                + "".join(f" NOT {negative}" for negative in negatives)
+            )
+            for positives, negatives, _ in split_groups
+        )
+        conditions = [MATCH_TEMPLATE]
+        bind_template = [match]
+        for comparison in split_groups[0][2]:
+            conditions.append(f"{comparison.column} {comparison.operator} ?")
+            bind_template.append(comparison.value)
+        return CompiledQuery(" AND ".join(conditions), tuple(bind_template))
+
+    group_conditions = []
+    bind_template = []
+    for positives, negatives, comparisons in split_groups:
+        conditions = []
+        if positives:
+            conditions.append(MATCH_ROWIDS_TEMPLATE.format(operator="IN"))
+            bind_template.append(" AND ".join(positives))
+        if negatives:
+            conditions.append(MATCH_ROWIDS_TEMPLATE.format(operator="NOT IN"))
+            bind_template.append(" OR ".join(negatives))
+        for comparison in comparisons:
+            conditions.append(f"{comparison.column} {comparison.operator} ?")
+            bind_template.append(comparison.value)
+        group_conditions.append("({})".format(" AND ".join(conditions)))
+    return CompiledQuery(" OR ".join(group_conditions), tuple(bind_template))
+
+
+@lru_cache(maxsize=256)
+def _compile(user_query: str) -> Optional[CompiledQuery]:
+    try:
+        # See if the user input a gallery ID.
+        gallery = int(user_query)
+    except ValueError:
+        pass
+    else:
+        return CompiledQuery(f'{SELECT_MAPPING["gallery"]} = ?', (gallery,))
+
+    groups = parse(user_query)
+    if not groups:
+        return None
+    return _compile_groups(groups)
+
+
+def compile_query(user_query: str) -> Optional[CompiledQuery]:
+    """
+    Compiles `user_query` into a WHERE condition, cached per distinct query.
+
+    Parameters
+    -----------
+        user_query (str):
+            A custom query that looks like 'key1=value1 value2 key2>value3 ...'
+
+    Returns
+    --------
+        Optional[CompiledQuery]:
+            None if `user_query` has no terms.
+
+    Raises
+    -------
+        KeyError, ValueError:
+            `user_query` is not valid.
+    """
+    return _compile(_WHITE_SPACES_SUB_PATTERN.sub(" ", user_query).strip())
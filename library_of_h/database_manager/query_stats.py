@@ -0,0 +1,140 @@
+"""
+In-memory instrumentation of the queries run by `DatabaseManager`.
+
+The read and write threads record every query into a `QueryStats` ring buffer,
+`QueryStats.summary` aggregates them per query shape (fingerprint).
+"""
+
+import queue
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Literal, Optional
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_PATTERN = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """
+    Returns `sql` with its literals replaced by '?' and its whitespace collapsed,
+    so that queries differing only in their values have the same fingerprint.
+    """
+    sql = _STRING_LITERAL_PATTERN.sub("?", sql)
+    sql = _NUMBER_LITERAL_PATTERN.sub("?", sql)
+    sql = _PLACEHOLDER_LIST_PATTERN.sub("(?...)", sql)
+    return _WHITESPACE_PATTERN.sub(" ", sql).strip()
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    # Nearest-rank percentile.
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[index]
+
+
+class InstrumentedQueue(queue.Queue):
+    """
+    `queue.Queue` that remembers when each item was put, `last_wait` is how long
+    the last item that was got waited in the queue, in seconds. Only meaningful
+    with a single consumer thread.
+    """
+
+    last_wait = 0.0
+
+    def _put(self, item) -> None:
+        self.queue.append((time.perf_counter(), item))
+
+    def _get(self):
+        enqueued_at, item = self.queue.popleft()
+        self.last_wait = time.perf_counter() - enqueued_at
+        return item
+
+
+class QueryStats:
+    """Thread-safe ring buffer of the timings of the most recent queries."""
+
+    def __init__(self, maxlen: int) -> None:
+        self._records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def record(
+        self,
+        kind: Literal["read", "write", "job"],
+        sql: str,
+        wait: float,
+        execution: float,
+        rows: int,
+        plan: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Parameters
+        -----------
+            kind (Literal["read", "write", "job"]):
+                Queue the query came from, "job" for callables on the write queue.
+            sql (str):
+                The query, or the name of the job.
+            wait (float):
+                Seconds the query waited in its queue.
+            execution (float):
+                Seconds it took to execute the query (and fetch its rows).
+            rows (int):
+                Number of rows read or affected.
+            plan (Optional[list[str]]):
+                Output of `EXPLAIN QUERY PLAN` if it was captured.
+        """
+        record = {
+            "time": time.time(),
+            "kind": kind,
+            "fingerprint": fingerprint(sql),
+            "wait_ms": wait * 1000,
+            "execution_ms": execution * 1000,
+            "rows": rows,
+        }
+        if plan is not None:
+            record["plan"] = plan
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> list[dict]:
+        """
+        Returns
+        --------
+            list[dict]:
+                Count, total rows, p50/p95/p99 of wait and execution times and the
+                latest captured plan of every fingerprint in the buffer, sorted by
+                total execution time, descending.
+        """
+        groups = defaultdict(list)
+        for record in self.records():
+            groups[(record["kind"], record["fingerprint"])].append(record)
+
+        summary = []
+        for (kind, fingerprint_), records in groups.items():
+            shape = {"kind": kind, "fingerprint": fingerprint_, "count": len(records)}
+            shape["rows"] = sum(record["rows"] for record in records)
+            for key in ("wait_ms", "execution_ms"):
+                values = sorted(record[key] for record in records)
+                shape[key] = {
+                    "total": sum(values),
+                    **{f"p{p}": _percentile(values, p) for p in (50, 95, 99)},
+                }
+            plans = [record["plan"] for record in records if "plan" in record]
+            if plans:
+                shape["plan"] = plans[-1]
+            summary.append(shape)
+
+        summary.sort(key=lambda shape: shape["execution_ms"]["total"], reverse=True)
+        return summary
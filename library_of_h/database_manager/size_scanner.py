@@ -0,0 +1,88 @@
+import json
+import os
+from typing import Optional
+
+from library_of_h.importer.constants import SIDECAR_FILE_NAME
+
+
+def directory_size(path: str) -> int:
+    """
+    Sums the sizes of the files under `path`, recursively, using `os.scandir`.
+    Metadata sidecars are not counted, like in the sizes of downloaded galleries.
+
+    Raises
+    -------
+        OSError:
+            `path` could not be listed.
+    """
+    size = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                size += directory_size(entry.path)
+            elif entry.is_file() and not entry.name.startswith(SIDECAR_FILE_NAME):
+                size += entry.stat().st_size
+    return size
+
+
+class SizeScanner:
+    """
+    Computes gallery sizes, caching them along with the modification time of
+    their gallery directory so that unchanged galleries are not listed again.
+
+    Adding, removing or renaming a file changes the modification time of its
+    directory; files rewritten in place with a different size are not noticed.
+    Not thread-safe.
+    """
+
+    def __init__(self, cache_file_path: str) -> None:
+        """
+        Parameters
+        -----------
+            cache_file_path (str):
+                JSON file the cache is loaded from and saved to.
+        """
+        self._cache_file_path = cache_file_path
+        # Location: [directory modification time in ns, size in bytes].
+        self._cache: dict[str, list[int]] = {}
+        try:
+            with open(cache_file_path, "r") as cache_file:
+                self._cache = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+
+    def save(self) -> None:
+        """
+        Raises
+        -------
+            OSError:
+                The cache could not be written.
+        """
+        temporary_file_path = f"{self._cache_file_path}.tmp"
+        with open(temporary_file_path, "w") as cache_file:
+            json.dump(self._cache, cache_file)
+        os.replace(temporary_file_path, self._cache_file_path)
+
+    def size(self, location: str) -> Optional[int]:
+        """
+        Returns
+        --------
+            Optional[int]:
+                Size in bytes of the files under `location`, None if it can not
+                be read.
+        """
+        try:
+            mtime_ns = os.stat(location).st_mtime_ns
+        except OSError:
+            self._cache.pop(location, None)
+            return None
+
+        if (cached := self._cache.get(location)) is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        try:
+            size = directory_size(location)
+        except OSError:
+            return None
+        self._cache[location] = [mtime_ns, size]
+        return size
@@ -0,0 +1,149 @@
+"""
+Downloads galleries without the GUI. The progress of each session is written to
+stdout as JSON lines, see `JsonLinesOutput`, followed by a "summary" event once
+the session ended; the galleries are inserted into the database as with the GUI.
+
+An interrupted run is resumed by running the same command again, see
+`SessionJournal`; SIGINT and SIGTERM cancel the running sessions.
+
+Usage: python -m library_of_h.downloader SERVICE ITEM [ITEM ...] [--type TYPE]
+       [--order ORDER] [--concurrency N] [--database DIRECTORY]
+"""
+
+import argparse
+import importlib
+import signal
+import sys
+from functools import partial
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.constants import SERVICES
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.downloader.json_lines_output import write_json_line
+from library_of_h.downloader.main import SERVICE_CLASSES
+from library_of_h.preferences import Preferences
+
+SIGNAL_CHECK_INTERVAL = 200  # Milliseconds between checks for SIGINT/SIGTERM.
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m library_of_h.downloader")
+    parser.add_argument("service", choices=SERVICES)
+    parser.add_argument(
+        "items",
+        nargs="+",
+        metavar="ITEM",
+        help="items to download, gallery IDs or names of the --type",
+    )
+    parser.add_argument(
+        "--type",
+        default="Gallery ID(s)",
+        help='download type, "Gallery ID(s)", "Artist(s)", "Tag(s)"... as in the GUI',
+    )
+    parser.add_argument(
+        "--order", help="order of the galleries, the service's first one if unset"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of sessions run at once, the items are split between them",
+    )
+    parser.add_argument(
+        "--database",
+        metavar="DIRECTORY",
+        help="directory of the database, overrides database_preferences/location "
+        "for this run only",
+    )
+    args = parser.parse_args(argv)
+
+    module_name, class_name = SERVICE_CLASSES[args.service]
+    constants = importlib.import_module(module_name.rsplit(".", 1)[0] + ".constants")
+    if args.type not in constants.DOWNLOAD_TYPES:
+        parser.error(
+            f"argument --type: invalid choice for {args.service}: {args.type!r} "
+            f"(choose from {', '.join(map(repr, constants.DOWNLOAD_TYPES))})"
+        )
+    order_by = args.order or constants.ORDER_BY[0]
+    if order_by not in constants.ORDER_BY:
+        parser.error(
+            f"argument --order: invalid choice for {args.service}: {order_by!r} "
+            f"(choose from {', '.join(map(repr, constants.ORDER_BY))})"
+        )
+    if args.concurrency < 1:
+        parser.error("argument --concurrency: must be at least 1")
+
+    # The database's read and write threads hold on to two of the pool's threads.
+    qtc.QThreadPool.globalInstance().setMaxThreadCount(4)
+    app = qtc.QCoreApplication(sys.argv[:1])
+    if args.database is not None:
+        Preferences.get_instance()["database_preferences", "location"] = args.database
+
+    if DatabaseManager.get_instance() is None:
+        print("Failed to open the database.", file=sys.stderr)
+        return 1
+
+    service_class = getattr(importlib.import_module(module_name), class_name)
+    # Split round-robin, so that the same command splits them the same way and
+    # each session is resumed from its journal.
+    item_groups = [
+        items
+        for i in range(args.concurrency)
+        if (items := args.items[i :: args.concurrency])
+    ]
+    services = []
+    running = set()
+    canceled = False
+
+    def _session_ended(service, summary: dict) -> None:
+        write_json_line(sys.stdout, service.objectName(), "summary", **summary)
+        running.discard(service.objectName())
+        if not running:
+            DatabaseManager.clean_up()
+            app.quit()
+
+    def _cancel(*_) -> None:
+        nonlocal canceled
+        canceled = True
+        for service in services:
+            service.cancel()
+
+    for i, items in enumerate(item_groups):
+        service = service_class(None)
+        service.setObjectName(
+            f"{args.service}-{i + 1}" if len(item_groups) > 1 else args.service
+        )
+        service.session_ended_signal.connect(partial(_session_ended, service))
+        services.append(service)
+        running.add(service.objectName())
+        # Queued, once the service's state machine entered its initial state.
+        qtc.QTimer.singleShot(
+            0,
+            partial(
+                service.download_requested_signal.emit,
+                ",".join(items),
+                args.type,
+                order_by,
+            ),
+        )
+
+    signal.signal(signal.SIGINT, _cancel)
+    signal.signal(signal.SIGTERM, _cancel)
+    # Python only runs signal handlers between bytecodes, not while the event
+    # loop waits.
+    signal_check_timer = qtc.QTimer()
+    signal_check_timer.timeout.connect(lambda: None)
+    signal_check_timer.start(SIGNAL_CHECK_INTERVAL)
+
+    app.exec()
+    # Waits for the database's threads to commit what is left and for the
+    # metadata sidecars to be written.
+    qtc.QThreadPool.globalInstance().waitForDone()
+    return 130 if canceled else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from PySide6 import QtCore as qtc
 from PySide6 import QtNetwork as qtn
@@ -15,6 +16,9 @@ class NetworkAccessManagerBase(qtn.QNetworkAccessManager):
     _REPLY_TIMEOUT = 10_000  # Microseconds or 10 Seconds
     _REQUEST_COOLDOWN = 2000  # Microseconds or 2 Seconds
 
+    # Set with `set_mock_server_url`.
+    _mock_server_url: Optional[qtc.QUrl] = None
+
     disconnected = qtc.Signal()
     reconnected = qtc.Signal()
 
@@ -81,8 +85,36 @@ class NetworkAccessManagerBase(qtn.QNetworkAccessManager):
     def set_request_header(self, *args: tuple[qtc.QByteArray, qtc.QByteArray]) -> None:
         self._request.setRawHeader(*args)
 
+    @staticmethod
+    def set_mock_server_url(url: Optional[str]) -> None:
+        """
+        Sends the requests of every network access manager to the server at
+        `url` instead, with the original host as the first segment of the path:
+        "https://ltn.hitomi.la/gg.js" is requested as "{url}/ltn.hitomi.la/gg.js".
+        Used to run the downloader offline, see `benchmarks/mock_server.py`.
+
+        Parameters
+        -----------
+            url (Optional[str]):
+                Root URL of the server, None to send the requests to their
+                original hosts again.
+        """
+        NetworkAccessManagerBase._mock_server_url = (
+            None if url is None else qtc.QUrl(url)
+        )
+
     def set_request_url(self, url: str) -> None:
         url = qtc.QUrl(url)
+        mock_server_url = NetworkAccessManagerBase._mock_server_url
+        # URLs read back from a reply were already redirected.
+        if (
+            mock_server_url is not None
+            and url.authority() != mock_server_url.authority()
+        ):
+            redirected_url = qtc.QUrl(mock_server_url)
+            redirected_url.setPath(f"/{url.host()}{url.path()}")
+            redirected_url.setQuery(url.query())
+            url = redirected_url
         self._request.setUrl(url)
 
     def abort(self):
@@ -3,7 +3,8 @@ from __future__ import annotations
 import datetime
 import logging
 import re
-from typing import Generator, Union
+from functools import partial
+from typing import Generator, Optional, Union
 
 from PySide6 import QtCore as qtc
 from PySide6 import QtStateMachine as qsm
@@ -18,9 +19,13 @@ from library_of_h.downloader.custom_sub_classes.download_items_model import \
     DownloadItemsModel
 from library_of_h.downloader.custom_sub_classes.state import State
 from library_of_h.downloader.filter import Filter
+from library_of_h.downloader.json_lines_output import JsonLinesOutput
+from library_of_h.downloader.output_dialog import OutputDialog
 from library_of_h.downloader.output_table_view import ItemsTableView
+from library_of_h.downloader.session_journal import SessionJournal
 from library_of_h.downloader.services.hitomi.gui import HitomiGUI
 from library_of_h.downloader.services.nhentai.gui import nhentaiGUI
+from library_of_h.importer.sidecar import sidecar_data, write_sidecar
 from library_of_h.logger import (DownloaderServiceType, DownloaderSubType,
                                  MainType, get_logger)
 from library_of_h.miscellaneous.functions import get_value_and_unit_from_Bytes
@@ -31,23 +36,52 @@ from library_of_h.signals_hub.signals_hub import (downloader_signals,
 
 class ServiceBase(qtc.QObject):
 
-    gui: GUIBase
+    gui: Optional[GUIBase]
     _filter: Filter
     _logger: logging.Logger
     _file_url_generator: Generator
     _download_files_model: DownloadFilesModel
     _download_items_model: DownloadItemsModel
     _current_working_gallery_metadata: GalleryMetadataBase
+    # Sum of the sizes of the current gallery's files, passed to the database
+    # so that it doesn't have to walk the gallery's directory.
+    _current_gallery_size_in_bytes: int = 0
+    # Number of the current gallery's files that failed, the gallery is then not
+    # recorded as downloaded.
+    _current_gallery_files_failed: int = 0
     _database_manager: DatabaseManager
+    _session_journal: SessionJournal
+
+    # Starts a session with the items, download type and order, emitted by the
+    # GUI's download button.
+    download_requested_signal = qtc.Signal(str, str, str)
+    # Emitted with the summary of a session once it ended.
+    session_ended_signal = qtc.Signal(dict)
 
     _session_initialized = qtc.Signal()
 
-    def __init__(self, output_table_view: ItemsTableView, *args, **kwargs) -> None:
+    def __init__(
+        self, output_table_view: Optional[ItemsTableView], *args, **kwargs
+    ) -> None:
+        """
+        Parameters
+        -----------
+            output_table_view (Optional[ItemsTableView]):
+                View of the session's items, None to run without the GUI: no
+                widgets are created and the progress is written to stdout as
+                JSON lines, see `JsonLinesOutput`.
+        """
         super().__init__(*args, **kwargs)
 
         subclass_name: str = type(self).__name__
-        subclass = HitomiGUI if subclass_name == "Hitomi" else nhentaiGUI
-        self.gui = subclass(*args, **kwargs)
+        if output_table_view is None:
+            self.gui = None
+        else:
+            subclass = HitomiGUI if subclass_name == "Hitomi" else nhentaiGUI
+            self.gui = subclass(*args, **kwargs)
+            self.gui.download_button_clicked_signal.connect(
+                self.download_requested_signal
+            )
         self._logger = get_logger(
             main_type=MainType.DOWNLOADER,
             sub_types=[
@@ -76,8 +110,8 @@ class ServiceBase(qtc.QObject):
         self._s_idle.setObjectName("idle_state")
         self._s_idle.assignProperty(self._machine, "state", 0)
         self._s_idle.addTransition(
-            self.gui,
-            "download_button_clicked_signal(QString, QString ,QString)",
+            self,
+            "download_requested_signal(QString, QString ,QString)",
             self._s_initialize,
         )
 
@@ -111,7 +145,48 @@ class ServiceBase(qtc.QObject):
         """
         raise NotImplementedError
 
+    def _open_session_journal(
+        self, items: list[str], download_type: str, order_by: str
+    ) -> None:
+        """
+        Opens the journal of the session. If the session is resumed, the items
+        that ended in an earlier run are set as such in `_download_items_model`
+        and are skipped.
+        """
+        self._session_journal = SessionJournal(
+            type(self).__name__, download_type, order_by, items
+        )
+        # Set once every item ended, the session is then deleted from the journal.
+        self._session_completed = False
+        if not self._session_journal.resumed:
+            return
+
+        self._logger.info("Resuming download session.")
+        for row, status in enumerate(self._session_journal.item_statuses()):
+            if status != -1:
+                self._download_items_model.setData(
+                    index=self._download_items_model.index(row, 0),
+                    value=status,
+                    for_="status",
+                )  # Set item as ended in an earlier run.
+
+    def _create_output(self) -> Union[OutputDialog, JsonLinesOutput]:
+        if self.gui is None:
+            return JsonLinesOutput(self.objectName() or type(self).__name__)
+        return OutputDialog(parent=self.parent().parent())
+
+    def _set_items_model(self) -> None:
+        if self._output_table_view is not None:
+            self._output_table_view.setModel(self._download_items_model)
+
+    def _remove_items_model(self) -> None:
+        if self._output_table_view is not None:
+            self._output_table_view.remove_table_model()
+
     # MISCELLANEOUS METHODS
+    def _current_item_row(self) -> int:
+        return self._download_items_model.get_current_index().status.row()
+
     def _get_file_url(self, file: FileMetadataBase) -> str:
         """
         Creates a URL corresponding to `file`.
@@ -124,6 +199,44 @@ class ServiceBase(qtc.QObject):
         """
         raise NotImplementedError
 
+    def _get_gallery_metadata(self, gallery_id: int) -> None:
+        """
+        Requests the metadata of the gallery, unless the gallery was completed in
+        an earlier run of the session, then continues to the next gallery.
+        """
+        if self._session_journal.is_gallery_completed(gallery_id):
+            self._logger.debug(
+                f"Gallery completed in an earlier run: GALLERY ID={gallery_id}"
+            )
+            self._session_summary["galleries already downloaded"] += 1
+            # From the event loop, a run of completed galleries would otherwise
+            # recurse.
+            qtc.QTimer.singleShot(0, self._continue_gallery_download)
+            return
+
+        self._logger.info(f"Begin gallery download: GALLERY ID={gallery_id}")
+        self._extractor.get_gallery_metadata(gallery_id)
+
+    def _next_download_item_url(self) -> str:
+        """
+        Moves to the next item that did not end in an earlier run of the session.
+
+        Returns
+        --------
+            str:
+                URL of the item, or the gallery ID if download type is
+                "Gallery ID(s)".
+
+        Raises
+        -------
+            StopIteration:
+                There are no more items.
+        """
+        while True:
+            item = next(self._download_items_model)
+            if self._download_items_model.get_current_data().status == -1:
+                return self._extractor.get_download_item_url(item.item_name)
+
     def _pass_through_filter(
         self, gallery_metadata: GalleryMetadataBase
     ) -> Union[str, bool]:
@@ -162,11 +275,11 @@ class ServiceBase(qtc.QObject):
         """
         self._logger.debug("Session began.")
         try:
-            url_or_gallery_id = self._extractor.get_download_item_url(
-                next(self._download_items_model).item_name
-            )
+            url_or_gallery_id = self._next_download_item_url()
         except StopIteration:
-            pass
+            # Every item ended in an earlier run.
+            self._session_completed = True
+            self._machine.stop()
         else:
             self._output_dialog.show()
             self._begin_item_download(url_or_gallery_id)
@@ -192,10 +305,9 @@ class ServiceBase(qtc.QObject):
     # CONTINUE METHODS
     def _continue_item_download(self) -> None:
         try:
-            url_or_gallery_id = self._extractor.get_download_item_url(
-                next(self._download_items_model).item_name
-            )
+            url_or_gallery_id = self._next_download_item_url()
         except StopIteration:
+            self._session_completed = True
             self._machine.stop()
         else:
             self._begin_item_download(url_or_gallery_id)
@@ -209,6 +321,7 @@ class ServiceBase(qtc.QObject):
 
     def _gallery_filtered_out(self, gallery_id: str, info: str) -> None:
         self._session_summary["galleries filtered"] += 1
+        self._session_journal.complete_gallery(gallery_id)
         self._logger.info(
             f"[{info}] " f"Gallery filtered out: GALLERY ID={gallery_id}."
         )
@@ -219,10 +332,10 @@ class ServiceBase(qtc.QObject):
         """
         Denotes the completion of one file in the current gallery.
         """
+        file_size = self._download_files_model.get_current_data().file_size
         self._session_summary["files downloaded"] += 1
-        self._session_summary[
-            "total download size"
-        ] += self._download_files_model.get_current_data().file_size
+        self._session_summary["total download size"] += file_size
+        self._current_gallery_size_in_bytes += file_size
 
         self._output_dialog.update_file_progress()
         try:
@@ -238,15 +351,48 @@ class ServiceBase(qtc.QObject):
         """
         Denotes the completion of one gallery in the current item.
         """
+        if self._current_gallery_files_failed:
+            # Downloaded again by the next session.
+            self._logger.warning(
+                "Gallery incomplete, not added to the database: "
+                f"FILES FAILED={self._current_gallery_files_failed}, "
+                f"LOCATION={self._current_working_gallery_metadata.location}"
+            )
+            self._continue_gallery_download()
+            return
+
         self._logger.info(
             f"Finished gallery download: LOCATION={self._current_working_gallery_metadata.location}"
         )
         self._session_summary["galleries downloaded"] += 1
+        self._session_journal.complete_gallery(
+            self._current_working_gallery_metadata.gallery_id
+        )
         self._database_manager.insert_into_database(
-            self._current_working_gallery_metadata
+            self._current_working_gallery_metadata,
+            self._current_gallery_size_in_bytes,
+        )
+        # Hashing the files is done on the thread pool.
+        qtc.QThreadPool.globalInstance().start(
+            partial(
+                self._write_sidecar,
+                self._current_working_gallery_metadata.location,
+                sidecar_data(
+                    self._current_working_gallery_metadata,
+                    int(datetime.datetime.today().timestamp()),
+                ),
+            )
         )
         self._continue_gallery_download()
 
+    def _write_sidecar(self, location: str, data: dict) -> None:
+        try:
+            write_sidecar(location, data)
+        except OSError as e:
+            self._logger.error(
+                f"[{e}] Failed to write gallery metadata sidecar: LOCATION={location}"
+            )
+
     def _end_item_download(self) -> None:
         """
         Denotes the completion of one item in the current session.
@@ -255,6 +401,7 @@ class ServiceBase(qtc.QObject):
             f'Finished item download: ITEM="{self._download_items_model.current().item_name}"'
         )
         self._session_summary["items completed"] += 1
+        self._session_journal.set_item_status(self._current_item_row(), 1)
         # Here because each item will have a new set of galleries.
         self._output_dialog.reset_gallery_progress_value()
 
@@ -306,6 +453,12 @@ class ServiceBase(qtc.QObject):
         if hasattr(self, "_current_working_gallery_metadata"):
             del self._current_working_gallery_metadata
 
+        if hasattr(self, "_session_journal"):
+            if self._session_completed:
+                self._session_journal.finish()
+            self._session_journal.close()
+            del self._session_journal
+
     def _show_session_summary(self):
         result = re.findall(
             "(\d+) days, (\d{,2}):(\d{,2}):(\d{,2})\.\d*",
@@ -356,9 +509,10 @@ class ServiceBase(qtc.QObject):
                 self._session_summary["galleries already downloaded"]
             )
             + "{} files downloaded.\n".format(self._session_summary["files downloaded"])
-            + "{} files already downloaded.".format(
+            + "{} files already downloaded.\n".format(
                 self._session_summary["files already downloaded"]
             )
+            + "{} files failed.".format(self._session_summary["files failed"])
         )
 
         self._summary_dialog = qtw.QMessageBox(
@@ -385,7 +539,13 @@ class ServiceBase(qtc.QObject):
         """
         self._deinitialize_session()
         if hasattr(self, "_session_summary"):
-            self._show_session_summary()
+            if self.gui is None:
+                self._session_summary["total time taken"] = (
+                    self._total_download_time_elapsed_timer.elapsed() // 1000
+                )  # Seconds.
+            else:
+                self._show_session_summary()
+            self.session_ended_signal.emit(self._session_summary.copy())
             session_summary = self._session_summary.copy()
             session_summary["total download size"] = " ".join(
                 map(
@@ -400,6 +560,9 @@ class ServiceBase(qtc.QObject):
                 "Session ended: SUMMARY="
                 + str(session_summary).replace(": ", "=").replace("'", '"')
             )
+            if self.gui is None:
+                # Emitted once the summary dialog is closed with the GUI.
+                downloader_signals.download_session_finished_signal.emit()
 
     # SLOTS
     def _get_file_slot(self) -> None:
@@ -415,6 +578,7 @@ class ServiceBase(qtc.QObject):
             f'"{invalid_item}"'
         )
         self._session_summary["items invalid"] += 1
+        self._session_journal.set_item_status(self._current_item_row(), -3)
         # Here because each item will have a new set of galleries.
         self._output_dialog.reset_gallery_progress_value()
 
@@ -427,6 +591,17 @@ class ServiceBase(qtc.QObject):
         )  # Set current item as completed.
         self._continue_item_download()
 
+    def _file_failed_slot(self, file_path: str) -> None:
+        self._session_summary["files failed"] += 1
+        self._current_gallery_files_failed += 1
+        self._output_dialog.update_file_progress()
+        try:
+            url = next(self._file_url_generator)
+        except StopIteration:
+            self._end_gallery_download()
+        else:
+            self._downloader.start_file_download(url)
+
     def _gallery_file_already_exists_slot(
         self, current_working_loca_filename: str
     ) -> None:
@@ -434,6 +609,11 @@ class ServiceBase(qtc.QObject):
             f"File already exists: LOCATION={current_working_loca_filename}"
         )
         self._session_summary["files already downloaded"] += 1
+        # The size of the local file, `start_file_download` does not request the
+        # remote file's.
+        self._current_gallery_size_in_bytes += (
+            self._download_files_model.get_current_data().file_size
+        )
         self._output_dialog.update_file_progress()
         self._download_files_model.setData(
             index=self._download_files_model.get_current_index().status,
@@ -463,11 +643,16 @@ class ServiceBase(qtc.QObject):
                 )
             else:
                 self._session_summary["galleries already downloaded"] += 1
+                self._session_journal.complete_gallery(
+                    self._current_working_gallery_metadata.gallery_id
+                )
                 self._continue_gallery_download()
                 return
         self._downloader.set_current_working_gallery_metadata(
             self._current_working_gallery_metadata
         )
+        self._current_gallery_size_in_bytes = 0
+        self._current_gallery_files_failed = 0
         self._begin_file_download()
 
     def _metadata_ready_slot(self, gallery_metadata: GalleryMetadataBase) -> None:
@@ -523,6 +708,11 @@ class ServiceBase(qtc.QObject):
         # To be thought of/to be implemented.
         pass
 
+    def cancel(self) -> None:
+        """Cancels the running session, like the output dialog's button."""
+        if self._machine.property("state") == 2:
+            self._output_dialog_canceled_slot()
+
     def close(self) -> Union[dict, None]:
         results = {}
         if hasattr(self, "_downloader"):
@@ -1,8 +1,8 @@
 import logging
 import os
+from functools import partial
 from weakref import proxy
 
-import magic
 from PySide6 import QtCore as qtc
 from PySide6 import QtNetwork as qtn
 
@@ -10,6 +10,8 @@ from library_of_h.custom_widgets.elapsed_timer import ElapsedTimer
 from library_of_h.downloader.base_classes.metadata import GalleryMetadataBase
 from library_of_h.downloader.base_classes.network_access_manager import \
     NetworkAccessManagerBase
+from library_of_h.downloader.constants import (DOWNLOAD_WRITE_BUFFER_SIZE,
+                                               PART_FILE_SUFFIX)
 from library_of_h.downloader.custom_sub_classes.download_files_model import \
     DownloadFilesModel
 from library_of_h.logger import (DownloaderServiceType, DownloaderSubType,
@@ -21,17 +23,28 @@ class ServiceDownloaderBase(qtc.QObject):
 
     _logger: logging.Logger
     _current_working_local_file: qtc.QFile
+    _current_working_file_path: str
     _network_access_manager: NetworkAccessManagerBase
     _current_working_gallery_metadata: GalleryMetadataBase
 
     get_file_signal = qtc.Signal()
     file_finished_signal = qtc.Signal()
+    # Emitted with the path of a file that was downloaded but could not be
+    # moved to it.
+    file_failed_signal = qtc.Signal(str)
     gallery_file_already_exist_signal = qtc.Signal(str)
 
     def __init__(self) -> None:
         super().__init__()
 
         self._current_downloading_file_size = 0
+        self._write_buffer = bytearray()
+        # Whether the running GET continues the local file from its size.
+        self._range_requested = False
+        # Size of the ".part" file the download resumed, not counted by the
+        # replies' progress.
+        self._resume_offset = 0
+        self._actual_total_bytes = 0
         self._logger = get_logger(
             main_type=MainType.DOWNLOADER,
             sub_types=[
@@ -68,24 +81,35 @@ class ServiceDownloaderBase(qtc.QObject):
             )
             return
 
+        # Files are downloaded into a ".part" file that is renamed once complete,
+        # so a file under its final name is always a complete one.
+        self._current_working_file_path = os.path.join(abs_save_destination, filename)
         self._current_working_local_file = qtc.QFile(
-            os.path.join(abs_save_destination, filename)
+            self._current_working_file_path + PART_FILE_SUFFIX
         )
 
-    def _write_to_disk(self, data: qtc.QByteArray) -> None:
-        if self._current_working_local_file.write(data) == -1:
+    def _flush_write_buffer(self) -> None:
+        if not self._write_buffer:
+            return
+        if self._current_working_local_file.write(bytes(self._write_buffer)) == -1:
             self._logger.error(
                 f"[{self._current_working_local_file.errorString()}] "
                 "Error writing to file: "
                 f'FILE="{self._current_working_local_file.fileName()}"'
             )
+        self._write_buffer.clear()
+
+    def _write_to_disk(self, data: qtc.QByteArray) -> None:
+        self._write_buffer += data.data()
+        if len(self._write_buffer) >= DOWNLOAD_WRITE_BUFFER_SIZE:
+            self._flush_write_buffer()
 
     def _download_progress_slot(self, bytes_received: int, total_bytes: int) -> None:
         # To keep track of the appropriate amount for bytes received even after
         # a network disconnection; `_continue`ing causes `bytes_received` to
         # re-start from 0.
         self._actual_total_bytes = max(self._actual_total_bytes, total_bytes)
-        bytes_received += self._actual_total_bytes - total_bytes
+        bytes_received += self._resume_offset + self._actual_total_bytes - total_bytes
         self._download_files_model.setData(
             index=self._download_files_model.get_current_index().download_progress,
             value=bytes_received,
@@ -105,6 +129,21 @@ class ServiceDownloaderBase(qtc.QObject):
         )  # Set progress for current downloading file.
 
     def _ready_read_slot(self) -> None:
+        import magic
+
+        if self._range_requested:
+            self._range_requested = False
+            if (
+                self._network_access_manager.reply.attribute(
+                    qtn.QNetworkRequest.Attribute.HttpStatusCodeAttribute
+                )
+                != 206
+            ):
+                # The server ignored the Range header and sends the whole file.
+                self._current_working_local_file.resize(0)
+                self._resume_offset = 0
+                self._actual_total_bytes = 0
+
         data = self._network_access_manager.reply.readAll()
         if "text/html" == magic.from_buffer(data.data(), mime=True):
             self._logger.error(
@@ -126,26 +165,61 @@ class ServiceDownloaderBase(qtc.QObject):
         self.get_file_signal.emit()
 
     def start_file_download(self, url: str) -> None:
-        self._logger.info(f"Begin file download: URL={url}")
+        if (
+            os.path.exists(self._current_working_file_path)
+            and not Preferences.get_instance()["download_preferences"]["overwrite"]
+        ):
+            # The file is complete, no need to ask for the remote file's size.
+            self._download_files_model.setData(
+                index=self._download_files_model.get_current_index().file_size,
+                value=os.path.getsize(self._current_working_file_path),
+                for_="size",
+            )  # Set size of current to-be-downloaded file from the local file.
+            # Emitted from the event loop, the slot starts the next file's
+            # download and a gallery's files would otherwise recurse.
+            qtc.QTimer.singleShot(
+                0,
+                partial(
+                    self.gallery_file_already_exist_signal.emit,
+                    self._current_working_file_path,
+                ),
+            )
+            return
+
+        self._logger.info(
+            f"Begin file download: URL={url}",
+            extra={
+                "gallery_id": self._current_working_gallery_metadata.gallery_id,
+                "url": url,
+            },
+        )
         self._HEAD(url)
 
+    def _open_local_file(self, mode: qtc.QIODevice.OpenModeFlag) -> bool:
+        # Writes are buffered by `_write_to_disk`.
+        if not self._current_working_local_file.open(
+            mode | qtc.QIODevice.OpenModeFlag.Unbuffered
+        ):
+            self._logger.error(
+                f"[{self._current_working_local_file.errorString()}] "
+                "Error opening file: "
+                f'FILE="{self._current_working_local_file.fileName()}"'
+            )
+            return False
+        return True
+
     def _continue(self, url: str) -> None:
-        if not self._current_working_local_file.isOpen():
-            if not self._current_working_local_file.open(
-                qtc.QFile.OpenModeFlag.Append | qtc.QIODevice.OpenModeFlag.Text
-            ):
-                self._logger.error(
-                    f"[{self._current_working_local_file.errorString()}] "
-                    "Error opening file: "
-                    f'FILE="{self._current_working_local_file.fileName()}"'
-                )
-                return
+        if self._current_working_local_file.isOpen():
+            self._flush_write_buffer()
+        elif not self._open_local_file(qtc.QFile.OpenModeFlag.Append):
+            return
         self._network_access_manager.set_request_header(
             qtc.QByteArray(b"Range"),
             qtc.QByteArray(
                 f"bytes={self._current_working_local_file.size()}-".encode("utf-8")
             ),
         )
+        self._range_requested = self._current_working_local_file.size() > 0
         self._network_access_manager.set_request_url(url)
         self._network_access_manager.get(
             reconnect_callback=lambda: self._continue(url),
@@ -154,39 +228,36 @@ class ServiceDownloaderBase(qtc.QObject):
             readyRead=self._ready_read_slot,
         )
 
-    def _check_file_existence(self) -> bool:
-        """
-        Checks if a file already exists.
-
-        Returns
-        --------
-            True: File exists.
-            False: File does not exist.
-        """
-        if (
-            self._current_working_local_file.exists()
-            and self._current_working_local_file.size()
-            == self._current_downloading_file_size
-        ):
-            return True
-        return False
-
     def _handle_network_runtime_error(
         self, error: qtn.QNetworkReply.NetworkError
     ) -> int:
         return self._network_access_manager.handle_error(error)
 
-    def _begin_download(self) -> None:
-        if not self._current_working_local_file.isOpen():
-            if not self._current_working_local_file.open(
-                qtc.QFile.OpenModeFlag.WriteOnly | qtc.QIODevice.OpenModeFlag.Text
-            ):
-                self._logger.error(
-                    f"[{self._current_working_local_file.errorString()}] "
-                    "Error opening file: "
-                    f'FILE="{self._current_working_local_file.fileName()}"'
-                )
-                return
+    def _begin_download(self, resume: bool = True) -> None:
+        """
+        Downloads the current file into its ".part" file.
+
+        Parameters
+        -----------
+            resume (bool):
+                Whether to continue the ".part" file left by an interrupted
+                download, only done if the remote file's size is known.
+        """
+        if self._current_working_local_file.isOpen():
+            self._current_working_local_file.close()
+        self._write_buffer.clear()
+
+        offset = 0
+        if resume and self._current_working_local_file.exists():
+            offset = self._current_working_local_file.size()
+            if not 0 < offset <= self._current_downloading_file_size:
+                offset = 0
+        if not self._open_local_file(
+            qtc.QFile.OpenModeFlag.Append
+            if offset
+            else qtc.QFile.OpenModeFlag.WriteOnly | qtc.QFile.OpenModeFlag.Truncate
+        ):
+            return
 
         self._download_files_model.setData(
             index=self._download_files_model.get_current_index().status,
@@ -194,9 +265,26 @@ class ServiceDownloaderBase(qtc.QObject):
             for_="status",
         )  # Set status of current to-be-downloaded file.
 
+        self._resume_offset = offset
         self._actual_total_bytes = 0
         self._download_timer.start()
+        if offset == self._current_downloading_file_size:
+            # Downloaded completely, but not renamed.
+            self._finish_file()
+            return
+
+        if offset:
+            self._logger.info(
+                f"Resuming file download: BYTES={offset}, "
+                f'FILE="{self._current_working_local_file.fileName()}"'
+            )
+            self._network_access_manager.set_request_header(
+                qtc.QByteArray(b"Range"),
+                qtc.QByteArray(f"bytes={offset}-".encode("utf-8")),
+            )
+        self._range_requested = offset > 0
         url = self._network_access_manager.reply.url().toString()
+        self._network_access_manager.set_request_url(url)
         self._network_access_manager.get(
             reconnect_callback=lambda: self._continue(url),
             finished=self._GET_finished_slot,
@@ -252,17 +340,9 @@ class ServiceDownloaderBase(qtc.QObject):
             for_="size",
         )  # Set size of current to-be-downloaded file.
 
-        if self._check_file_existence():
-            # If file already exists
-            if Preferences.get_instance()["download_preferences"]["overwrite"]:
-                # If the user wants existing downloads to be overwritten
-                self._begin_download()
-            else:
-                self.gallery_file_already_exist_signal.emit(
-                    self._current_working_local_file.fileName()
-                )
-        else:
-            self._begin_download()
+        # Existing files were skipped by `start_file_download` unless they are to
+        # be overwritten, they are replaced once the download completes.
+        self._begin_download()
 
     def _GET_finished_slot(self) -> None:
         self._network_access_manager.set_request_header(
@@ -282,28 +362,74 @@ class ServiceDownloaderBase(qtc.QObject):
         elif handled != 0:
             return
 
+        self._finish_file()
+
+    def _finish_file(self) -> None:
+        """
+        Checks the size of the downloaded ".part" file and renames it to the
+        file's name, or downloads it again if it is incomplete.
+        """
         if self._current_working_local_file.isOpen():
+            self._flush_write_buffer()
+            if Preferences.get_instance()["download_preferences", "fsync"] == "file":
+                try:
+                    os.fsync(self._current_working_local_file.handle())
+                except OSError as e:
+                    self._logger.warning(
+                        f"[{e}] Error syncing file to disk: "
+                        f'FILE="{self._current_working_local_file.fileName()}"'
+                    )
             self._current_working_local_file.close()
 
-            if (
-                self._current_downloading_file_size != -1
-                and self._current_downloading_file_size
-                != self._current_working_local_file.size()
-            ):
-                self._logger.warning(
-                    "[Size Mismatch] Error downloading file: re-downloading."
-                )
-                self._begin_download()
-                return
-            elif self._current_downloading_file_size == -1:
-                self._logger.warning(
-                    "[Invalid Remote File Size] Unable to perform file size check: "
-                    f"URL={self._network_access_manager.reply.url().toString()}; "
-                    f'FILE="{self._current_working_local_file.fileName()}"'
-                )
+        if (
+            self._current_downloading_file_size != -1
+            and self._current_downloading_file_size
+            != self._current_working_local_file.size()
+        ):
+            self._logger.warning(
+                "[Size Mismatch] Error downloading file: re-downloading."
+            )
+            self._begin_download(resume=False)
+            return
+        elif self._current_downloading_file_size == -1:
+            self._logger.warning(
+                "[Invalid Remote File Size] Unable to perform file size check: "
+                f"URL={self._network_access_manager.reply.url().toString()}; "
+                f'FILE="{self._current_working_file_path}"'
+            )
+            self._download_files_model.setData(
+                index=self._download_files_model.get_current_index().file_size,
+                value=self._current_working_local_file.size(),
+                for_="size",
+            )  # Set size of current downloaded file from the local file.
+
+        try:
+            os.replace(
+                self._current_working_local_file.fileName(),
+                self._current_working_file_path,
+            )
+        except OSError as e:
+            # Not an error, which would halt the session, the next file is
+            # downloaded.
+            self._logger.warning(
+                f"[{e}] Error renaming downloaded file, skipping it: "
+                f'FILE="{self._current_working_local_file.fileName()}"'
+            )
+            self._download_files_model.setData(
+                index=self._download_files_model.get_current_index().status,
+                value=-2,
+                for_="status",
+            )  # Set status of current to-be-downloaded file.
+            self.file_failed_signal.emit(self._current_working_file_path)
+            return
 
         self._logger.info(
-            f"Finished file download: LOCATION={self._current_working_local_file.fileName()}"
+            f"Finished file download: LOCATION={self._current_working_file_path}",
+            extra={
+                "gallery_id": self._current_working_gallery_metadata.gallery_id,
+                "url": self._network_access_manager.reply.url().toString(),
+                "duration": self._download_timer.elapsed() / 1000,
+            },
         )
 
         self._download_files_model.setData(
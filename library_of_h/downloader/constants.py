@@ -0,0 +1,2 @@
+PART_FILE_SUFFIX = ".part"  # Appended to files until they are completely downloaded.
+DOWNLOAD_WRITE_BUFFER_SIZE = 1 << 20  # Bytes received before writing them to disk.
@@ -32,7 +32,7 @@ class TableRowIndices(NamedTuple):
 class DownloadFilesModel(qtc.QAbstractTableModel):
 
     _HEADERS = {0: "Status", 1: "File name", 2: "File size", 3: "Speed", 4: "Progress"}
-    _STATUS = {-1: "Pending", 0: "Downloading", 1: "Completed"}
+    _STATUS = {-2: "Failed", -1: "Pending", 0: "Downloading", 1: "Completed"}
 
     _data: TableData
 
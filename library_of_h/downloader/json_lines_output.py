@@ -0,0 +1,111 @@
+import json
+import sys
+import time
+from typing import Optional, TextIO
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.downloader.custom_sub_classes.download_files_model import \
+    DownloadFilesModel
+
+
+def write_json_line(stream: TextIO, session: str, event: str, **fields) -> None:
+    """Writes an event of the session to `stream` as a line of JSON."""
+    stream.write(
+        json.dumps(
+            {"time": round(time.time(), 3), "session": session, "event": event}
+            | fields,
+            ensure_ascii=False,
+        )
+        + "\n"
+    )
+    stream.flush()
+
+
+class JsonLinesOutput(qtc.QObject):
+    """
+    Counterpart of `OutputDialog` for sessions run without the GUI, the progress
+    is written to a stream as JSON lines, one object per event:
+
+        {"time": ..., "session": ..., "event": "galleries", "total": ...}
+        {"time": ..., "session": ..., "event": "files", "total": ...}
+        {"time": ..., "session": ..., "event": "file", "name": ..., "size": ...,
+         "done": ..., "total": ...}
+        {"time": ..., "session": ..., "event": "gallery", "done": ..., "total": ...}
+    """
+
+    canceled_signal = qtc.Signal()
+
+    def __init__(
+        self, session: str, stream: Optional[TextIO] = None, *args, **kwargs
+    ) -> None:
+        """
+        Parameters
+        -----------
+            session (str):
+                Name of the session, written with every event.
+            stream (Optional[TextIO]):
+                Stream the events are written to, `sys.stdout` if None.
+        """
+        super().__init__(*args, **kwargs)
+        self._session = session
+        self._stream = sys.stdout if stream is None else stream
+        self._files_model: Optional[DownloadFilesModel] = None
+        self._gallery_progress = 0
+        self._gallery_progress_max_value = 0
+        self._file_progress = 0
+        self._file_progress_max_value = 0
+
+    def write(self, event: str, **fields) -> None:
+        write_json_line(self._stream, self._session, event, **fields)
+
+    def show(self) -> None:
+        self.write("started")
+
+    def setDisabled(self, disabled: bool) -> None:
+        pass
+
+    def reset_gallery_progress_value(self) -> None:
+        self._gallery_progress = 0
+
+    def reset_file_progress_value(self) -> None:
+        self._file_progress = 0
+
+    def set_gallery_progress_max_value(self, max_value: int) -> None:
+        self._gallery_progress_max_value = max_value
+        self.write("galleries", total=max_value)
+
+    def set_file_progress_max_value(self, max_value: int) -> None:
+        self._file_progress_max_value = max_value
+        self.write("files", total=max_value)
+
+    def get_gallery_progress_max_value(self) -> int:
+        return self._gallery_progress_max_value
+
+    def get_file_progress_max_value(self) -> int:
+        return self._file_progress_max_value
+
+    def update_gallery_progress(self) -> None:
+        self._gallery_progress += 1
+        self.write(
+            "gallery",
+            done=self._gallery_progress,
+            total=self._gallery_progress_max_value,
+        )
+
+    def update_file_progress(self) -> None:
+        self._file_progress += 1
+        current_file = self._files_model.get_current_data()
+        self.write(
+            "file",
+            name=current_file.filename,
+            size=current_file.file_size,
+            done=self._file_progress,
+            total=self._file_progress_max_value,
+        )
+
+    def remove_table_model(self) -> None:
+        self._files_model = None
+
+    def set_table_model(self, model: DownloadFilesModel) -> None:
+        self._files_model = model
@@ -1,3 +1,5 @@
+import importlib
+
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 from PySide6 import QtWidgets as qtw
@@ -6,10 +8,14 @@ from library_of_h.constants import SERVICES
 from library_of_h.custom_widgets.combo_box import ComboBox
 from library_of_h.custom_widgets.separation_lines import HSeperationLine
 from library_of_h.downloader.output_table_view import ItemsTableView
-from library_of_h.downloader.services.hitomi.main import Hitomi
-from library_of_h.downloader.services.nhentai.main import nhentai
 from library_of_h.signals_hub.signals_hub import downloader_signals
 
+# Modules and classes of the services, imported when a service is first selected.
+SERVICE_CLASSES = {
+    "Hitomi": ("library_of_h.downloader.services.hitomi.main", "Hitomi"),
+    "nhentai": ("library_of_h.downloader.services.nhentai.main", "nhentai"),
+}
+
 
 class Downloader(qtw.QWidget):
     def __init__(self, *args, **kwargs) -> None:
@@ -67,19 +73,18 @@ class Downloader(qtw.QWidget):
     def _create_download_stack(self) -> None:
         self._download_stack = qtw.QStackedWidget(parent=self)
         self._download_stack.setMaximumHeight(195)
-        for service_name, service_widget in zip(
-            SERVICES,
-            (
-                Hitomi,
-                nhentai,
-            ),
-        ):
+
+    def _get_service(self, service_name: str):
+        if service_name not in self._services:
+            module_name, class_name = SERVICE_CLASSES[service_name]
+            service_widget = getattr(importlib.import_module(module_name), class_name)
             widget = service_widget(self._items_table_view, self)
             self._download_stack.addWidget(widget.gui)
             self._services[service_name] = widget
+        return self._services[service_name]
 
     def _service_combo_box_current_text_changed_slot(self, service_name: str) -> None:
-        self._download_stack.setCurrentWidget(self._services[service_name].gui)
+        self._download_stack.setCurrentWidget(self._get_service(service_name).gui)
 
     def _download_session_began_slot(self) -> None:
         self._service_combo_box.setDisabled(True)
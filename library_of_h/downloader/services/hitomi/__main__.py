@@ -1,5 +1,10 @@
-from library_of_h.downloader.services.hitomi import checks
-from library_of_h.downloader.services.hitomi.temp_main import main
+"""
+Downloads from Hitomi without the GUI, same as
+`python -m library_of_h.downloader Hitomi ...`.
+"""
 
-checks.main()
-main()
+import sys
+
+from library_of_h.downloader.__main__ import main
+
+sys.exit(main(["Hitomi", *sys.argv[1:]]))
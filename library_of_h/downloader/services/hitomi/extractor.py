@@ -140,9 +140,8 @@ class HitomiExtractor(qtc.QObject):
 
         reply_text = self._network_access_manager.reply.readAll().data()
 
-        total_galleries = len(reply_text) // 4
-        self._nozomi_generator = self._get_nozomi_from_bytes(reply_text)
-        self.nozomi_ready_signal.emit(total_galleries)
+        self.set_nozomi(list(self._get_nozomi_from_bytes(reply_text)))
+        self.nozomi_ready_signal.emit(len(self._nozomi))
 
     def _get_nozomi(self, nozomi_address: str) -> None:
         self._network_access_manager.set_request_url("https://" + nozomi_address)
@@ -151,6 +150,23 @@ class HitomiExtractor(qtc.QObject):
             finished=self._get_nozomi_finished_slot,
         )
 
+    def get_nozomi(self) -> list[int]:
+        """
+        Returns
+        --------
+            list[int]:
+                Gallery IDs of the current item.
+        """
+        return self._nozomi
+
+    def set_nozomi(self, gallery_ids: list[int]) -> None:
+        """
+        Sets the gallery IDs of the current item, `next_nozomi` iterates over
+        them.
+        """
+        self._nozomi = gallery_ids
+        self._nozomi_generator = iter(gallery_ids)
+
     def next_nozomi(self) -> int:
         try:
             return next(self._nozomi_generator)
@@ -9,7 +9,6 @@ from library_of_h.downloader.custom_sub_classes.download_files_model import \
 from library_of_h.downloader.custom_sub_classes.download_items_model import \
     DownloadItemsModel
 from library_of_h.downloader.filter import Filter
-from library_of_h.downloader.output_dialog import OutputDialog
 from library_of_h.downloader.services.hitomi.common import (
     url_from_url, url_from_url_from_hash)
 from library_of_h.downloader.services.hitomi.downloader import HitomiDownloader
@@ -43,6 +42,7 @@ class Hitomi(ServiceBase):
             "galleries already downloaded": 0,
             "files downloaded": 0,
             "files already downloaded": 0,
+            "files failed": 0,
             "total download size": 0,
             "total time taken": 0,
         }
@@ -63,7 +63,7 @@ class Hitomi(ServiceBase):
 
         self._network_access_manager = HitomiNetworkAccessManager()
 
-        self._output_dialog = OutputDialog(parent=self.parent().parent())
+        self._output_dialog = self._create_output()
 
         self._extractor = HitomiExtractor()
         self._downloader = HitomiDownloader()
@@ -84,6 +84,7 @@ class Hitomi(ServiceBase):
         )
         self._downloader.get_file_signal.connect(self._get_file_slot)
         self._downloader.file_finished_signal.connect(self._end_file_download)
+        self._downloader.file_failed_signal.connect(self._file_failed_slot)
         self._downloader.set_network_access_manager(self._network_access_manager)
 
         self._output_dialog.canceled_signal.connect(self._output_dialog_canceled_slot)
@@ -92,7 +93,7 @@ class Hitomi(ServiceBase):
             self._gg_error_handled_slot
         )
 
-        self._output_table_view.remove_table_model()
+        self._remove_items_model()
 
         self._logger.debug("Preparing download items data model.")
         if hasattr(self, "_download_items_model"):
@@ -112,7 +113,8 @@ class Hitomi(ServiceBase):
         self._logger.info(
             f"{self._download_items_model.rowCount()} {('item', 'items')[self._download_items_model.rowCount() != 1]} found."
         )
-        self._output_table_view.setModel(self._download_items_model)
+        self._set_items_model()
+        self._open_session_journal(items, download_type, order_by)
 
         self._session_initialized.emit()
 
@@ -193,12 +195,21 @@ class Hitomi(ServiceBase):
             else:
                 self._begin_gallery_download(total_galleries=1, gallery_id=gallery_id)
         else:
-            self._extractor.fetch_nozomi(url_or_gallery_id)
+            gallery_ids = self._session_journal.item_galleries(self._current_item_row())
+            if not gallery_ids:
+                self._extractor.fetch_nozomi(url_or_gallery_id)
             self._download_items_model.setData(
                 index=self._download_items_model.get_current_index().status,
                 value=0,
                 for_="status",
             )  # Set current item as downloading.
+            if gallery_ids:
+                # Resolved in an earlier run of the session.
+                self._extractor.set_nozomi(gallery_ids)
+                self._begin_gallery_download(
+                    total_galleries=len(gallery_ids),
+                    gallery_id=self._extractor.next_nozomi(),
+                )
 
     def _begin_gallery_download(self, total_galleries: int, gallery_id: int) -> None:
         """
@@ -215,8 +226,7 @@ class Hitomi(ServiceBase):
             f"{total_galleries} {('gallery', 'galleries')[total_galleries != 1]} found."
         )
         self._output_dialog.set_gallery_progress_max_value(total_galleries)
-        self._logger.info(f"Begin gallery download: GALLERY ID={gallery_id}")
-        self._extractor.get_gallery_metadata(gallery_id)
+        self._get_gallery_metadata(gallery_id)
 
     def _begin_file_download(self) -> None:
         """
@@ -259,8 +269,7 @@ class Hitomi(ServiceBase):
 
         if (gallery_id := self._extractor.next_nozomi()) != -1:
             # -1 denotes "no more items left"
-            self._logger.info(f"Begin gallery download: GALLERY ID={gallery_id}")
-            self._extractor.get_gallery_metadata(gallery_id)
+            self._get_gallery_metadata(gallery_id)
 
     # SLOTS
     def _get_file_slot(self, type_: str) -> None:
@@ -280,6 +289,9 @@ class Hitomi(ServiceBase):
         self._downloader.start_file_download(url)
 
     def _nozomi_ready_slot(self, total_galleries: int) -> None:
+        self._session_journal.set_item_galleries(
+            self._current_item_row(), self._extractor.get_nozomi()
+        )
         gallery_id = self._extractor.next_nozomi()
         if gallery_id != -1:
             self._begin_gallery_download(
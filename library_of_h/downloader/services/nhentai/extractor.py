@@ -5,7 +5,6 @@ import json
 import re
 from weakref import proxy
 
-from bs4 import BeautifulSoup
 from PySide6 import QtCore as qtc
 
 from library_of_h.downloader.services.nhentai.constants import *
@@ -68,6 +67,8 @@ class nhentaiExtractor(qtc.QObject):
         self._network_access_manager = proxy(network_access_manager)
 
     def _parse_page_html(self) -> None:
+        from bs4 import BeautifulSoup
+
         text = self._network_access_manager.reply.readAll().data().decode("utf-8")
         soup = BeautifulSoup(text, "lxml")
 
@@ -134,6 +135,8 @@ class nhentaiExtractor(qtc.QObject):
         self.page_ready_signal.emit(total_galleries)
 
     def _parse_gallery_html(self) -> None:
+        from bs4 import BeautifulSoup
+
         text = self._network_access_manager.reply.readAll().data().decode("utf-8")
         soup = BeautifulSoup(text, "lxml")
 
@@ -211,7 +214,12 @@ class nhentaiExtractor(qtc.QObject):
         try:
             self._current_gallery = next(self._galleries)
         except StopIteration:
-            self._get_next_page()
+            if self._download_category == "":
+                # A gallery ID's only gallery was read from its own page.
+                self.item_finished_signal.emit()
+            else:
+                self._current_page_page_number += 1
+                self._get_next_page()
             return -1
         else:
             return self._current_gallery
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Generator, Union
+from typing import Generator, Optional, Union
 
 from library_of_h.database_manager.main import DatabaseManager
 from library_of_h.downloader.base_classes.service import ServiceBase
@@ -10,7 +10,6 @@ from library_of_h.downloader.custom_sub_classes.download_files_model import \
 from library_of_h.downloader.custom_sub_classes.download_items_model import \
     DownloadItemsModel
 from library_of_h.downloader.filter import Filter
-from library_of_h.downloader.output_dialog import OutputDialog
 from library_of_h.downloader.output_table_view import ItemsTableView
 from library_of_h.downloader.services.nhentai.downloader import \
     nhentaiDownloader
@@ -24,7 +23,9 @@ class nhentai(ServiceBase):
 
     _current_working_gallery_metadata: int
 
-    def __init__(self, output_table_view: ItemsTableView, *args, **kwargs) -> None:
+    def __init__(
+        self, output_table_view: Optional[ItemsTableView], *args, **kwargs
+    ) -> None:
         super().__init__(output_table_view, *args, **kwargs)
 
         self._image_from_thumb_pattern = re.compile(
@@ -50,6 +51,7 @@ class nhentai(ServiceBase):
             "galleries already downloaded": 0,
             "files downloaded": 0,
             "files already downloaded": 0,
+            "files failed": 0,
             "total download size": 0,
             "total time taken": 0,
         }
@@ -66,7 +68,7 @@ class nhentai(ServiceBase):
 
         self._network_access_manager = nhentaiNetworkAccessManager()
 
-        self._output_dialog = OutputDialog(parent=self.parent().parent())
+        self._output_dialog = self._create_output()
         self._output_dialog.canceled_signal.connect(self._output_dialog_canceled_slot)
 
         self._extractor = nhentaiExtractor()
@@ -88,9 +90,10 @@ class nhentai(ServiceBase):
         )
         self._downloader.get_file_signal.connect(self._get_file_slot)
         self._downloader.file_finished_signal.connect(self._end_file_download)
+        self._downloader.file_failed_signal.connect(self._file_failed_slot)
         self._downloader.set_network_access_manager(self._network_access_manager)
 
-        self._output_table_view.remove_table_model()
+        self._remove_items_model()
 
         self._logger.debug("Preparing download items data model.")
         if hasattr(self, "_download_items_model"):
@@ -110,7 +113,10 @@ class nhentai(ServiceBase):
         self._logger.info(
             f"{self._download_items_model.rowCount()} {('item', 'items')[self._download_items_model.rowCount() != 1]} found."
         )
-        self._output_table_view.setModel(self._download_items_model)
+        self._set_items_model()
+        self._open_session_journal(items, download_type, order_by)
+
+        self._session_initialized.emit()
 
     # MISCELLANEOUS METHODS
     def _get_file_url(self, thumbnail_url: str) -> Union[str, None]:
@@ -211,8 +217,7 @@ class nhentai(ServiceBase):
             f"{total_galleries} {('gallery', 'galleries')[total_galleries != 1]} found."
         )
         self._output_dialog.set_gallery_progress_max_value(total_galleries)
-        self._logger.info(f"Begin gallery download: GALLERY ID={gallery_id}")
-        self._extractor.get_gallery_metadata(gallery_id)
+        self._get_gallery_metadata(gallery_id)
 
     def _begin_file_download(self) -> None:
         """
@@ -246,8 +251,7 @@ class nhentai(ServiceBase):
 
         if (gallery := self._extractor.next_gallery()) != -1:
             _, gallery_id = gallery
-            self._logger.info(f"Begin gallery download: GALLERY ID={gallery_id}")
-            self._extractor.get_gallery_metadata(gallery_id)
+            self._get_gallery_metadata(gallery_id)
 
     def _get_file_slot(self) -> None:
         self._file_url_generator = self._get_next_image_file()
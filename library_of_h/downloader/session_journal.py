@@ -0,0 +1,234 @@
+"""
+SQLite journal of the download sessions.
+
+A session is identified by its signature: the service, the download type, the
+order and the items. Starting a session with the signature of one that did not
+finish resumes it: the items that were completed, the galleries that were
+downloaded, skipped or filtered out, and the gallery IDs resolved for each item
+are read from the journal instead of being requested again.
+"""
+
+import sqlite3
+import time
+
+from library_of_h.constants import (DOWNLOAD_JOURNAL_LOCATION,
+                                    DOWNLOAD_JOURNAL_MAX_SESSIONS)
+from library_of_h.logger import MainType, get_logger
+
+_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY,
+    signature  TEXT NOT NULL UNIQUE,
+    created    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    session_id INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    item_index INTEGER NOT NULL,
+    item_name  TEXT NOT NULL,
+    status     INTEGER NOT NULL,
+    PRIMARY KEY (session_id, item_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS item_galleries (
+    session_id INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    item_index INTEGER NOT NULL,
+    position   INTEGER NOT NULL,
+    gallery_id INTEGER NOT NULL,
+    PRIMARY KEY (session_id, item_index, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS galleries (
+    session_id INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    gallery_id INTEGER NOT NULL,
+    PRIMARY KEY (session_id, gallery_id)
+) WITHOUT ROWID;
+"""
+
+
+class SessionJournal:
+    """
+    Journal of one download session, see the module's docstring.
+
+    Every change is committed immediately. If the journal can not be opened, an
+    in-memory one is used, the session then can not be resumed.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        download_type: str,
+        order_by: str,
+        items: list[str],
+        location: str = DOWNLOAD_JOURNAL_LOCATION,
+    ) -> None:
+        """
+        Opens the journal of the session, creating it if it does not exist.
+
+        Parameters
+        -----------
+            service (str):
+                Name of the service.
+            download_type (str):
+                Download type of the session's items.
+            order_by (str):
+                Order of the galleries of the items.
+            items (list[str]):
+                Names of the session's items, in order.
+            location (str):
+                Path of the journal.
+        """
+        self._logger = get_logger(main_type=MainType.DOWNLOADER, sub_types=[])
+        try:
+            self._connection = self._connect(location)
+        except sqlite3.Error as e:
+            self._logger.error(
+                f"[{e}] Failed to open the download session journal, the session "
+                f"can not be resumed: LOCATION={location}"
+            )
+            self._connection = self._connect(":memory:")
+
+        signature = "\n".join((service, download_type, order_by, *items))
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT session_id FROM sessions WHERE signature = ?", (signature,)
+            ).fetchone()
+            # Whether the session was started before and did not finish.
+            self.resumed = row is not None
+            if self.resumed:
+                self._session_id = row[0]
+            else:
+                self._delete_old_sessions()
+                self._session_id = self._connection.execute(
+                    "INSERT INTO sessions(signature, created) VALUES(?, ?)",
+                    (signature, time.time()),
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO items VALUES(?, ?, ?, -1)",
+                    (
+                        (self._session_id, item_index, item_name)
+                        for item_index, item_name in enumerate(items)
+                    ),
+                )
+
+        self._completed_galleries = {
+            gallery_id
+            for gallery_id, in self._connection.execute(
+                "SELECT gallery_id FROM galleries WHERE session_id = ?",
+                (self._session_id,),
+            )
+        }
+
+    # <PRIVATE METHODS>
+    @staticmethod
+    def _connect(location: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(location)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(_CREATE_TABLES)
+        return connection
+
+    def _delete_old_sessions(self) -> None:
+        # Makes room for a new session, the caller commits.
+        self._connection.execute(
+            """
+            DELETE FROM sessions WHERE session_id NOT IN (
+                SELECT session_id FROM sessions ORDER BY session_id DESC LIMIT ?
+            )
+            """,
+            (DOWNLOAD_JOURNAL_MAX_SESSIONS - 1,),
+        )
+
+    def _execute(self, query: str, parameters: tuple) -> None:
+        try:
+            with self._connection:
+                self._connection.execute(query, parameters)
+        except sqlite3.Error as e:
+            self._logger.error(
+                f"[{e}] Failed to write to the download session journal."
+            )
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def close(self) -> None:
+        self._connection.close()
+
+    def complete_gallery(self, gallery_id: int) -> None:
+        """
+        Records a gallery as downloaded, already downloaded or filtered out, it
+        is skipped by a resumed session.
+        """
+        gallery_id = int(gallery_id)
+        self._completed_galleries.add(gallery_id)
+        self._execute(
+            "INSERT OR IGNORE INTO galleries VALUES(?, ?)",
+            (self._session_id, gallery_id),
+        )
+
+    def finish(self) -> None:
+        """Deletes the session from the journal, once all of its items ended."""
+        self._execute("DELETE FROM sessions WHERE session_id = ?", (self._session_id,))
+
+    def is_gallery_completed(self, gallery_id: int) -> bool:
+        return int(gallery_id) in self._completed_galleries
+
+    def item_galleries(self, item_index: int) -> list[int]:
+        """
+        Returns
+        --------
+            list[int]:
+                IDs of the item's galleries, in order, empty if they were not
+                resolved yet.
+        """
+        return [
+            gallery_id
+            for gallery_id, in self._connection.execute(
+                "SELECT gallery_id FROM item_galleries "
+                "WHERE session_id = ? AND item_index = ? ORDER BY position",
+                (self._session_id, item_index),
+            )
+        ]
+
+    def item_statuses(self) -> list[int]:
+        """
+        Returns
+        --------
+            list[int]:
+                Status of each item, as in `DownloadItemsModel`: -1 until the
+                item ended, 1 if it completed and -3 if it was invalid.
+        """
+        return [
+            status
+            for status, in self._connection.execute(
+                "SELECT status FROM items WHERE session_id = ? ORDER BY item_index",
+                (self._session_id,),
+            )
+        ]
+
+    def set_item_galleries(self, item_index: int, gallery_ids: list[int]) -> None:
+        """Records the IDs of the item's galleries, in order."""
+        try:
+            with self._connection:
+                self._connection.execute(
+                    "DELETE FROM item_galleries "
+                    "WHERE session_id = ? AND item_index = ?",
+                    (self._session_id, item_index),
+                )
+                self._connection.executemany(
+                    "INSERT INTO item_galleries VALUES(?, ?, ?, ?)",
+                    (
+                        (self._session_id, item_index, position, gallery_id)
+                        for position, gallery_id in enumerate(gallery_ids)
+                    ),
+                )
+        except sqlite3.Error as e:
+            self._logger.error(
+                f"[{e}] Failed to write to the download session journal."
+            )
+
+    def set_item_status(self, item_index: int, status: int) -> None:
+        self._execute(
+            "UPDATE items SET status = ? WHERE session_id = ? AND item_index = ?",
+            (status, self._session_id, item_index),
+        )
+
+    # </PUBLIC METHODS>
@@ -17,6 +17,7 @@ class ListView(qtw.QListView):
 
     context_menu_move_to_trash_signal = qtc.Signal()
     selection_changed_signal = qtc.Signal()
+    visible_rows_changed_signal = qtc.Signal(int, int)
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -26,6 +27,12 @@ class ListView(qtw.QListView):
         self.setSelectionMode(qtw.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setVerticalScrollMode(qtw.QListView.ScrollMode.ScrollPerPixel)
 
+        self.verticalScrollBar().valueChanged.connect(self._emit_visible_rows)
+
+    def resizeEvent(self, event: qtg.QResizeEvent):
+        super().resizeEvent(event)
+        self._emit_visible_rows()
+
     def selectionChanged(
         self, selected: qtc.QItemSelection, deselected: qtc.QItemSelection
     ):
@@ -62,6 +69,13 @@ class ListView(qtw.QListView):
 
         menu.popup(event.globalPos())
 
+    def _emit_visible_rows(self):
+        first = self.indexAt(qtc.QPoint(0, 0)).row()
+        last = self.indexAt(qtc.QPoint(0, self.viewport().height() - 1)).row()
+        if last == -1:
+            last = self.model().rowCount() - 1
+        self.visible_rows_changed_signal.emit(max(first, 0), last)
+
     def _action_copy_location_slot(self):
         location = (
             self.selectionModel()
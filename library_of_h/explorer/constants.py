@@ -55,3 +55,19 @@ ACTION_GROUP_MAPPING = {
     "&Ascending": "ASC",
     "D&escending": "DESC",
 }
+
+# Created browser items are sent to the GUI thread in batches of at most
+# `BROWSER_ITEMS_BATCH_SIZE` items or every `BROWSER_ITEMS_BATCH_INTERVAL` seconds,
+# whichever comes first.
+BROWSER_ITEMS_BATCH_SIZE = 8
+BROWSER_ITEMS_BATCH_INTERVAL = 0.1
+# Number of rows fetched from the database at a time in infinite scroll mode.
+INFINITE_SCROLL_FETCH_LIMIT = 100
+# Number of rows above and below the viewport for which thumbnails are kept in
+# memory in infinite scroll mode, thumbnails of rows outside are evicted.
+THUMBNAIL_WINDOW_MARGIN = 25
+# Milliseconds to wait after the last scroll before updating the thumbnail window.
+THUMBNAIL_WINDOW_UPDATE_DELAY = 50
+# Maximum number of completions shown for a filter value.
+COMPLETION_LIMIT = 20
+FACETS_LIMIT = 10  # Most common values shown per dimension in the facets panel.
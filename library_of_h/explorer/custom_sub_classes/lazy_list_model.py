@@ -0,0 +1,344 @@
+from typing import Optional, Union
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from PySide6 import QtSql
+
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.database_manager.query_handle import QueryHandle
+from library_of_h.explorer.constants import (DESCRIPTION_OBJECT_ROLE,
+                                             INFINITE_SCROLL_FETCH_LIMIT,
+                                             THUMBNAIL_SIZE,
+                                             THUMBNAIL_WINDOW_MARGIN,
+                                             THUMBNAIL_WINDOW_UPDATE_DELAY)
+from library_of_h.explorer.custom_sub_classes.list_model import Description
+from library_of_h.explorer.workers.create_browser_item import (
+    create_description_dict, format_size)
+from library_of_h.explorer.workers.create_thumbnail import \
+    CreateThumbnailWorker
+
+
+class LazyListModel(qtc.QAbstractListModel):
+    """
+    List model used by the explorer's infinite scroll mode.
+
+    Rows are fetched from the database in chunks of `INFINITE_SCROLL_FETCH_LIMIT`
+    as the view scrolls to the end (`canFetchMore`/`fetchMore`). Descriptions are
+    kept for every fetched row, thumbnails are only kept for the rows in a window
+    around the viewport and are created in the background as the window moves.
+    """
+
+    total_rows_changed_signal = qtc.Signal(int)
+    rows_fetched_signal = qtc.Signal(int)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._database_manager = DatabaseManager.get_instance()
+
+        self._descriptions: list[Description] = []
+        self._thumbnails: dict[int, qtg.QImage] = {}
+        self._pending_thumbnails: set[int] = set()
+
+        self._query = {}
+        self._total_rows = 0
+        self._fetching = False
+        # Cancelled on reset so that superseded fetches are dropped.
+        self._query_handle: Optional[QueryHandle] = None
+        # Incremented on every reset, results of older queries are discarded.
+        self._generation = 0
+        self._visible_rows = (0, 0)
+        self._window = (0, -1)
+
+        self._placeholder_thumbnail = qtg.QImage(
+            *THUMBNAIL_SIZE, qtg.QImage.Format.Format_ARGB32
+        )
+        self._placeholder_thumbnail.fill(qtc.Qt.GlobalColor.transparent)
+
+        self._update_window_timer = qtc.QTimer(self)
+        self._update_window_timer.setSingleShot(True)
+        self._update_window_timer.setInterval(THUMBNAIL_WINDOW_UPDATE_DELAY)
+        self._update_window_timer.timeout.connect(self._update_window)
+
+    # <PARENT OVERRIDES>
+    def canFetchMore(self, parent: qtc.QModelIndex) -> bool:
+        if parent.isValid() or self._fetching:
+            return False
+        return len(self._descriptions) < self._total_rows
+
+    def data(
+        self, index: qtc.QModelIndex, role: qtc.Qt.ItemDataRole
+    ) -> Union[str, qtg.QImage, Description, None]:
+        if not index.isValid():
+            return None
+
+        if role == qtc.Qt.ItemDataRole.DisplayRole:
+            return self._descriptions[index.row()].to_html()
+        elif role == qtc.Qt.ItemDataRole.DecorationRole:
+            return self._thumbnails.get(index.row(), self._placeholder_thumbnail)
+        elif role == DESCRIPTION_OBJECT_ROLE:
+            return self._descriptions[index.row()]
+
+        return None
+
+    def fetchMore(self, parent: qtc.QModelIndex) -> None:
+        if parent.isValid():
+            return
+        self._fetch()
+
+    def flags(self, index) -> qtc.Qt.ItemFlag:
+        return (
+            qtc.Qt.ItemFlag.ItemIsEditable
+            | qtc.Qt.ItemFlag.ItemIsEnabled
+            | qtc.Qt.ItemFlag.ItemIsSelectable
+        )
+
+    def rowCount(self, parent: Optional[qtc.QModelIndex] = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._descriptions)
+
+    # </PARENT OVERRIDES>
+
+    # <PRIVATE METHODS>
+    def _fetch(self, count: bool = False) -> bool:
+        self._fetching = True
+        generation = self._generation
+        query = self._query | {
+            "offset": len(self._descriptions),
+            "limit": INFINITE_SCROLL_FETCH_LIMIT,
+        }
+        self._query_handle = self._database_manager.get(
+            get_callback=lambda records: self._fetch_finished(generation, records),
+            count=count,
+            count_callback=lambda result: self._count_finished(generation, result),
+            **query,
+        )
+        if self._query_handle is None:
+            self._fetching = False
+            return False
+        return True
+
+    def _fetch_if_shown(self) -> None:
+        # The view only fetches more as it scrolls, not if the last row is shown.
+        if (
+            self.canFetchMore(qtc.QModelIndex())
+            and self._visible_rows[1] >= len(self._descriptions) - 1
+        ):
+            self._fetch()
+
+    def _is_row_wanted(self, generation: int, row: int) -> bool:
+        # Called from the thumbnail workers' threads.
+        return (
+            generation == self._generation
+            and self._window[0] <= row <= self._window[1]
+        )
+
+    def _update_window(self) -> None:
+        first, last = self._visible_rows
+        self._window = (
+            max(0, first - THUMBNAIL_WINDOW_MARGIN),
+            min(len(self._descriptions) - 1, last + THUMBNAIL_WINDOW_MARGIN),
+        )
+
+        for row in tuple(self._thumbnails):
+            if not self._window[0] <= row <= self._window[1]:
+                del self._thumbnails[row]
+
+        rows = [
+            (row, self._descriptions[row].location)
+            for row in range(self._window[0], self._window[1] + 1)
+            if row not in self._thumbnails and row not in self._pending_thumbnails
+        ]
+        if not rows:
+            return
+
+        self._pending_thumbnails.update(row for row, *_ in rows)
+        worker = CreateThumbnailWorker(
+            parent=self,
+            generation=self._generation,
+            rows=rows,
+            is_row_wanted=self._is_row_wanted,
+        )
+        worker.thumbnails_created_signal.connect(self._thumbnails_created_slot)
+        worker.thumbnails_batch_finished_signal.connect(
+            self._thumbnails_batch_finished_slot
+        )
+        qtc.QThreadPool.globalInstance().start(worker.create_thumbnails)
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def clear(self) -> None:
+        """Removes all the rows and discards the results of pending fetches."""
+        self.beginResetModel()
+        if self._query_handle is not None:
+            self._query_handle.cancel()
+            self._query_handle = None
+        self._generation += 1
+        self._descriptions = []
+        self._thumbnails = {}
+        self._pending_thumbnails = set()
+        self._fetching = False
+        self._total_rows = 0
+        self._visible_rows = (0, 0)
+        self._window = (0, -1)
+        self.endResetModel()
+
+    def set_query(self, query: dict) -> bool:
+        """
+        Resets the model and starts fetching the results of `query`.
+
+        Parameters
+        -----------
+            query (dict):
+                Keyword arguments for `DatabaseManager.get`, "offset" and "limit"
+                are ignored.
+
+        Returns
+        --------
+            bool:
+                False if the query could not be parsed, True otherwise.
+        """
+        self.clear()
+        self._query = {
+            key: value
+            for key, value in query.items()
+            if key not in ("offset", "limit")
+        }
+        return self._fetch(count=True)
+
+    def set_visible_rows(self, first: int, last: int) -> None:
+        self._visible_rows = (first, last)
+        self._update_window_timer.start()
+
+    def update_galleries(self, deleted: set[str], sizes: dict[str, int]) -> bool:
+        """
+        Removes the fetched rows of the galleries deleted from the database and
+        sets the sizes of the resized ones in place, then counts the results
+        again. The other rows, their thumbnails and the selection are kept.
+
+        Parameters
+        -----------
+            deleted (set[str]):
+                Locations of the deleted galleries.
+            sizes (dict[str, int]):
+                New sizes in bytes of the resized galleries by location.
+
+        Returns
+        --------
+            bool:
+                False if the query could not be parsed, True otherwise.
+        """
+        for row, description in enumerate(self._descriptions):
+            if description.location in sizes:
+                self._descriptions[row] = description._replace(
+                    size_in_bytes=format_size(sizes[description.location])
+                )
+                self.dataChanged.emit(
+                    self.index(row, 0),
+                    self.index(row, 0),
+                    [qtc.Qt.ItemDataRole.DisplayRole],
+                )
+
+        rows = [
+            row
+            for row, description in enumerate(self._descriptions)
+            if description.location in deleted
+        ]
+        if rows:
+            # Rows shift, the thumbnails being created and the fetch running
+            # are for the old ones.
+            if self._query_handle is not None:
+                self._query_handle.cancel()
+                self._query_handle = None
+            self._generation += 1
+            self._pending_thumbnails = set()
+            self._fetching = False
+            for row in reversed(rows):
+                self.beginRemoveRows(qtc.QModelIndex(), row, row)
+                del self._descriptions[row]
+                self._thumbnails = {
+                    thumbnail_row - (thumbnail_row > row): thumbnail
+                    for thumbnail_row, thumbnail in self._thumbnails.items()
+                    if thumbnail_row != row
+                }
+                self.endRemoveRows()
+            self._update_window()
+
+        generation = self._generation
+        handle = self._database_manager.get(
+            get_callback=lambda result: self._recount_finished(generation, result),
+            select="count",
+            user_query=self._query.get("user_query", ""),
+        )
+        return handle is not None
+
+    # </PUBLIC METHODS>
+
+    # <SLOTS>
+    def _count_finished(
+        self, generation: int, result: list[QtSql.QSqlRecord]
+    ) -> None:
+        if generation != self._generation:
+            return
+        self._total_rows = result[0].value("total_rows") if result else 0
+        self.total_rows_changed_signal.emit(self._total_rows)
+
+    def _fetch_finished(self, generation: int, records: list[QtSql.QSqlRecord]) -> None:
+        if generation != self._generation:
+            return
+        self._fetching = False
+        if not records:
+            # Nothing more to fetch, the result shrunk since it was counted.
+            self._total_rows = len(self._descriptions)
+            self.rows_fetched_signal.emit(len(self._descriptions))
+            return
+
+        first = len(self._descriptions)
+        self.beginInsertRows(qtc.QModelIndex(), first, first + len(records) - 1)
+        for record in records:
+            self._descriptions.append(Description(**create_description_dict(record)))
+        self.endInsertRows()
+
+        self.rows_fetched_signal.emit(len(self._descriptions))
+        self._update_window()
+
+    def _recount_finished(
+        self, generation: int, result: list[QtSql.QSqlRecord]
+    ) -> None:
+        if generation != self._generation:
+            return
+        self._count_finished(generation, result)
+        self._fetch_if_shown()
+
+    def _thumbnails_created_slot(
+        self, generation: int, thumbnails: list[tuple[int, qtg.QImage]]
+    ) -> None:
+        rows = []
+        for row, thumbnail in thumbnails:
+            if self._is_row_wanted(generation, row):
+                self._thumbnails[row] = thumbnail
+                rows.append(row)
+        if not rows:
+            return
+        self.dataChanged.emit(
+            self.index(min(rows), 0),
+            self.index(max(rows), 0),
+            [qtc.Qt.ItemDataRole.DecorationRole],
+        )
+
+    def _thumbnails_batch_finished_slot(self, generation: int, rows: list[int]):
+        self.sender().deleteLater()
+        if generation != self._generation:
+            return
+        self._pending_thumbnails.difference_update(rows)
+        if any(
+            self._window[0] <= row <= self._window[1] and row not in self._thumbnails
+            for row in rows
+        ):
+            # Some rows were skipped while scrolling away and came back into the
+            # window before the batch finished.
+            self._update_window_timer.start()
+
+    # </SLOTS>
@@ -3,8 +3,7 @@ from typing import NamedTuple, Optional, Union
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 
-from library_of_h.explorer.constants import (BROWSER_IMAGES_LIMIT,
-                                             DESCRIPTION_HTML_TEMPLATE,
+from library_of_h.explorer.constants import (DESCRIPTION_HTML_TEMPLATE,
                                              DESCRIPTION_OBJECT_ROLE)
 
 
@@ -42,10 +41,7 @@ class ListData(NamedTuple):
 class ListModel(qtc.QAbstractListModel):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._data = ListData(
-            [None for _ in range(BROWSER_IMAGES_LIMIT)],
-            [None for _ in range(BROWSER_IMAGES_LIMIT)],
-        )
+        self._data = ListData([], [])
 
     def data(
         self, index: qtc.QModelIndex, role: qtc.Qt.ItemDataRole
@@ -92,13 +88,66 @@ class ListModel(qtc.QAbstractListModel):
         self.dataChanged.emit(index, index, [role])
         return True
 
-    def removeRows(self, row: int, count: int):
-        self.beginRemoveRows(qtc.QModelIndex(), row, count)
-        for r in range(row, count):
-            index = self.createIndex(r, 0)
-            self.setData(index, None, qtc.Qt.ItemDataRole.DisplayRole)
-            self.setData(index, None, qtc.Qt.ItemDataRole.DecorationRole)
+    def removeRows(
+        self, row: int, count: int, parent: qtc.QModelIndex = qtc.QModelIndex()
+    ) -> bool:
+        if count <= 0 or row < 0 or row + count > self.rowCount():
+            return False
+
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self._data.thumbnails[row : row + count]
+        del self._data.descriptions[row : row + count]
         self.endRemoveRows()
+        return True
 
     def rowCount(self, _: Optional[qtc.QModelIndex] = None) -> int:
-        return len(self._data.thumbnails) - self._data.thumbnails.count(None)
+        return len(self._data.thumbnails)
+
+    def set_items(
+        self, first_row: int, items: list[tuple[qtg.QImage, dict]]
+    ) -> bool:
+        """
+        Sets the thumbnails and descriptions of consecutive rows, appending rows
+        past the end of the model. Views are notified once for the whole batch.
+
+        Parameters
+        -----------
+            first_row (int):
+                Row of the first item.
+            items (list[tuple[qtg.QImage, dict]]):
+                List of (thumbnail, description dict) tuples.
+
+        Returns
+        --------
+            bool:
+                False if `first_row` is past the end of the model, True otherwise.
+        """
+        row_count = self.rowCount()
+        if not items or first_row > row_count:
+            return False
+
+        last_row = first_row + len(items) - 1
+        if last_row >= row_count:
+            self.beginInsertRows(qtc.QModelIndex(), row_count, last_row)
+
+        for row, (thumbnail, description_dict) in enumerate(items, first_row):
+            description = Description(**description_dict)
+            if row < row_count:
+                self._data.thumbnails[row] = thumbnail
+                self._data.descriptions[row] = description
+            else:
+                self._data.thumbnails.append(thumbnail)
+                self._data.descriptions.append(description)
+
+        if last_row >= row_count:
+            self.endInsertRows()
+        if first_row < row_count:
+            self.dataChanged.emit(
+                self.createIndex(first_row, 0),
+                self.createIndex(min(last_row, row_count - 1), 0),
+                [
+                    qtc.Qt.ItemDataRole.DisplayRole,
+                    qtc.Qt.ItemDataRole.DecorationRole,
+                ],
+            )
+        return True
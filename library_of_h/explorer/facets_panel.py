@@ -0,0 +1,53 @@
+from PySide6 import QtCore as qtc
+from PySide6 import QtWidgets as qtw
+
+
+class FacetsPanel(qtw.QDockWidget):
+    """
+    Dock listing the most common artists, characters, groups, series and tags of
+    the Explorer's current result. Activating one emits `facet_activated_signal`
+    with its dimension and name.
+    """
+
+    facet_activated_signal = qtc.Signal(str, str)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.setWindowTitle("Facets")
+        self.setObjectName("explorer_facets_panel")
+
+        self._tree_widget = qtw.QTreeWidget(self)
+        self._tree_widget.setColumnCount(2)
+        self._tree_widget.setHeaderLabels(("Name", "Galleries"))
+        self._tree_widget.setRootIsDecorated(True)
+        self._tree_widget.header().setSectionResizeMode(
+            0, qtw.QHeaderView.ResizeMode.Stretch
+        )
+        self._tree_widget.header().setStretchLastSection(False)
+        self._tree_widget.itemActivated.connect(self._item_activated_slot)
+        self.setWidget(self._tree_widget)
+
+    # <PUBLIC METHODS>
+    def set_facets(self, facets: dict[str, list[tuple[str, int]]]) -> None:
+        self._tree_widget.clear()
+        for dimension, names_and_counts in facets.items():
+            dimension_item = qtw.QTreeWidgetItem(self._tree_widget, (dimension,))
+            for name, count in names_and_counts:
+                item = qtw.QTreeWidgetItem(dimension_item, (name, str(count)))
+                item.setTextAlignment(1, qtc.Qt.AlignmentFlag.AlignRight)
+            dimension_item.setExpanded(True)
+
+    def set_searching(self) -> None:
+        self._tree_widget.clear()
+        qtw.QTreeWidgetItem(self._tree_widget, ("Searching...",))
+
+    # </PUBLIC METHODS>
+
+    # <SLOTS>
+    def _item_activated_slot(self, item: qtw.QTreeWidgetItem, column: int) -> None:
+        if (parent := item.parent()) is None:
+            return
+        self.facet_activated_signal.emit(parent.text(0), item.text(0))
+
+    # </SLOTS>
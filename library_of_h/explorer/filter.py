@@ -1,7 +1,18 @@
+import re
+
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 from PySide6 import QtWidgets as qtw
 
+from library_of_h.database_manager.constants import COMPLETION_DIMENSIONS
+from library_of_h.explorer.workers.complete import CompleteWorker
+
+# A <key><text operator><value> term ending at the cursor.
+_COMPLETION_PATTERN = re.compile(
+    r"""(?:^|\s)(\w+)(?:!~=|~=|!=|=)("[^"]*|'[^']*|[^\s"']*)$"""
+)
+_WHITE_SPACE_PATTERN = re.compile(r"\s")
+
 
 class Filter(qtw.QLineEdit):
 
@@ -10,8 +21,24 @@ class Filter(qtw.QLineEdit):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        # Incremented on every edit, completions of older edits are discarded.
+        self._completion_generation = 0
+        # Start and end of the value being completed.
+        self._completion_span = (0, 0)
+
+        self._completion_model = qtg.QStandardItemModel(self)
+        self._completer = qtw.QCompleter(self._completion_model, self)
+        self._completer.setWidget(self)
+        self._completer.setCompletionMode(
+            qtw.QCompleter.CompletionMode.UnfilteredPopupCompletion
+        )
+        self._completer.activated[qtc.QModelIndex].connect(
+            self._completer_activated_slot
+        )
+
         self.setPlaceholderText("Filter...")
         self.returnPressed.connect(self._return_pressed_slot)
+        self.textEdited.connect(self._text_edited_slot)
 
     def keyPressEvent(self, event: qtg.QKeyEvent):
         if event.key() == qtc.Qt.Key.Key_Escape:
@@ -20,5 +47,59 @@ class Filter(qtw.QLineEdit):
 
         super().keyPressEvent(event)
 
+    def _completer_activated_slot(self, index: qtc.QModelIndex) -> None:
+        name = index.data(qtc.Qt.ItemDataRole.UserRole)
+        if _WHITE_SPACE_PATTERN.search(name):
+            name = f'"{name}"'
+        start, end = self._completion_span
+        text = self.text()
+        self.setText(text[:start] + name + text[end:])
+        self.setCursorPosition(start + len(name))
+
+    def _completions_found_slot(
+        self, generation: int, completions: list[tuple[str, int]]
+    ) -> None:
+        self.sender().deleteLater()
+        if generation != self._completion_generation:
+            return
+
+        self._completion_model.clear()
+        for name, count in completions:
+            item = qtg.QStandardItem(f"{name} ({count})")
+            item.setData(name, qtc.Qt.ItemDataRole.UserRole)
+            self._completion_model.appendRow(item)
+
+        if completions:
+            self._completer.complete()
+        else:
+            self._completer.popup().hide()
+
     def _return_pressed_slot(self):
+        popup = self._completer.popup()
+        if popup.isVisible() and popup.currentIndex().isValid():
+            # Return selected a completion.
+            return
         self.filter_signal.emit(self.text())
+
+    def _text_edited_slot(self, text: str) -> None:
+        self._completion_generation += 1
+
+        cursor_position = self.cursorPosition()
+        match = _COMPLETION_PATTERN.search(text, 0, cursor_position)
+        if (
+            match is None
+            or match.group(1) not in COMPLETION_DIMENSIONS
+            or not (prefix := match.group(2).lstrip("\"'").lower())
+        ):
+            self._completer.popup().hide()
+            return
+
+        self._completion_span = (match.start(2), cursor_position)
+        worker = CompleteWorker(
+            parent=self,
+            generation=self._completion_generation,
+            dimension=match.group(1),
+            prefix=prefix,
+        )
+        worker.completions_found_signal.connect(self._completions_found_slot)
+        qtc.QThreadPool.globalInstance().start(worker.complete)
@@ -1,4 +1,5 @@
 import math
+import re
 from typing import Optional
 
 from PySide6 import QtCore as qtc
@@ -8,16 +9,21 @@ from PySide6 import QtWidgets as qtw
 
 from library_of_h.custom_widgets.confirm_dialog import ConfirmationDialog
 from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.database_manager.query_handle import QueryHandle
 from library_of_h.explorer.browser import ListView
 from library_of_h.explorer.constants import (ACTION_GROUP_MAPPING,
                                              BROWSER_IMAGES_LIMIT,
-                                             DESCRIPTION_OBJECT_ROLE)
+                                             DESCRIPTION_OBJECT_ROLE,
+                                             FACETS_LIMIT)
+from library_of_h.explorer.custom_sub_classes.lazy_list_model import \
+    LazyListModel
+from library_of_h.explorer.facets_panel import FacetsPanel
 from library_of_h.explorer.filter import Filter
-from library_of_h.explorer.workers.create_browser_item import \
-    CreateBrowserItemWorker
+from library_of_h.explorer.workers.create_browser_item import (
+    CreateBrowserItemWorker, format_size)
 from library_of_h.explorer.workers.move_to_trash import MoveToTrashWorker
+from library_of_h.importer.reconciler import Reconciler
 from library_of_h.logger import ExplorerSubType, MainType, get_logger
-from library_of_h.preferences import Preferences
 
 
 class Explorer(qtw.QMainWindow):
@@ -31,7 +37,13 @@ class Explorer(qtw.QMainWindow):
     _current_query: dict
     _trashing: bool = False  # Indicates whether there's an ongoing move to trash.
     _refreshing: bool = False  # Indicates whether there's an ongoing view refresh.
+    _infinite_scroll: bool = False  # Indicates whether pages are replaced by
+    # a single view that fetches more items as it is scrolled.
     _items_list_view: ListView
+    # Handles of the ongoing browser and facets queries, cancelled when
+    # superseded.
+    _query_handle: Optional[QueryHandle] = None
+    _facets_query_handle: Optional[QueryHandle] = None
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -55,11 +67,16 @@ class Explorer(qtw.QMainWindow):
         self._database_manager = DatabaseManager.get_instance()
         self._create_browser_item_worker = CreateBrowserItemWorker(parent=self)
 
+        self._create_facets_panel()
         self._create_menu_bar()
         self._create_numbers_widgets()
         self._create_stacked_widget()
         self._create_toolbar()
 
+        self._list_model = self._list_view.model()
+        self._lazy_list_model = LazyListModel(parent=self)
+        self._reconciler = Reconciler(parent=self)
+
         self._filter_widget.filter_signal.connect(self._filter)
 
         self._main_widget.layout().addWidget(self._stacked_widget, 0, 0, 1, 12)
@@ -73,17 +90,26 @@ class Explorer(qtw.QMainWindow):
         self.setFocusPolicy(qtc.Qt.FocusPolicy.StrongFocus)
         self.setCentralWidget(self._main_widget)
 
-        self._create_browser_item_worker.item_created_signal.connect(
-            self._add_item_slot
+        self._create_browser_item_worker.items_created_signal.connect(
+            self._add_items_slot
         )
         self._create_browser_item_worker.browser_item_batch_finished_signal.connect(
             self._browser_item_batch_finished_slot
         )
-        self._create_browser_item_worker.item_not_found_signal.connect(
-            self._item_not_found_slot
+
+        self._lazy_list_model.total_rows_changed_signal.connect(
+            self._lazy_list_model_total_rows_changed_slot
+        )
+        self._lazy_list_model.rows_fetched_signal.connect(
+            self._lazy_list_model_rows_fetched_slot
+        )
+        self._reconciler.reconciled_signal.connect(self._reconciled_slot)
+        self._list_view.visible_rows_changed_signal.connect(
+            self._visible_rows_changed_slot
         )
 
-        self._initialize()
+        # Queried once the window is up so that the first frame is not delayed.
+        qtc.QTimer.singleShot(0, self._initialize)
 
     # <PARENT OVERRIDES>
     def keyPressEvent(self, event: qtg.QKeyEvent):
@@ -113,13 +139,13 @@ class Explorer(qtw.QMainWindow):
             event.accept()
             return
 
-        if event.key() == qtc.Qt.Key.Key_Left:
+        if event.key() == qtc.Qt.Key.Key_Left and not self._infinite_scroll:
             if self._previous_page_button.isEnabled():
                 self._previous_page_button_clicked_slot()
                 event.accept()
                 return
 
-        if event.key() == qtc.Qt.Key.Key_Right:
+        if event.key() == qtc.Qt.Key.Key_Right and not self._infinite_scroll:
             if self._next_page_button.isEnabled():
                 self._next_page_button_clicked_slot()
                 event.accept()
@@ -197,13 +223,27 @@ class Explorer(qtw.QMainWindow):
         self._current_query["offset"] = (
             self._current_page_number - 1
         ) * BROWSER_IMAGES_LIMIT
-        if not self._database_manager.get(
+        if not self._get_current_query():
+            self._show_bad_user_query()
+
+    def _get_current_query(self) -> bool:
+        """
+        Queries the current page, cancelling the query of the previous one.
+
+        Returns
+        --------
+            bool:
+                False if the current query could not be parsed, True otherwise.
+        """
+        if self._query_handle is not None:
+            self._query_handle.cancel()
+        self._query_handle = self._database_manager.get(
             count=True,
             get_callback=self._create_items,
             count_callback=self._update_numbers,
             **self._current_query,
-        ):
-            self._show_bad_user_query()
+        )
+        return self._query_handle is not None
 
     def _create_items(self, results: list[QtSql.QSqlRecord]) -> None:
         if not results:
@@ -250,6 +290,14 @@ class Explorer(qtw.QMainWindow):
             self._action_refresh_slot,
         )
 
+        self._infinite_scroll_action = self._view_menu.addAction("&Infinite scroll")
+        self._infinite_scroll_action.setCheckable(True)
+        self._infinite_scroll_action.toggled.connect(self._action_infinite_scroll_slot)
+
+        facets_action = self._facets_panel.toggleViewAction()
+        facets_action.setText("&Facets")
+        self._view_menu.addAction(facets_action)
+
         self._view_menu.addSeparator()
 
         self._sort_menu = self._view_menu.addMenu("&Sort")
@@ -284,6 +332,15 @@ class Explorer(qtw.QMainWindow):
         self._sort_order_actions[0].setChecked(True)
         self._sort_menu.triggered.connect(self._action_sort_slot)
 
+    def _create_facets_panel(self) -> None:
+        self._facets_panel = FacetsPanel(self)
+        self.addDockWidget(qtc.Qt.DockWidgetArea.RightDockWidgetArea, self._facets_panel)
+        self._facets_panel.hide()
+        self._facets_panel.visibilityChanged.connect(
+            self._facets_panel_visibility_changed_slot
+        )
+        self._facets_panel.facet_activated_signal.connect(self._facet_activated_slot)
+
     def _create_stacked_widget(self) -> None:
         self._stacked_widget = qtw.QStackedWidget(self)
 
@@ -374,48 +431,70 @@ class Explorer(qtw.QMainWindow):
     def _filter(self, user_query: str):
         self._current_query["user_query"] = user_query
         self._current_query["offset"] = 0
+        self._update_facets()
+
+        if self._infinite_scroll:
+            self._set_lazy_list_model_query()
+            return
 
         self._stacked_widget.setCurrentIndex(2)
         self._batch_started()
         self._list_view.model().removeRows(0, self._list_view.model().rowCount())
-        if not self._database_manager.get(
-            count=True,
-            get_callback=self._create_items,
-            count_callback=self._update_numbers,
-            **self._current_query,
-        ):
+        if not self._get_current_query():
             self._show_bad_user_query()
 
     def _initialize(self):
+        self._reconciler.start()
+        self._update_facets()
+        if self._infinite_scroll:
+            self._set_lazy_list_model_query()
+            return
+
         self._batch_started()
         self._stacked_widget.setCurrentIndex(2)
-        if not self._database_manager.get(
-            count=True,
-            get_callback=self._create_items,
-            count_callback=self._update_numbers,
-            **self._current_query,
-        ):
+        if not self._get_current_query():
             self._show_bad_user_query()
 
     def _refresh_browser(self, page_number: int):
+        if self._infinite_scroll:
+            self._set_lazy_list_model_query()
+            return
+
         if self._refreshing:
             return
 
         self._refreshing = True
+        self._update_facets()
         self._current_query["offset"] = (page_number - 1) * BROWSER_IMAGES_LIMIT
         self._current_page_number = page_number
 
         self._stacked_widget.setCurrentIndex(2)
         self._batch_started()
         self._list_view.model().removeRows(0, self._list_view.model().rowCount())
-        if not self._database_manager.get(
-            count=True,
-            get_callback=self._create_items,
-            count_callback=self._update_numbers,
-            **self._current_query,
-        ):
+        if not self._get_current_query():
             self._show_bad_user_query()
 
+    def _recounted(self, result: list[QtSql.QSqlRecord]) -> None:
+        if self._refreshing:
+            # The page being queried is counted too.
+            return
+        self._update_numbers(result)
+        # Calling the getter property to disable/enable buttons based on the
+        # number of pages.
+        self._current_page_number = self._current_page_number
+
+    def _set_lazy_list_model_query(self):
+        self._stacked_widget.setCurrentIndex(2)
+        self._list_view.selectionModel().clearSelection()
+        if not self._lazy_list_model.set_query(self._current_query):
+            self._show_bad_user_query()
+
+    def _set_page_widgets_visible(self, visible: bool):
+        self._previous_page_button.setVisible(visible)
+        self._page_number_line_edit.setVisible(visible)
+        self._page_number_label.setVisible(visible)
+        self._next_page_button.setVisible(visible)
+
     def _show_bad_user_query(self):
         self._stacked_widget.setCurrentIndex(3)
         self._total_items = 0
@@ -430,6 +509,21 @@ class Explorer(qtw.QMainWindow):
         self._current_page_items_range = (0, 0)
         self._current_page_number = 0
 
+    def _update_facets(self) -> None:
+        if not self._facets_panel.isVisible():
+            return
+
+        if self._facets_query_handle is not None:
+            self._facets_query_handle.cancel()
+        self._facets_panel.set_searching()
+        self._facets_query_handle = self._database_manager.get_facets(
+            facets_callback=self._facets_panel.set_facets,
+            user_query=self._current_query["user_query"],
+            limit=FACETS_LIMIT,
+        )
+        if self._facets_query_handle is None:
+            self._facets_panel.set_facets({})
+
     def _update_numbers(self, result: list[QtSql.QSqlRecord]):
         total_rows = result[0].value("total_rows")
         from_ = ((self._current_page_number - 1) * BROWSER_IMAGES_LIMIT) + 1
@@ -441,25 +535,34 @@ class Explorer(qtw.QMainWindow):
     # </PRIVATE METHODS>
 
     # <SLOTS>
-    def _add_item_slot(self, index: int, thumbnail: qtg.QImage, description_dict: dict):
+    def _add_items_slot(self, first_row: int, items: list[tuple[qtg.QImage, dict]]):
+        if self._infinite_scroll:
+            # Created for a page queried before switching to infinite scroll.
+            return
         if self._stacked_widget.currentIndex() != 0:
             self._stacked_widget.setCurrentIndex(0)
-        model_index = self._list_view.model().createIndex(index, 0)
-        self._list_view.model().setData(
-            model_index, thumbnail, qtc.Qt.ItemDataRole.DecorationRole
-        )
-        self._list_view.model().setData(
-            model_index, description_dict, qtc.Qt.ItemDataRole.DisplayRole
-        )
-        self._list_view.update(model_index)
+        self._list_model.set_items(first_row, items)
 
     def _browser_item_batch_finished_slot(self):
         self._refreshing = False
+        if self._infinite_scroll:
+            return
         self._page_number_line_edit.setDisabled(False)
         # Calling the getter property to disable/enable buttons based on page
         # number.
         self._current_page_number = self._current_page_number
 
+    def _facet_activated_slot(self, dimension: str, name: str) -> None:
+        if re.search(r"\s", name):
+            name = f'"{name}"'
+        user_query = f'{self._current_query["user_query"]} {dimension}={name}'.strip()
+        self._filter_widget.setText(user_query)
+        self._filter(user_query)
+
+    def _facets_panel_visibility_changed_slot(self, visible: bool) -> None:
+        if visible:
+            self._update_facets()
+
     def _trash(self):
         if not len(self._list_view.selectionModel().selectedIndexes()):
             qtw.QMessageBox(
@@ -508,35 +611,15 @@ class Explorer(qtw.QMainWindow):
         else:
             self._trashing = False
 
-    def _item_not_found_slot(self, item_not_founds: list[tuple[int, str]]):
-        preferences_instance = Preferences.get_instance()
-        for gallery_database_id, location in item_not_founds:
-            if preferences_instance[
-                "explorer_preferences", "delete_db_record_if_not_in_disk"
-            ]:
-                # If the user wants to delete invalid database records
-                self._database_manager.delete(gallery_database_id=gallery_database_id)
-            self._logger.warning(
-                "[Location Not Found] Location from database does not exist: "
-                f'DATABASE ID={gallery_database_id}, LOCATION="{location}"'
-            )
+    def _lazy_list_model_rows_fetched_slot(self, rows_fetched: int):
+        self._current_page_items_range = (min(1, rows_fetched), rows_fetched)
 
-        if preferences_instance[
-            "explorer_preferences", "delete_db_record_if_not_in_disk"
-        ]:
-            # If the user wanted to delete invalid database records
-            if (self._total_items - len(item_not_founds)) % 25 == 0:
-                callback = lambda: self._refresh_browser(self._current_page_number - 1)
-            else:
-                callback = lambda: self._refresh_browser(self._current_page_number)
-
-            # Delay to let the deletion complete before refreshing the browser.Small
-            # (infinitesimal?) chance it will fail, but doesn't matter. Failure here
-            # refers to the timer timing out before deletion completed, in which
-            # case the numbers shown in the numbers widget will be wrong and some
-            # non-existent items will be listed in the view. Will be fixed with
-            # another refresh.
-            qtc.QTimer.singleShot(500, callback)
+    def _lazy_list_model_total_rows_changed_slot(self, total_rows: int):
+        if not total_rows:
+            self._show_no_results()
+            return
+        self._stacked_widget.setCurrentIndex(0)
+        self._total_items = total_rows
 
     def _item_trash_finished_slot(self, location: str):
         self._database_manager.delete(location=location)
@@ -574,6 +657,22 @@ class Explorer(qtw.QMainWindow):
             selection, qtc.QItemSelectionModel.Toggle
         )
 
+    def _action_infinite_scroll_slot(self, checked: bool):
+        self._infinite_scroll = checked
+        self._set_page_widgets_visible(not checked)
+        if checked:
+            # The page being queried would be shown in the lazy view.
+            if self._query_handle is not None:
+                self._query_handle.cancel()
+                self._query_handle = None
+                self._refreshing = False
+            self._list_view.setModel(self._lazy_list_model)
+        else:
+            self._list_view.setModel(self._list_model)
+            self._lazy_list_model.clear()
+        self._current_page_number = 1
+        self._filter(self._current_query["user_query"])
+
     def _action_refresh_slot(self):
         self._refresh_browser(self._current_page_number)
 
@@ -598,13 +697,64 @@ class Explorer(qtw.QMainWindow):
         # Implement something for menu bar options.
         pass
 
+    def _reconciled_slot(self, summary: dict) -> None:
+        deleted = set(summary["deleted locations"])
+        if self._infinite_scroll:
+            if not self._lazy_list_model.update_galleries(deleted, summary["sizes"]):
+                self._show_bad_user_query()
+            return
+
+        if self._refreshing or self._stacked_widget.currentIndex() == 3:
+            return
+
+        model = self._list_model
+        descriptions = [
+            model.index(row, 0).data(DESCRIPTION_OBJECT_ROLE)
+            for row in range(model.rowCount())
+        ]
+        if any(description.location in deleted for description in descriptions) or (
+            summary["imported"] and model.rowCount() < BROWSER_IMAGES_LIMIT
+        ):
+            # The current page may be past the last one once galleries are
+            # deleted.
+            remaining_pages = math.ceil(
+                (self._total_items - summary["deleted"]) / BROWSER_IMAGES_LIMIT
+            )
+            self._refresh_browser(
+                max(1, min(self._current_page_number, remaining_pages))
+            )
+            return
+
+        for row, description in enumerate(descriptions):
+            if (size := summary["sizes"].get(description.location)) is not None:
+                model.setData(
+                    model.index(row, 0),
+                    description._replace(size_in_bytes=format_size(size))._asdict(),
+                    qtc.Qt.ItemDataRole.DisplayRole,
+                )
+        if summary["deleted"] or summary["imported"]:
+            # Galleries deleted or imported before the current page only shift
+            # the pages, the shown ones are kept until the page changes.
+            self._database_manager.get(
+                get_callback=self._recounted,
+                select="count",
+                user_query=self._current_query["user_query"],
+            )
+
+    def _visible_rows_changed_slot(self, first: int, last: int):
+        if self._infinite_scroll:
+            self._lazy_list_model.set_visible_rows(first, last)
+
     def _trash_batch_finished_slot(self, faulty_directories: list[Optional[str]]):
         rows_selected_for_deletion = self._list_view.selectionModel().selectedRows()
         successful_moves = len(rows_selected_for_deletion) - len(faulty_directories)
         dialog_text = f"Moved {successful_moves} {('item', 'items')[successful_moves != 1]} to trash."
         if (
-            rows_selected_for_deletion
-            and (self._total_items - len(rows_selected_for_deletion)) % 25 == 0
+            not self._infinite_scroll
+            and rows_selected_for_deletion
+            and (self._total_items - len(rows_selected_for_deletion))
+            % BROWSER_IMAGES_LIMIT
+            == 0
         ):
             self._current_page_number -= 1
         qtc.QTimer.singleShot(
@@ -0,0 +1,39 @@
+from PySide6 import QtCore as qtc
+
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.explorer.constants import COMPLETION_LIMIT
+
+
+class CompleteWorker(qtc.QObject):
+
+    # Emitted with the generation and a list of (name, gallery count) tuples.
+    completions_found_signal = qtc.Signal(int, list)
+
+    def __init__(
+        self, parent: qtc.QObject, generation: int, dimension: str, prefix: str
+    ) -> None:
+        """
+        Parameters
+        -----------
+            parent (qtc.QObject):
+                Parent of the worker.
+            generation (int):
+                Emitted along with the completions so that completions of an
+                outdated prefix can be discarded.
+            dimension (str):
+                Dimension to complete, like "tag".
+            prefix (str):
+                Prefix of the names to complete.
+        """
+        super().__init__(parent=parent)
+        self._generation = generation
+        self._dimension = dimension
+        self._prefix = prefix
+
+    def complete(self) -> None:
+        self.completions_found_signal.emit(
+            self._generation,
+            DatabaseManager.get_instance().complete(
+                self._dimension, self._prefix, COMPLETION_LIMIT
+            ),
+        )
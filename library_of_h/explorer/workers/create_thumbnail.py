@@ -0,0 +1,65 @@
+import time
+from typing import Callable
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.explorer.constants import (BROWSER_ITEMS_BATCH_INTERVAL,
+                                             BROWSER_ITEMS_BATCH_SIZE)
+from library_of_h.explorer.workers.create_browser_item import create_thumbnail
+
+
+class CreateThumbnailWorker(qtc.QObject):
+
+    # Emitted with the generation and a list of (row, thumbnail) tuples.
+    thumbnails_created_signal = qtc.Signal(int, object)
+    thumbnails_batch_finished_signal = qtc.Signal(int, list)
+
+    def __init__(
+        self,
+        parent: qtc.QObject,
+        generation: int,
+        rows: list[tuple[int, str]],
+        is_row_wanted: Callable[[int, int], bool],
+    ) -> None:
+        """
+        Parameters
+        -----------
+            parent (qtc.QObject):
+                Parent of the worker.
+            generation (int):
+                Generation of the model the rows belong to. Emitted along with the
+                thumbnails so that results of an outdated query can be discarded.
+            rows (list[tuple[int, str]]):
+                List of (row, location) tuples.
+            is_row_wanted (Callable[[int, int], bool]):
+                Called with the generation and the row before creating each
+                thumbnail, rows that are not wanted anymore (scrolled away from)
+                are skipped.
+        """
+        super().__init__(parent=parent)
+        self._generation = generation
+        self._rows = rows
+        self._is_row_wanted = is_row_wanted
+
+    def create_thumbnails(self) -> None:
+        batch = []
+        batch_started_at = time.monotonic()
+        for row, location in self._rows:
+            if not self._is_row_wanted(self._generation, row):
+                continue
+            batch.append((row, create_thumbnail(location)))
+
+            if (
+                len(batch) >= BROWSER_ITEMS_BATCH_SIZE
+                or time.monotonic() - batch_started_at >= BROWSER_ITEMS_BATCH_INTERVAL
+            ):
+                self.thumbnails_created_signal.emit(self._generation, batch)
+                batch = []
+                batch_started_at = time.monotonic()
+
+        if batch:
+            self.thumbnails_created_signal.emit(self._generation, batch)
+
+        self.thumbnails_batch_finished_signal.emit(
+            self._generation, [row for row, *_ in self._rows]
+        )
@@ -0,0 +1,73 @@
+"""
+Rebuilds the database from the metadata sidecars of the galleries under one or
+more directories, without the GUI. Galleries already in the database are
+skipped.
+
+Usage: python -m library_of_h.importer ROOT [ROOT ...] [--database DIRECTORY]
+"""
+
+import argparse
+import sys
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.importer.main import Importer
+from library_of_h.preferences import Preferences
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m library_of_h.importer")
+    parser.add_argument("roots", nargs="+", metavar="ROOT")
+    parser.add_argument(
+        "--database",
+        metavar="DIRECTORY",
+        help="directory of the database, overrides database_preferences/location "
+        "for this run only",
+    )
+    args = parser.parse_args()
+
+    # The database's read and write threads hold on to two of the pool's threads.
+    qtc.QThreadPool.globalInstance().setMaxThreadCount(4)
+    app = qtc.QCoreApplication(sys.argv[:1])
+    if args.database is not None:
+        Preferences.get_instance()["database_preferences", "location"] = args.database
+
+    if DatabaseManager.get_instance() is None:
+        print("Failed to open the database.", file=sys.stderr)
+        return 1
+
+    roots = list(args.roots)
+
+    def _start_next() -> None:
+        if not roots:
+            DatabaseManager.clean_up()
+            app.quit()
+            return
+
+        importer = Importer(roots.pop(0), parent=app)
+        importer.progress_signal.connect(
+            lambda found, inserted: print(
+                f"\r{found} galleries found, {inserted} imported",
+                end="",
+                flush=True,
+            )
+        )
+        importer.finished_signal.connect(_finished)
+        importer.start()
+
+    def _finished(summary: dict) -> None:
+        print()
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+        _start_next()
+
+    qtc.QTimer.singleShot(0, _start_next)
+    app.exec()
+    # Waits for the database's threads to commit what is left.
+    qtc.QThreadPool.globalInstance().waitForDone()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+SIDECAR_FILE_NAME = ".loh.json"  # Metadata sidecar in each gallery's location.
+SIDECAR_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20  # Bytes read at a time to hash gallery files.
+
+IMPORT_BATCH_SIZE = 500  # Galleries per bulk insert transaction.
+IMPORT_THREADS = 8  # Directories listed in parallel while scanning.
+
+RECONCILE_INTERVAL = 600_000  # Milliseconds between full syncs with the disk.
+# Milliseconds without changes to a watched directory before it is synced.
+RECONCILE_DELAY = 5_000
@@ -0,0 +1,205 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtSql
+
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.importer.constants import IMPORT_BATCH_SIZE, IMPORT_THREADS
+from library_of_h.importer.scanner import (ScannedGallery, layout_patterns,
+                                           scan_directory)
+from library_of_h.logger import MainType, get_logger
+from library_of_h.preferences import Preferences
+
+
+class Importer(qtc.QObject):
+    """
+    Imports the galleries found under a root directory into the database.
+
+    Directories are listed in parallel, breadth first. A directory is a gallery
+    if it has a metadata sidecar, or if its location matches the layout of one of
+    the `download_preferences/destination_formats`; galleries are inserted in
+    batches with `DatabaseManager.bulk_insert_into_database`. Locations that are
+    already in the database are skipped without being listed, so an interrupted
+    import resumes where it stopped when started again.
+
+    Galleries without a sidecar can not be inserted, their IDs are logged so that
+    their metadata can be looked up online by downloading them again, their files
+    are found to already exist and are not downloaded.
+    """
+
+    # Emitted with the number of galleries found and inserted so far.
+    progress_signal = qtc.Signal(int, int)
+    # Emitted with a summary of the import, see `_finish`.
+    finished_signal = qtc.Signal(dict)
+
+    _scan_progress_signal = qtc.Signal(int)
+    _scan_finished_signal = qtc.Signal(int, int, list)
+
+    def __init__(self, root: str, *args, verbose: bool = True, **kwargs) -> None:
+        """
+        Parameters
+        -----------
+            root (str):
+                Directory to import the galleries under.
+            verbose (bool):
+                Whether to log the start and the summary of the import and the
+                galleries without metadata, False for imports that run
+                repeatedly in the background.
+        """
+        super().__init__(*args, **kwargs)
+
+        self._logger = get_logger(main_type=MainType.DATABASE, sub_types=[])
+        self._database_manager = DatabaseManager.get_instance()
+        self._root = os.path.abspath(root)
+        self._verbose = verbose
+        self._canceled = False
+
+        self._found = 0
+        self._inserted = 0
+        self._batches_queued = 0
+        self._batches_inserted = 0
+        # Set once the scan finished: (galleries already in the database,
+        # galleries without metadata).
+        self._scan_result: Optional[tuple[int, list[ScannedGallery]]] = None
+
+        self._scan_progress_signal.connect(self._scan_progress_slot)
+        self._scan_finished_signal.connect(self._scan_finished_slot)
+
+    # <PRIVATE METHODS>
+    def _finish(self) -> None:
+        already_imported, without_metadata = self._scan_result
+        ids_by_source = {}
+        for gallery in without_metadata if self._verbose else ():
+            ids_by_source.setdefault(gallery.source, []).append(
+                str(gallery.gallery_id)
+                if gallery.gallery_id is not None
+                else gallery.location
+            )
+        for source, ids in ids_by_source.items():
+            self._logger.warning(
+                f"Galleries without metadata were not imported: "
+                f"SOURCE={source}, GALLERIES={' '.join(ids)}"
+            )
+
+        summary = {
+            "galleries found": self._found,
+            "galleries already imported": already_imported,
+            "galleries imported": self._inserted,
+            "galleries without metadata": len(without_metadata),
+            "canceled": self._canceled,
+        }
+        if self._verbose:
+            self._logger.info(f"Library import finished: ROOT={self._root}, {summary}")
+        self.finished_signal.emit(summary)
+
+    def _scan(self, known_locations: set[str]) -> None:
+        # Runs on the thread pool.
+        patterns = layout_patterns(
+            Preferences.get_instance()["download_preferences", "destination_formats"]
+        )
+
+        def _scan_directory(path: str) -> tuple[list[str], Optional[ScannedGallery]]:
+            try:
+                return scan_directory(path, patterns)
+            except OSError as e:
+                self._logger.warning(f"[{e}] Error scanning directory: PATH={path}")
+                return [], None
+
+        found = 0
+        already_imported = 0
+        without_metadata = []
+        batches = 0
+        batch = []
+        directories = [self._root]
+        with ThreadPoolExecutor(IMPORT_THREADS) as executor:
+            while directories and not self._canceled:
+                next_directories = []
+                for subdirectories, gallery in executor.map(
+                    _scan_directory, directories
+                ):
+                    for subdirectory in subdirectories:
+                        if os.path.normpath(subdirectory) in known_locations:
+                            found += 1
+                            already_imported += 1
+                        else:
+                            next_directories.append(subdirectory)
+                    if gallery is None:
+                        continue
+
+                    found += 1
+                    if os.path.normpath(gallery.location) in known_locations:
+                        already_imported += 1
+                    elif gallery.metadata is None:
+                        without_metadata.append(gallery)
+                    else:
+                        batch.append(
+                            (
+                                gallery.metadata,
+                                gallery.size_in_bytes,
+                                gallery.download_date,
+                            )
+                        )
+                        if len(batch) == IMPORT_BATCH_SIZE:
+                            self._database_manager.bulk_insert_into_database(
+                                batch, self._batch_inserted
+                            )
+                            batches += 1
+                            batch = []
+                            self._scan_progress_signal.emit(found)
+                directories = next_directories
+
+        if batch:
+            self._database_manager.bulk_insert_into_database(
+                batch, self._batch_inserted
+            )
+            batches += 1
+        self._scan_progress_signal.emit(found)
+        self._scan_finished_signal.emit(batches, already_imported, without_metadata)
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def cancel(self) -> None:
+        """Stops scanning, batches that were already queued are still inserted."""
+        self._canceled = True
+
+    def start(self) -> None:
+        if self._verbose:
+            self._logger.info(f"Library import started: ROOT={self._root}")
+        self._database_manager.get_locations(self._locations_read_slot)
+
+    # </PUBLIC METHODS>
+
+    # <SLOTS>
+    def _batch_inserted(self, inserted: int) -> None:
+        self._inserted += inserted
+        self._batches_inserted += 1
+        self.progress_signal.emit(self._found, self._inserted)
+        if (
+            self._scan_result is not None
+            and self._batches_inserted == self._batches_queued
+        ):
+            self._finish()
+
+    def _locations_read_slot(self, records: list[QtSql.QSqlRecord]) -> None:
+        known_locations = {
+            os.path.normpath(record.value("location")) for record in records
+        }
+        qtc.QThreadPool.globalInstance().start(partial(self._scan, known_locations))
+
+    def _scan_finished_slot(
+        self, batches: int, already_imported: int, without_metadata: list
+    ) -> None:
+        self._batches_queued = batches
+        self._scan_result = (already_imported, without_metadata)
+        if self._batches_inserted == self._batches_queued:
+            self._finish()
+
+    def _scan_progress_slot(self, found: int) -> None:
+        self._found = found
+        self.progress_signal.emit(self._found, self._inserted)
+
+    # </SLOTS>
@@ -0,0 +1,195 @@
+import os
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.database_manager.main import DatabaseManager
+from library_of_h.importer.constants import RECONCILE_DELAY, RECONCILE_INTERVAL
+from library_of_h.importer.main import Importer
+from library_of_h.importer.scanner import layout_roots
+from library_of_h.logger import MainType, get_logger
+from library_of_h.preferences import Preferences
+
+
+class Reconciler(qtc.QObject):
+    """
+    Keeps the database in sync with the gallery directories in the background.
+
+    The directories the `download_preferences/destination_formats` put
+    galleries under are watched; shortly after one of them changes, the
+    galleries under it are synced with `DatabaseManager.sync_with_disk` and the
+    new ones are imported with an `Importer`. Every `RECONCILE_INTERVAL` all of
+    them are, which also catches the changes deeper than the roots' entries,
+    like files added to a gallery, those are not watched.
+
+    Missing galleries are deleted from the database if
+    `explorer_preferences/delete_db_record_if_not_in_disk` is set, they are only
+    logged otherwise.
+    """
+
+    # Emitted with the number of galleries "deleted", "resized" and "imported"
+    # by a sync that changed the database, the "deleted locations" and the new
+    # "sizes" of the resized galleries by location.
+    reconciled_signal = qtc.Signal(dict)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._logger = get_logger(main_type=MainType.DATABASE, sub_types=[])
+        self._database_manager = DatabaseManager.get_instance()
+
+        self._running = False
+        # Directories changed since the last sync, None for all of them.
+        self._pending_directories: Optional[set[str]] = set()
+        # Directories left to import and summary of the running sync.
+        self._import_queue: list[str] = []
+        self._summary: dict = {}
+        self._deleted_locations: list[str] = []
+        self._sizes: dict[str, int] = {}
+        # Database IDs of the missing galleries that were already logged.
+        self._reported_missing: set[int] = set()
+
+        self._watcher = qtc.QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._directory_changed_slot)
+
+        self._delay_timer = qtc.QTimer(self)
+        self._delay_timer.setSingleShot(True)
+        self._delay_timer.setInterval(RECONCILE_DELAY)
+        self._delay_timer.timeout.connect(self._delay_timer_timeout_slot)
+
+        self._interval_timer = qtc.QTimer(self)
+        self._interval_timer.setInterval(RECONCILE_INTERVAL)
+        self._interval_timer.timeout.connect(self.reconcile)
+
+    # <PRIVATE METHODS>
+    def _finish(self) -> None:
+        self._running = False
+        if any(self._summary.values()):
+            self._logger.info(f"Galleries reconciled with disk: {self._summary}")
+            self.reconciled_signal.emit(
+                self._summary
+                | {"deleted locations": self._deleted_locations, "sizes": self._sizes}
+            )
+        if self._pending_directories is None or self._pending_directories:
+            self._delay_timer.start()
+
+    def _import_next(self) -> None:
+        if not self._import_queue:
+            self._finish()
+            return
+
+        importer = Importer(self._import_queue.pop(0), parent=self, verbose=False)
+        importer.finished_signal.connect(self._imported_slot)
+        importer.finished_signal.connect(importer.deleteLater)
+        importer.start()
+
+    def _watch_roots(self) -> list[str]:
+        """
+        Watches the existing roots of the current destination formats, they are
+        read again on every sync in case the preferences changed.
+
+        Returns
+        --------
+            list[str]:
+                The watched roots.
+        """
+        roots = [
+            root
+            for root in layout_roots(
+                Preferences.get_instance()[
+                    "download_preferences", "destination_formats"
+                ]
+            )
+            if os.path.isdir(root)
+        ]
+        if obsolete := set(self._watcher.directories()) - set(roots):
+            self._watcher.removePaths(list(obsolete))
+        if new := set(roots) - set(self._watcher.directories()):
+            self._watcher.addPaths(list(new))
+        return roots
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def reconcile(self, directories: Optional[list[str]] = None) -> None:
+        """
+        Syncs the galleries under `directories`, under every root if None, or
+        once the running sync is done.
+        """
+        if directories is None:
+            self._pending_directories = None
+        elif self._pending_directories is not None:
+            self._pending_directories.update(directories)
+        if self._running:
+            return
+
+        self._delay_timer.stop()
+        roots = self._watch_roots()
+        if self._pending_directories is None:
+            directories = roots
+        else:
+            directories = [
+                directory
+                for directory in self._pending_directories
+                if os.path.isdir(directory)
+            ]
+        self._pending_directories = set()
+        if not directories:
+            return
+
+        self._running = True
+        self._summary = {"deleted": 0, "resized": 0, "imported": 0}
+        self._deleted_locations = []
+        self._sizes = {}
+        self._import_queue = directories
+        if not self._database_manager.sync_with_disk(
+            directories,
+            delete_missing=Preferences.get_instance()[
+                "explorer_preferences", "delete_db_record_if_not_in_disk"
+            ],
+            synced_callback=self._synced_slot,
+        ):
+            # A rescan of the sizes is running, only the import is done.
+            self._import_next()
+
+    def start(self) -> None:
+        """Watches the roots and syncs all of them, now and periodically."""
+        self._pending_directories = None
+        self._delay_timer.start()
+        self._interval_timer.start()
+
+    # </PUBLIC METHODS>
+
+    # <SLOTS>
+    def _delay_timer_timeout_slot(self) -> None:
+        self.reconcile([])
+
+    def _directory_changed_slot(self, path: str) -> None:
+        if self._pending_directories is not None:
+            self._pending_directories.add(path)
+        if not self._running:
+            self._delay_timer.start()
+
+    def _imported_slot(self, summary: dict) -> None:
+        self._summary["imported"] += summary["galleries imported"]
+        self._import_next()
+
+    def _synced_slot(self, summary: dict) -> None:
+        for gallery_database_id, location in summary["missing"]:
+            if gallery_database_id in self._reported_missing:
+                continue
+            self._reported_missing.add(gallery_database_id)
+            self._logger.warning(
+                "[Location Not Found] Location from database does not exist: "
+                f'DATABASE ID={gallery_database_id}, LOCATION="{location}"'
+            )
+        if summary["deleted"]:
+            self._deleted_locations.extend(
+                location for _, location in summary["missing"]
+            )
+        self._sizes.update(summary["sizes"])
+        self._summary["deleted"] += summary["deleted"]
+        self._summary["resized"] += summary["resized"]
+        self._import_next()
+
+    # </SLOTS>
@@ -0,0 +1,158 @@
+import os
+import re
+from typing import NamedTuple, Optional
+
+from library_of_h.database_manager.size_scanner import directory_size
+from library_of_h.importer.constants import SIDECAR_FILE_NAME
+from library_of_h.importer.sidecar import SidecarMetadata, read_sidecar
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+class ScannedGallery(NamedTuple):
+    location: str
+    # From the sidecar, or from the location's layout if there is none.
+    source: Optional[str]
+    gallery_id: Optional[int]
+    # None if the gallery has no valid sidecar.
+    metadata: Optional[SidecarMetadata]
+    size_in_bytes: int
+    download_date: int
+
+
+def layout_patterns(
+    destination_formats: dict[str, dict[str, str]]
+) -> list[tuple[str, re.Pattern]]:
+    """
+    Builds patterns matching the end of the gallery locations that the
+    `download_preferences/destination_formats` of each service produce, from the
+    directory right before the first placeholder. For example
+    '.../Hitomi/{gallery_id}/' matches locations ending with 'Hitomi/<digits>'.
+    Formats without a {gallery_id} placeholder are skipped.
+
+    Returns
+    --------
+        list[tuple[str, re.Pattern]]:
+            (source, pattern) tuples, the pattern's "gallery_id" group is the
+            gallery's ID.
+    """
+    patterns = {}
+    for service, formats in destination_formats.items():
+        for destination_format in formats.values():
+            components = destination_format.replace("\\", "/").strip("/").split("/")
+            first = next(
+                (i for i, component in enumerate(components) if "{" in component),
+                None,
+            )
+            if first is None or "{gallery_id}" not in destination_format:
+                continue
+
+            parts = [re.escape(components[first - 1])] if first > 0 else []
+            for component in components[first:]:
+                part = ""
+                for i, piece in enumerate(_PLACEHOLDER_PATTERN.split(component)):
+                    if i % 2 == 0:
+                        part += re.escape(piece)
+                    elif piece == "gallery_id" and "(?P<gallery_id>" not in part:
+                        part += r"(?P<gallery_id>\d+)"
+                    else:
+                        part += "[^/]*"
+                parts.append(part)
+            pattern = r"(?:^|/){}$".format("/".join(parts))
+            patterns[(service.lower(), pattern)] = None
+
+    return [(source, re.compile(pattern)) for source, pattern in patterns]
+
+
+def layout_roots(destination_formats: dict[str, dict[str, str]]) -> list[str]:
+    """
+    Returns
+    --------
+        list[str]:
+            The directories the `download_preferences/destination_formats` of
+            each service put their galleries under, the part of each format
+            before its first placeholder. For example '.../Hitomi' for
+            '.../Hitomi/{gallery_id}/'.
+    """
+    roots = {}
+    for formats in destination_formats.values():
+        for destination_format in formats.values():
+            components = destination_format.replace("\\", "/").split("/")
+            first = next(
+                (i for i, component in enumerate(components) if "{" in component),
+                len(components),
+            )
+            if root := "/".join(components[:first]).rstrip("/"):
+                roots[os.path.normpath(os.path.abspath(root))] = None
+    return list(roots)
+
+
+def scan_directory(
+    path: str, patterns: list[tuple[str, re.Pattern]]
+) -> tuple[list[str], Optional[ScannedGallery]]:
+    """
+    Lists `path`, a gallery if it has a sidecar or its location matches one of
+    `patterns`.
+
+    Returns
+    --------
+        tuple[list[str], Optional[ScannedGallery]]:
+            The subdirectories to scan next, none for a gallery, and the gallery.
+
+    Raises
+    -------
+        OSError:
+            `path` could not be listed.
+    """
+    with os.scandir(path) as iterator:
+        entries = list(iterator)
+    names = {entry.name for entry in entries}
+
+    metadata = None
+    if SIDECAR_FILE_NAME in names:
+        try:
+            metadata = read_sidecar(path)
+        except (OSError, ValueError):
+            pass
+
+    source = gallery_id = None
+    if metadata is not None:
+        source, gallery_id = metadata.source, metadata.gallery_id
+    else:
+        normalized_path = path.replace(os.sep, "/").rstrip("/")
+        for source, pattern in patterns:
+            if match := pattern.search(normalized_path):
+                gallery_id = int(match.group("gallery_id"))
+                break
+        else:
+            if SIDECAR_FILE_NAME not in names:
+                return [
+                    entry.path
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                ], None
+            source = None
+
+    if (
+        metadata is not None
+        and metadata.files
+        and all(file.name in names for file in metadata.files)
+    ):
+        # The sizes recorded at download time, saves a stat per file.
+        size_in_bytes = sum(file.size for file in metadata.files)
+    else:
+        size_in_bytes = 0
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                size_in_bytes += directory_size(entry.path)
+            elif entry.is_file() and not entry.name.startswith(SIDECAR_FILE_NAME):
+                size_in_bytes += entry.stat().st_size
+
+    if metadata is not None and metadata.download_date is not None:
+        download_date = metadata.download_date
+    else:
+        download_date = int(os.stat(path).st_mtime)
+
+    return [], ScannedGallery(
+        path, source, gallery_id, metadata, size_in_bytes, download_date
+    )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from library_of_h.importer.constants import (HASH_CHUNK_SIZE, SIDECAR_FILE_NAME,
+                                             SIDECAR_VERSION)
+
+if TYPE_CHECKING:
+    from library_of_h.downloader.base_classes.metadata import \
+        GalleryMetadataBase
+
+
+@dataclass
+class SidecarFile:
+    name: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class SidecarMetadata:
+    """
+    Gallery metadata read from a sidecar, with the attributes of
+    `GalleryMetadataBase` that `DatabaseManager` inserts.
+    """
+
+    source: str
+    gallery_id: int
+    title: str
+    japanese_title: str
+    upload_date: int
+    download_date: Optional[int]
+    type: list[str]
+    artists: list[str]
+    characters: list[str]
+    groups: list[str]
+    language: list[str]
+    series: list[str]
+    tags: list[str]
+    pages: int
+    media_id: Optional[int]
+    location: str
+    files: list[SidecarFile] = field(default_factory=list)
+
+
+def read_sidecar(location: str) -> SidecarMetadata:
+    """
+    Reads the sidecar of the gallery at `location`.
+
+    Raises
+    -------
+        OSError:
+            The sidecar could not be read.
+        ValueError:
+            The sidecar is not valid.
+    """
+    with open(os.path.join(location, SIDECAR_FILE_NAME), "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    try:
+        if data["version"] > SIDECAR_VERSION:
+            raise ValueError(f"Unsupported sidecar version {data['version']}.")
+        return SidecarMetadata(
+            source=data["source"],
+            gallery_id=int(data["gallery_id"]),
+            title=data["title"],
+            japanese_title=data["japanese_title"],
+            upload_date=data["upload_date"],
+            download_date=data.get("download_date"),
+            # Empty lists would leave the gallery out of `GalleriesView`.
+            type=data["type"] or ["---"],
+            artists=data["artists"] or ["---"],
+            characters=data["characters"] or ["---"],
+            groups=data["groups"] or ["---"],
+            language=data["language"] or ["---"],
+            series=data["series"] or ["---"],
+            tags=data["tags"] or ["---"],
+            pages=data["pages"],
+            media_id=data.get("media_id"),
+            location=location,
+            files=[
+                SidecarFile(file["name"], file["size"], file["sha256"])
+                for file in data.get("files", ())
+            ],
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid sidecar: {e!r}") from e
+
+
+def sidecar_data(gallery_metadata: GalleryMetadataBase, download_date: int) -> dict:
+    """
+    Returns
+    --------
+        dict:
+            The sidecar fields of `gallery_metadata`, without its files, see
+            `write_sidecar`.
+    """
+    return {
+        "version": SIDECAR_VERSION,
+        "source": gallery_metadata.source,
+        "gallery_id": int(gallery_metadata.gallery_id),
+        "title": gallery_metadata.title,
+        "japanese_title": gallery_metadata.japanese_title,
+        "upload_date": gallery_metadata.upload_date,
+        "download_date": download_date,
+        "type": list(gallery_metadata.type),
+        "artists": list(gallery_metadata.artists),
+        "characters": list(gallery_metadata.characters),
+        "groups": list(gallery_metadata.groups),
+        "language": list(gallery_metadata.language),
+        "series": list(gallery_metadata.series),
+        "tags": list(gallery_metadata.tags),
+        "pages": gallery_metadata.pages,
+        "media_id": getattr(gallery_metadata, "media_id", None),
+    }
+
+
+def write_sidecar(location: str, data: dict) -> None:
+    """
+    Writes the sidecar of the gallery at `location` with `data`, from
+    `sidecar_data`, and the name, size and SHA-256 of each of its files. The
+    sidecar is replaced atomically, a crash leaves either the old or the new one.
+
+    Raises
+    -------
+        OSError:
+            The files could not be read or the sidecar could not be written.
+    """
+    files = []
+    with os.scandir(location) as iterator:
+        entries = sorted(
+            (
+                entry
+                for entry in iterator
+                if entry.is_file() and not entry.name.startswith(SIDECAR_FILE_NAME)
+            ),
+            key=lambda entry: entry.name,
+        )
+    for entry in entries:
+        sha256 = hashlib.sha256()
+        with open(entry.path, "rb") as file:
+            while chunk := file.read(HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        files.append(
+            {
+                "name": entry.name,
+                "size": entry.stat().st_size,
+                "sha256": sha256.hexdigest(),
+            }
+        )
+
+    file_path = os.path.join(location, SIDECAR_FILE_NAME)
+    temporary_file_path = f"{file_path}.tmp"
+    with open(temporary_file_path, "w", encoding="utf-8") as file:
+        json.dump(
+            data | {"files": files}, file, ensure_ascii=False, separators=(",", ":")
+        )
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_file_path, file_path)
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import atexit
+import collections
 import logging
 import logging.handlers
+import queue
+import sqlite3
 from enum import IntEnum, auto
+from typing import Optional
 
-from library_of_h.constants import APP_LOGS_LOCATION
+from PySide6 import QtCore as qtc
+
+from library_of_h.constants import APP_LOGS_LOCATION, LOGS_WIDGET_FLUSH_INTERVAL
+from library_of_h.logs import log_store
 from library_of_h.signals_hub.signals_hub import logger_signals
 
 
@@ -35,9 +43,6 @@ class ExplorerSubType(IntEnum):
 
 
 class FileHandler(logging.handlers.RotatingFileHandler):
-
-    _logger_widget: "Logs"
-
     def __init__(self) -> None:
         super().__init__(
             APP_LOGS_LOCATION,
@@ -49,19 +54,116 @@ class FileHandler(logging.handlers.RotatingFileHandler):
             errors=None,
         )
 
+
+class WidgetHandler(logging.Handler):
+    """
+    Collects formatted records for the Logs widget. The records are appended to
+    the widget in batches by a timer on the GUI thread, see `set_logger_widget`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        # Bounded like the widget's block count, in case no widget is ever set.
+        self.lines: collections.deque[str] = collections.deque(maxlen=1000)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.lines.append(self.format(record).replace("\n", " "))
+        except Exception:
+            self.handleError(record)
+
+
+class LogStoreHandler(logging.Handler):
+    """
+    Writes records to the log store. Records are committed in groups whenever
+    the queue runs empty (see `QueueListener`) instead of one by one.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def close(self) -> None:
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        super().close()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self._connection is None:
+                # Opened on the listener thread, the only one that writes.
+                self._connection = log_store.connect()
+                log_store.delete_old_sessions(self._connection)
+            log_store.insert(self._connection, record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self._connection is not None and self._connection.in_transaction:
+            self._connection.commit()
+
+
+class QueueListener(logging.handlers.QueueListener):
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            # The queue ran empty, flush the handlers before waiting.
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records over to the listener thread so that the thread that logs never
+    waits on file I/O or the GUI. Signals that must take effect immediately
+    (halting the downloader on errors) are still emitted from the logging thread.
+    """
+
     def emit(self, record: logging.LogRecord) -> None:
         super().emit(record)
-        if record.levelno != logging.DEBUG:
-            self._logger_widget.appendPlainText(self.format(record).replace("\n", " "))
         if record.levelno >= logging.WARNING:
             logger_signals.create_logs_icon_signal.emit()
         if record.levelno >= logging.ERROR:
             logger_signals.halt_signal.emit()
             logger_signals.create_message_box_signal.emit(record.levelname)
 
-    @classmethod
-    def set_logger_widget(cls, logger_widget: "Logs") -> None:
-        cls._logger_widget = logger_widget
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_queue)
+_widget_handler = WidgetHandler()
+_queue_listener: Optional[QueueListener] = None
+
+
+def _start_queue_listener() -> None:
+    global _queue_listener
+
+    formatter = logging.Formatter(
+        fmt="<{levelname}><{name}><{asctime}>{msg}",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        style="{",
+    )
+    file_handler = FileHandler()
+    file_handler.setFormatter(formatter)
+    _widget_handler.setFormatter(formatter)
+
+    log_store_handler = LogStoreHandler()
+
+    _queue_listener = QueueListener(
+        _queue,
+        file_handler,
+        _widget_handler,
+        log_store_handler,
+        respect_handler_level=True,
+    )
+    _queue_listener.start()
+    # Writes out whatever is still queued on exit, `atexit` calls in reverse
+    # order of registration.
+    atexit.register(log_store_handler.close)
+    atexit.register(_queue_listener.stop)
 
 
 def get_logger(
@@ -80,15 +182,9 @@ def get_logger(
 
     logger.setLevel(logging.DEBUG)
 
-    file_handler = FileHandler()
-    formatter = logging.Formatter(
-        fmt="<{levelname}><{name}><{asctime}>{msg}",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        style="{",
-    )
-    file_handler.setFormatter(formatter)
-
-    logger.addHandler(file_handler)
+    if _queue_listener is None:
+        _start_queue_listener()
+    logger.addHandler(_queue_handler)
 
     return logger
 
@@ -97,4 +193,15 @@ def set_logger_widget(logger_widget: "Logs") -> None:
     """
     Sets the logger global widget for the Handler.
     """
-    FileHandler.set_logger_widget(logger_widget)
+
+    def _append_lines() -> None:
+        lines = []
+        while _widget_handler.lines:
+            lines.append(_widget_handler.lines.popleft())
+        if lines:
+            logger_widget.appendPlainText("\n".join(lines))
+
+    timer = qtc.QTimer(logger_widget)
+    timer.setInterval(LOGS_WIDGET_FLUSH_INTERVAL)
+    timer.timeout.connect(_append_lines)
+    timer.start()
@@ -1,90 +1,84 @@
+import functools
+import re
+
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 
 from library_of_h.logger import (DownloaderServiceType, DownloaderSubType,
                                  ExplorerSubType, MainType)
 
+# All the rules combined into one alternation, scanned once per block. Where
+# matches of different rules would start at the same position, the first
+# alternative wins, so rules are listed from the highest priority to the lowest.
+_PATTERN = re.compile(
+    "|".join(
+        (
+            # Pathlike strings, the "URL=" or "LOCATION=" part is a keyword.
+            r"(?P<path_keyword> ?(?:URL|LOCATION)=)(?P<path>.+)",
+            r"(?P<keyword>[ A-Z]+=)",
+            r"(?P<square_brackets>\[.+?\])",
+            r'(?P<double_quotes>".+?")',
+            r"(?P<backticks>`.+?`)",
+            r"(?P<date>\d{4}-\d{2}-\d{2}(?:_\d{2}:\d{2}:\d{2})?|\d{2}:\d{2}:\d{2})",
+            "(?P<type>"
+            f"(?:{'|'.join(enum.name for enum in MainType)})"
+            ":?"
+            f"(?:{'|'.join(enum.name for sub_type in [DownloaderSubType, ExplorerSubType] for enum in sub_type)})"
+            ":"
+            f"(?:{'|'.join(enum.name for enum in DownloaderServiceType)})"
+            ")",
+            r"(?P<info>INFO)",
+            r"(?P<warning>DEBUG|WARNING)",
+            r"(?P<error>ERROR|CRITICAL)",
+            r"(?P<numerals>\d+)",
+        )
+    )
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize(text: str) -> tuple[tuple[int, int, str], ...]:
+    """
+    Returns (start, length, rule name) tuples for every match of `_PATTERN`.
+    Cached as the same lines are highlighted again on every rehighlight and in
+    both the live and the search results views.
+    """
+    tokens = []
+    for match in _PATTERN.finditer(text):
+        if match.lastgroup == "path":
+            start, end = match.span("path_keyword")
+            tokens.append((start, end - start, "keyword"))
+        start, end = match.span(match.lastgroup)
+        tokens.append((start, end - start, match.lastgroup))
+    return tuple(tokens)
+
 
 class LogsHighlighter(qtg.QSyntaxHighlighter):
 
-    _rules: list[tuple[qtc.QRegularExpression, qtg.QTextCharFormat]]
+    _formats: dict[str, qtg.QTextCharFormat]
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._rules = list()
-
-        # Numerals
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(0, 134, 68))
-        self._rules.append((qtc.QRegularExpression("\d+"), format_))
-
-        # Level
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(8, 102, 0))
-        self._rules.append((qtc.QRegularExpression("INFO"), format_))
-
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(130, 133, 0))
-        self._rules.append((qtc.QRegularExpression("DEBUG|WARNING"), format_))
-
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtc.Qt.GlobalColor.red)
-        self._rules.append((qtc.QRegularExpression("ERROR|CRITICAL"), format_))
-
-        # Types
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(143, 0, 120))
-        self._rules.append(
-            (
-                qtc.QRegularExpression(
-                    f"({'|'.join(enum.name for enum in MainType)})"
-                    ":?"
-                    f"({'|'.join(enum.name for sub_type in [DownloaderSubType, ExplorerSubType] for enum in sub_type)})"
-                    ":"
-                    f"({'|'.join(enum.name for enum in DownloaderServiceType)})"
-                ),
-                format_,
-            )
-        )
-
-        # Date
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(18, 0, 163))
-        self._rules.append(
-            (
-                qtc.QRegularExpression("(\d{4}-\d{2}-\d{2})?_?(\d{2}:\d{2}:\d{2})?"),
-                format_,
-            )
-        )
-
-        # Backticks
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtc.Qt.GlobalColor.darkGray)
-        self._rules.append((qtc.QRegularExpression("`.+?`"), format_))
-
-        # Double quotes
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtc.Qt.GlobalColor.darkCyan)
-        self._rules.append((qtc.QRegularExpression('".+?"'), format_))
-
-        # Square brackets
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(135, 0, 5))
-        self._rules.append((qtc.QRegularExpression("\[.+?\]"), format_))
-
-        # Pathlike strings
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(6, 69, 173))
-        self._rules.append((qtc.QRegularExpression("(URL|LOCATION)=.+"), format_))
-
-        # Keywords
-        format_ = qtg.QTextCharFormat()
-        format_.setForeground(qtg.QColor(207, 54, 0))
-        self._rules.append((qtc.QRegularExpression(f"[ A-Z]+="), format_))
+        self._formats = dict()
+
+        for name, color in (
+            ("numerals", qtg.QColor(0, 134, 68)),
+            # Level
+            ("info", qtg.QColor(8, 102, 0)),
+            ("warning", qtg.QColor(130, 133, 0)),
+            ("error", qtg.QColor(qtc.Qt.GlobalColor.red)),
+            ("type", qtg.QColor(143, 0, 120)),
+            ("date", qtg.QColor(18, 0, 163)),
+            ("backticks", qtg.QColor(qtc.Qt.GlobalColor.darkGray)),
+            ("double_quotes", qtg.QColor(qtc.Qt.GlobalColor.darkCyan)),
+            ("square_brackets", qtg.QColor(135, 0, 5)),
+            ("path", qtg.QColor(6, 69, 173)),
+            ("keyword", qtg.QColor(207, 54, 0)),
+        ):
+            format_ = qtg.QTextCharFormat()
+            format_.setForeground(color)
+            self._formats[name] = format_
 
     def highlightBlock(self, text: str) -> None:
-        for pattern, format_ in self._rules:
-            match_iterator = pattern.globalMatch(text)
-            while match_iterator.hasNext():
-                match = match_iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), format_)
+        for start, length, name in _tokenize(text):
+            self.setFormat(start, length, self._formats[name])
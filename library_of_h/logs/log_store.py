@@ -0,0 +1,242 @@
+"""
+Append-only SQLite store of structured log records.
+
+Every record of every session is written to the store by the logger's listener
+thread (see `library_of_h.logger.LogStoreHandler`), the Logs tab searches it.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from typing import Optional
+
+from library_of_h.constants import APP_LOG_STORE_LOCATION, LOG_STORE_MAX_SESSIONS
+
+# Identifies the records of the current run of the application.
+SESSION_ID = time.time_ns()
+
+_GALLERY_ID_PATTERN = re.compile(r"GALLERY ID=([^,;\s]+)")
+_URL_PATTERN = re.compile(r"URL=([^,;\s]+)")
+_FILTER_TOKEN_PATTERN = re.compile(r'(?:(\w+):)?("[^"]*"|\S+)')
+
+_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS logs (
+    log_id      INTEGER PRIMARY KEY,
+    session_id  INTEGER NOT NULL,
+    created     REAL NOT NULL,
+    level       INTEGER NOT NULL,
+    level_name  TEXT NOT NULL,
+    logger_name TEXT NOT NULL,
+    main_type   TEXT NOT NULL,
+    sub_types   TEXT NOT NULL,
+    gallery_id  TEXT,
+    url         TEXT,
+    duration    REAL,
+    message     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_session_id_index ON logs(session_id);
+CREATE INDEX IF NOT EXISTS logs_level_index ON logs(level);
+CREATE INDEX IF NOT EXISTS logs_gallery_id_index ON logs(gallery_id);
+CREATE INDEX IF NOT EXISTS logs_url_index ON logs(url);
+CREATE INDEX IF NOT EXISTS logs_logger_name_index
+    ON logs(logger_name COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+    message, content='logs', content_rowid='log_id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+    INSERT INTO logs_fts(rowid, message) VALUES(new.log_id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+    INSERT INTO logs_fts(logs_fts, rowid, message)
+    VALUES('delete', old.log_id, old.message);
+END;
+"""
+
+_INSERT = """
+INSERT INTO logs(
+    session_id, created, level, level_name, logger_name, main_type, sub_types,
+    gallery_id, url, duration, message
+)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Filter keys of `search` and the columns they are equal to.
+_FILTER_COLUMNS = {
+    "gallery": "gallery_id",
+    "session": "session_id",
+}
+# Filter keys of `search` and the columns they are a prefix of, so that their
+# indexes are used.
+_PREFIX_FILTER_COLUMNS = {
+    "url": "url",
+    "type": "logger_name COLLATE NOCASE",
+}
+# Shorter message terms can't be looked up in the trigram index.
+_FTS_MIN_TERM_LENGTH = 3
+
+
+def connect(location: str = APP_LOG_STORE_LOCATION) -> sqlite3.Connection:
+    """
+    Opens the log store, creating the tables if necessary.
+
+    Parameters
+    -----------
+        location (str):
+            Path of the store.
+
+    Returns
+    --------
+        sqlite3.Connection:
+            Connection to the store. It is not bound to the thread that opened
+            it, but must not be used by two threads at once.
+    """
+    connection = sqlite3.connect(location, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    index_exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'logs_fts'"
+    ).fetchone()
+    connection.executescript(_CREATE_TABLES)
+    if index_exists is None:
+        # Indexes the records of a store written before the index existed.
+        connection.execute("INSERT INTO logs_fts(logs_fts) VALUES('rebuild')")
+        connection.commit()
+    return connection
+
+
+def delete_old_sessions(connection: sqlite3.Connection) -> None:
+    """Deletes all but the newest `LOG_STORE_MAX_SESSIONS` sessions."""
+    connection.execute(
+        """
+        DELETE FROM logs WHERE session_id < (
+            SELECT MIN(session_id) FROM (
+                SELECT DISTINCT session_id FROM logs
+                ORDER BY session_id DESC LIMIT ?
+            )
+        )
+        """,
+        (LOG_STORE_MAX_SESSIONS,),
+    )
+    connection.commit()
+
+
+def insert(connection: sqlite3.Connection, record: logging.LogRecord) -> None:
+    """
+    Inserts `record`, the caller commits.
+
+    The gallery id, URL and duration are taken from the record's attributes of
+    the same name (`extra` argument of the logging calls), the gallery id and URL
+    fall back to the "GALLERY ID=" and "URL=" fields of the message.
+    """
+    message = record.getMessage()
+    main_type, _, sub_types = record.name.partition(":")
+
+    gallery_id = getattr(record, "gallery_id", None)
+    if gallery_id is None and (match := _GALLERY_ID_PATTERN.search(message)):
+        gallery_id = match.group(1)
+    url = getattr(record, "url", None)
+    if url is None and (match := _URL_PATTERN.search(message)):
+        url = match.group(1)
+
+    connection.execute(
+        _INSERT,
+        (
+            SESSION_ID,
+            record.created,
+            record.levelno,
+            record.levelname,
+            record.name,
+            main_type,
+            sub_types,
+            None if gallery_id is None else str(gallery_id),
+            url,
+            getattr(record, "duration", None),
+            message,
+        ),
+    )
+
+
+def search(
+    connection: sqlite3.Connection,
+    filter_text: str,
+    before_log_id: Optional[int] = None,
+    limit: int = 100,
+) -> list[tuple]:
+    """
+    Searches the store, newest records first.
+
+    Parameters
+    -----------
+        connection (sqlite3.Connection):
+            Connection to the store.
+        filter_text (str):
+            Whitespace separated terms. "level:<name>" matches records of that
+            level or above, "gallery:<id>" and "session:<id>" match the
+            respective fields, "url:<start>" and "type:<start>" the start of
+            them, any other term must be part of the message. Terms can be
+            double quoted.
+        before_log_id (Optional[int]):
+            Only records older than this one are returned, used to fetch the
+            next page of results.
+        limit (int):
+            Maximum number of records returned.
+
+    Returns
+    --------
+        list[tuple]:
+            (log_id, created, level_name, logger_name, message) tuples.
+    """
+    conditions = []
+    parameters = []
+    message_terms = []
+    for key, value in _FILTER_TOKEN_PATTERN.findall(filter_text):
+        value = value.strip('"')
+        key = key.lower()
+        if key == "level":
+            level = logging.getLevelName(value.upper())
+            if isinstance(level, int):
+                conditions.append("level >= ?")
+                parameters.append(level)
+                continue
+        elif key in _FILTER_COLUMNS:
+            conditions.append(f"{_FILTER_COLUMNS[key]} = ?")
+            parameters.append(value)
+            continue
+        elif key in _PREFIX_FILTER_COLUMNS:
+            if value:
+                column = _PREFIX_FILTER_COLUMNS[key]
+                if key == "type":
+                    value = value.lower()
+                # The values starting with `value` sort between it and `value`
+                # with its last character incremented.
+                conditions.append(f"{column} >= ? AND {column} < ?")
+                parameters.extend((value, value[:-1] + chr(ord(value[-1]) + 1)))
+            continue
+        elif key:
+            value = f"{key}:{value}"
+        if len(value) < _FTS_MIN_TERM_LENGTH:
+            conditions.append("message LIKE ?")
+            parameters.append(f"%{value}%")
+        else:
+            message_terms.append('"{}"'.format(value.replace('"', '""')))
+
+    if message_terms:
+        conditions.append(
+            "log_id IN (SELECT rowid FROM logs_fts WHERE logs_fts MATCH ?)"
+        )
+        parameters.append(" ".join(message_terms))
+
+    if before_log_id is not None:
+        conditions.append("log_id < ?")
+        parameters.append(before_log_id)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return connection.execute(
+        f"""
+        SELECT log_id, created, level_name, logger_name, message FROM logs
+        {where}
+        ORDER BY log_id DESC LIMIT ?
+        """,
+        (*parameters, limit),
+    ).fetchall()
@@ -1,8 +1,15 @@
+import time
+from typing import Optional
+
 from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from PySide6 import QtWidgets as qtw
 
+from library_of_h.constants import LOG_STORE_SEARCH_LIMIT
 from library_of_h.custom_widgets.code_editor import CodeEditor
 from library_of_h.logs.custom_sub_classes.logs_highlighter import \
     LogsHighlighter
+from library_of_h.logs.workers.search_logs import SearchLogsWorker
 
 
 class Logs(CodeEditor):
@@ -12,3 +19,105 @@ class Logs(CodeEditor):
         self._plain_text_edit.setReadOnly(True)
         self._plain_text_edit.setMaximumBlockCount(1000)
         self._syntax_highlighter = LogsHighlighter(self.document())
+
+        # Results of the filter, searched in the log store of all sessions.
+        self._filter_line_edit = qtw.QLineEdit()
+        self._filter_line_edit.setPlaceholderText(
+            'Search all sessions: level:error gallery:<id> url:<part> type:<part> "text"'
+        )
+        self._filter_line_edit.setClearButtonEnabled(True)
+        self._results_plain_text_edit = qtw.QPlainTextEdit()
+        self._results_plain_text_edit.setReadOnly(True)
+        self._results_plain_text_edit.setWordWrapMode(
+            qtg.QTextOption.WrapMode.NoWrap
+        )
+        self._results_plain_text_edit.hide()
+        self._results_syntax_highlighter = LogsHighlighter(
+            self._results_plain_text_edit.document()
+        )
+
+        self.layout().insertWidget(0, self._filter_line_edit)
+        self.layout().insertWidget(2, self._results_plain_text_edit)
+
+        self._search_generation = 0
+        self._searching = False
+        self._results_exhausted = True
+        self._last_log_id: Optional[int] = None
+
+        self._search_timer = qtc.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)
+        self._search_timer.timeout.connect(self._search)
+
+        self._filter_line_edit.textChanged.connect(self._search_timer.start)
+        self._results_plain_text_edit.verticalScrollBar().valueChanged.connect(
+            self._results_scrolled_slot
+        )
+
+    # <PRIVATE METHODS>
+    def _fetch_results(self) -> None:
+        self._searching = True
+        worker = SearchLogsWorker(
+            parent=self,
+            generation=self._search_generation,
+            filter_text=self._filter_line_edit.text(),
+            before_log_id=self._last_log_id,
+            limit=LOG_STORE_SEARCH_LIMIT,
+        )
+        worker.records_found_signal.connect(self._records_found_slot)
+        qtc.QThreadPool.globalInstance().start(worker.search)
+
+    def _search(self) -> None:
+        self._search_generation += 1
+        self._results_plain_text_edit.clear()
+        self._last_log_id = None
+        self._results_exhausted = False
+
+        searching = bool(self._filter_line_edit.text().strip())
+        self._plain_text_edit.setVisible(not searching)
+        self._line_number_area.setVisible(not searching)
+        self._results_plain_text_edit.setVisible(searching)
+        if searching:
+            self._fetch_results()
+
+    # </PRIVATE METHODS>
+
+    # <SLOTS>
+    def _records_found_slot(self, generation: int, records: list[tuple]) -> None:
+        self.sender().deleteLater()
+        if generation != self._search_generation:
+            return
+        self._searching = False
+        self._results_exhausted = len(records) < LOG_STORE_SEARCH_LIMIT
+        if not records:
+            return
+
+        # Appending at the end of the results would otherwise scroll along and
+        # trigger fetching the next page straight away.
+        scroll_bar = self._results_plain_text_edit.verticalScrollBar()
+        value = scroll_bar.value()
+        scroll_bar.blockSignals(True)
+        self._last_log_id = records[-1][0]
+        self._results_plain_text_edit.appendPlainText(
+            "\n".join(
+                f"<{level_name}><{logger_name}>"
+                f"<{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))}>"
+                f"{message}".replace("\n", " ")
+                for _, created, level_name, logger_name, message in records
+            )
+        )
+        scroll_bar.setValue(value)
+        scroll_bar.blockSignals(False)
+
+    def _results_scrolled_slot(self, value: int) -> None:
+        # Fetch the next page of results once the end is reached.
+        scroll_bar = self._results_plain_text_edit.verticalScrollBar()
+        if (
+            value == scroll_bar.maximum()
+            and not self._searching
+            and not self._results_exhausted
+            and self._filter_line_edit.text().strip()
+        ):
+            self._fetch_results()
+
+    # </SLOTS>
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+
+from library_of_h.logs import log_store
+
+
+class SearchLogsWorker(qtc.QObject):
+
+    # Emitted with the generation and a list of `log_store.search` rows.
+    records_found_signal = qtc.Signal(int, object)
+
+    def __init__(
+        self,
+        parent: qtc.QObject,
+        generation: int,
+        filter_text: str,
+        before_log_id: Optional[int],
+        limit: int,
+    ) -> None:
+        super().__init__(parent=parent)
+        self._generation = generation
+        self._filter_text = filter_text
+        self._before_log_id = before_log_id
+        self._limit = limit
+
+    def search(self) -> None:
+        connection = log_store.connect()
+        try:
+            records = log_store.search(
+                connection, self._filter_text, self._before_log_id, self._limit
+            )
+        finally:
+            connection.close()
+        self.records_found_signal.emit(self._generation, records)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import sys
+import time
+from typing import TYPE_CHECKING, Optional
 
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
@@ -8,18 +10,55 @@ from PySide6 import QtWidgets as qtw
 
 from library_of_h.custom_widgets.splitter import Splitter
 from library_of_h.database_manager.main import DatabaseManager
-from library_of_h.downloader.main import Downloader
 from library_of_h.explorer.main import Explorer
-from library_of_h.logs.main import Logs
-from library_of_h.preferences_dialog import PreferencesDialog
 from library_of_h.signals_hub.signals_hub import logger_signals, main_signals
 from library_of_h.viewer.main import Viewer
 
 from . import logger
 
+if TYPE_CHECKING:
+    # Imported when their tabs are first shown.
+    from library_of_h.downloader.main import Downloader
+    from library_of_h.logs.main import Logs
+
+
+class StartupReport(qtc.QObject):
+    """
+    Prints the time taken by each startup phase to stderr, in the format of
+    `python -X importtime`, up until the Explorer is first painted.
+    """
+
+    def __init__(self, started_at: float) -> None:
+        super().__init__()
+        self._phases: list[tuple[str, float]] = []
+        self._last_time = started_at
+        self._started_at = started_at
+
+    def eventFilter(self, watched: qtc.QObject, event: qtc.QEvent) -> bool:
+        if event.type() == qtc.QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            self.add_phase("first Explorer frame")
+            self.print()
+        return False
+
+    def add_phase(self, name: str) -> None:
+        now = time.perf_counter()
+        self._phases.append((name, now - self._last_time))
+        self._last_time = now
+
+    def print(self) -> None:
+        print("startup: self [us] | cumulative | phase", file=sys.stderr)
+        cumulative = 0
+        for name, duration in self._phases:
+            cumulative += duration
+            print(
+                f"startup: {duration * 1e6:>9.0f} | {cumulative * 1e6:>10.0f} | {name}",
+                file=sys.stderr,
+            )
+
 
 class LibraryOfH(qtw.QMainWindow):
-    def __init__(self, logger_widget, *args, **kwargs) -> None:
+    def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.setWindowTitle("Library of H")
         self.setMinimumSize(600, 400)
@@ -35,12 +74,14 @@ class LibraryOfH(qtw.QMainWindow):
         self._create_viewer_widget()
 
         self._explorer = Explorer(parent=self)
-        self._downloader = Downloader(parent=self)
-        self._logger_widget = logger_widget
+        self._downloader: Optional[Downloader] = None
+        self._logger_widget: Optional[Logs] = None
 
-        self._tab_widget.insertTab(1, self._downloader, "Downloader")
+        # The Downloader and Logs tabs hold placeholders until they are first
+        # shown, see `_create_deferred_tab`.
         self._tab_widget.insertTab(0, self._explorer, "Explorer")
-        self._tab_widget.insertTab(2, self._logger_widget, "Logs")
+        self._tab_widget.insertTab(1, qtw.QWidget(), "Downloader")
+        self._tab_widget.insertTab(2, qtw.QWidget(), "Logs")
 
         self._splitter.addWidget(self._tab_widget)
         self._splitter.addWidget(self._viewer)
@@ -127,7 +168,9 @@ class LibraryOfH(qtw.QMainWindow):
     def closeEvent(self, event: qtg.QCloseEvent) -> None:
         # self._viewer.clean_up()
         # self._explorer.clean_up()
-        clean_up_results: dict = self._downloader.close()
+        clean_up_results: dict = (
+            {} if self._downloader is None else self._downloader.close()
+        )
 
         if clean_up_results == {}:
             DatabaseManager.clean_up()
@@ -168,6 +211,30 @@ class LibraryOfH(qtw.QMainWindow):
         message.setDetailedText(detailed_text)
         return message.exec()
 
+    def _create_deferred_tab(self, index: int) -> None:
+        if index == 1 and self._downloader is None:
+            from library_of_h.downloader.main import Downloader
+
+            self._downloader = Downloader(parent=self)
+            widget, text = self._downloader, "Downloader"
+        elif index == 2 and self._logger_widget is None:
+            from library_of_h.logs.main import Logs
+
+            self._logger_widget = Logs()
+            logger.set_logger_widget(self._logger_widget)
+            widget, text = self._logger_widget, "Logs"
+        else:
+            return
+
+        placeholder = self._tab_widget.widget(index)
+        icon = self._tab_widget.tabIcon(index)
+        self._tab_widget.blockSignals(True)
+        self._tab_widget.removeTab(index)
+        self._tab_widget.insertTab(index, widget, icon, text)
+        self._tab_widget.setCurrentIndex(index)
+        self._tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+
     def _create_logger_messsage_box_slot(self, level: str) -> None:
         qtw.QMessageBox.critical(
             self, level, "An error occured, see the logs for details."
@@ -182,6 +249,22 @@ class LibraryOfH(qtw.QMainWindow):
             self._menu_bar_action_preferences,
         )
         menu.setToolTip("Open preferences dialog")
+        menu.addAction(
+            "&Optimize database",
+            lambda: DatabaseManager.get_instance().run_maintenance(show_progress=True),
+        )
+        menu.addAction(
+            "&Export database statistics...",
+            self._menu_bar_action_export_database_statistics,
+        )
+        menu.addAction(
+            "&Import library...",
+            self._menu_bar_action_import_library,
+        )
+        menu.addAction(
+            "&Rescan gallery sizes",
+            lambda: DatabaseManager.get_instance().rescan_sizes(),
+        )
 
     def _create_splitter_widget(self) -> None:
         self._splitter = Splitter(parent=self)
@@ -194,7 +277,52 @@ class LibraryOfH(qtw.QMainWindow):
     def _create_viewer_widget(self) -> None:
         self._viewer = Viewer(parent=self)
 
+    def _menu_bar_action_export_database_statistics(self):
+        file_path, _ = qtw.QFileDialog.getSaveFileName(
+            self,
+            "Export database statistics",
+            "database_statistics.json",
+            "JSON files (*.json)",
+        )
+        if file_path:
+            DatabaseManager.get_instance().export_query_stats(file_path)
+
+    def _menu_bar_action_import_library(self):
+        from library_of_h.custom_widgets.progress_dialog import ProgressDialog
+        from library_of_h.importer.main import Importer
+
+        root = qtw.QFileDialog.getExistingDirectory(self, "Import library")
+        if not root:
+            return
+
+        importer = Importer(root, parent=self)
+        progress_dialog = ProgressDialog("Scanning...", "Cancel", 0, 0, self)
+        progress_dialog.setWindowTitle("Library import")
+        progress_dialog.canceled.connect(importer.cancel)
+        importer.progress_signal.connect(
+            lambda found, imported: progress_dialog.setLabelText(
+                f"Found {found} galleries, imported {imported}."
+            )
+        )
+
+        def _finished(summary: dict) -> None:
+            progress_dialog.deleteLater()
+            importer.deleteLater()
+            qtw.QMessageBox.information(
+                self,
+                "Library import",
+                "\n".join(
+                    f"{key.capitalize()}: {value}" for key, value in summary.items()
+                ),
+            )
+
+        importer.finished_signal.connect(_finished)
+        progress_dialog.open()
+        importer.start()
+
     def _menu_bar_action_preferences(self):
+        from library_of_h.preferences_dialog import PreferencesDialog
+
         preference_dialog = PreferencesDialog(self)
         preference_dialog.exec()
 
@@ -211,6 +339,7 @@ class LibraryOfH(qtw.QMainWindow):
             )
 
     def _tab_widget_current_changed_slot(self, index: int) -> None:
+        self._create_deferred_tab(index)
         if index == 2:
             self._tab_widget.setTabIcon(2, qtg.QIcon())
         if index == 1:
@@ -221,20 +350,39 @@ class LibraryOfH(qtw.QMainWindow):
     # </SLOTS>
 
 
-def main() -> None:
+def main(started_at: Optional[float] = None) -> None:
+    """
+    Parameters
+    -----------
+        started_at (Optional[float]):
+            `time.perf_counter()` before the application's modules were imported,
+            the startup report is printed when run with "--startup-report".
+    """
+    startup_report = None
+    if "--startup-report" in sys.argv:
+        startup_report = StartupReport(
+            time.perf_counter() if started_at is None else started_at
+        )
+        startup_report.add_phase("imports")
+
     qtc.QCoreApplication.setOrganizationName("London69")
     qtc.QCoreApplication.setApplicationName("Library of H")
     qtc.QDir.addSearchPath("assets", "library_of_h/assets/")
     qtc.QThreadPool.globalInstance().setMaxThreadCount(4)
 
     app = qtw.QApplication(sys.argv)
+    if startup_report is not None:
+        startup_report.add_phase("QApplication")
 
-    logger_widget = Logs()
-    logger.set_logger_widget(logger_widget)
     database_manager = DatabaseManager.get_instance()
     if database_manager is None:
         return
     del database_manager
+    if startup_report is not None:
+        startup_report.add_phase("DatabaseManager")
 
-    LoH = LibraryOfH(logger_widget)
+    LoH = LibraryOfH()
+    if startup_report is not None:
+        startup_report.add_phase("main window")
+        LoH._explorer.installEventFilter(startup_report)
     return app.exec()
@@ -19,9 +19,33 @@ class Preferences:
     _preferences_defaults_dict = NestedDict(
         {
             "explorer_preferences": {"delete_db_record_if_not_in_disk": False},
-            "database_preferences": {"location": USER_DATA_DIRECTORY},
+            "database_preferences": {
+                "location": USER_DATA_DIRECTORY,
+                # Whether to capture the EXPLAIN QUERY PLAN of slow queries.
+                "explain_slow_queries": False,
+                # PRAGMA statements run on every connection of the given role.
+                "pragmas": {
+                    "write": {
+                        "busy_timeout": 5000,  # Milliseconds.
+                        "cache_size": -65536,  # KiB (negative) or pages.
+                        "mmap_size": 268_435_456,  # 256 MiB.
+                        "synchronous": "NORMAL",  # Durable in WAL mode.
+                        "temp_store": "MEMORY",
+                        "wal_autocheckpoint": 1000,  # Pages.
+                    },
+                    "read": {
+                        "busy_timeout": 5000,
+                        "cache_size": -65536,
+                        "mmap_size": 268_435_456,
+                        "temp_store": "MEMORY",
+                    },
+                },
+            },
             "download_preferences": {
                 "overwrite": False,
+                # When downloaded files are synced to disk: "file", before each
+                # one is renamed to its final name, or "never", left to the OS.
+                "fsync": "file",
                 "destination_formats": {
                     "Hitomi": {
                         "Artist(s)": USER_DATA_DIRECTORY + "/Hitomi/{gallery_id}/",
@@ -129,9 +153,29 @@ class Preferences:
 
 PREFERENCES_TEMPLATE = {
     "explorer_preferences": {"delete_db_record_if_not_in_disk": ""},
-    "database_preferences": {"location": ""},
+    "database_preferences": {
+        "location": "",
+        "explain_slow_queries": "",
+        "pragmas": {
+            "write": {
+                "busy_timeout": "",
+                "cache_size": "",
+                "mmap_size": "",
+                "synchronous": "",
+                "temp_store": "",
+                "wal_autocheckpoint": "",
+            },
+            "read": {
+                "busy_timeout": "",
+                "cache_size": "",
+                "mmap_size": "",
+                "temp_store": "",
+            },
+        },
+    },
     "download_preferences": {
         "overwrite": "",
+        "fsync": "",
         "destination_formats": {
             "Hitomi": {
                 "Artist(s)": "",
@@ -170,7 +170,7 @@ class PreferencesDialog(qtw.QDialog):
 
         self._preferences_widget = qtw.QWidget()
         self._preferences_widget.setLayout(qtw.QVBoxLayout())
-        self._preferences_widget.setMaximumHeight(213 + 84)
+        self._preferences_widget.setMaximumHeight(213 + 84 + 28)
 
         self._preferences_scroll_area = qtw.QScrollArea(self)
         self._preferences_scroll_area.setWidgetResizable(True)
@@ -203,6 +203,11 @@ class PreferencesDialog(qtw.QDialog):
         self._preferences_copy[
             "download_preferences", "overwrite"
         ] = self._downloader_overwrite_check_box.isChecked()
+        self._preferences_copy["download_preferences", "fsync"] = (
+            "file"
+            if self._downloader_fsync_combobox.currentText() == "After each file"
+            else "never"
+        )
 
         if self._preferences != self._preferences_copy:
             self._preferences_copy.get_difference().save()
@@ -274,7 +279,7 @@ class PreferencesDialog(qtw.QDialog):
 
     def _create_downloader_preferences(self):
         self._downloader_group_box = qtw.QGroupBox("Downloader preferences", self)
-        self._downloader_group_box.setMaximumHeight(106)
+        self._downloader_group_box.setMaximumHeight(134)
         self._downloader_group_box.setLayout(qtw.QFormLayout())
 
         self._downloader_overwrite_check_box = qtw.QCheckBox(self)
@@ -286,6 +291,10 @@ class PreferencesDialog(qtw.QDialog):
             )
         )
 
+        self._downloader_fsync_label = qtw.QLabel("Sync files to disk:")
+        self._downloader_fsync_combobox = qtw.QComboBox(self)
+        self._downloader_fsync_combobox.addItems(["After each file", "Never"])
+
         self._downloader_destination_formats_widget = qtw.QWidget()
         self._downloader_destination_formats_widget.setLayout(qtw.QGridLayout())
 
@@ -319,6 +328,9 @@ class PreferencesDialog(qtw.QDialog):
         self._downloader_group_box.layout().addRow(
             self._downloader_overwrite_check_box, self._downloader_overwrite_label
         )
+        self._downloader_group_box.layout().addRow(
+            self._downloader_fsync_label, self._downloader_fsync_combobox
+        )
         self._downloader_group_box.layout().addRow(
             self._downloader_destination_formats_widget
         )
@@ -357,6 +369,12 @@ class PreferencesDialog(qtw.QDialog):
         self._downloader_overwrite_check_box.setChecked(
             self._preferences_copy[(*mode, "download_preferences", "overwrite")]
         )
+        self._downloader_fsync_combobox.setCurrentText(
+            "After each file"
+            if self._preferences_copy[(*mode, "download_preferences", "fsync")]
+            == "file"
+            else "Never"
+        )
 
     def _database_location_dialog_button_clicked_slot(self) -> None:
         self._database_location_line_edit.setText(
@@ -0,0 +1,28 @@
+# Number of pages after/before the current page that are decoded in the
+# background while reading.
+PREFETCH_PAGES_AHEAD = 3
+PREFETCH_PAGES_BEHIND = 1
+# Maximum size of the decoded pages kept in memory.
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Number of threads decoding pages.
+PAGE_DECODE_THREADS = 2
+# Thread pool priorities, the requested page is decoded before prefetched ones.
+CURRENT_PAGE_PRIORITY = 1
+PREFETCH_PAGE_PRIORITY = 0
+# Pages with more pixels than `TILED_IMAGE_MIN_PIXELS` or a side longer than
+# `TILED_IMAGE_MIN_SIDE` are never decoded whole, they are rendered in tiles.
+TILED_IMAGE_MIN_PIXELS = 16_000_000
+TILED_IMAGE_MIN_SIDE = 8192
+# Side of a tile in pixels of the level it's decoded at.
+TILE_SIZE = 512
+# Maximum size of the decoded tiles of a page kept in memory.
+TILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Maximum number of pixels of the low resolution preview of a tiled page.
+TILED_IMAGE_PREVIEW_MAX_PIXELS = 1_000_000
+# Vertical space between pages in continuous scroll mode.
+CONTINUOUS_PAGE_SPACING = 10
+# In continuous scroll mode, pages within `CONTINUOUS_LOAD_MARGIN` viewport
+# heights of the viewport are loaded and pages further than
+# `CONTINUOUS_EVICT_MARGIN` viewport heights are unloaded.
+CONTINUOUS_LOAD_MARGIN = 1
+CONTINUOUS_EVICT_MARGIN = 3
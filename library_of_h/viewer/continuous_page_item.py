@@ -0,0 +1,83 @@
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from PySide6 import QtWidgets as qtw
+
+from library_of_h.viewer.tiled_image_item import TiledImageItem
+from library_of_h.viewer.workers.decode_page import is_large_image
+
+
+class ContinuousPageItem(qtw.QGraphicsItem):
+    """
+    A page in the viewer's continuous scroll mode. Sized from the image header
+    and drawn as a placeholder until a decoded image is set, large images are
+    shown by a child `TiledImageItem` while loaded.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        image_size: qtc.QSize,
+        parent: Optional[qtw.QGraphicsItem] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._file_path = file_path
+        self._image_size = image_size
+        self._pixmap: Optional[qtg.QPixmap] = None
+        self._tiled_image_item: Optional[TiledImageItem] = None
+
+    # <PARENT OVERRIDES>
+    def boundingRect(self) -> qtc.QRectF:
+        return qtc.QRectF(0, 0, self._image_size.width(), self._image_size.height())
+
+    def paint(
+        self,
+        painter: qtg.QPainter,
+        option: qtw.QStyleOptionGraphicsItem,
+        widget: Optional[qtw.QWidget] = None,
+    ) -> None:
+        if self._pixmap is not None:
+            painter.drawPixmap(self.boundingRect(), self._pixmap, self._pixmap.rect())
+        elif self._tiled_image_item is None:
+            painter.fillRect(self.boundingRect(), qtc.Qt.GlobalColor.darkGray)
+
+    # </PARENT OVERRIDES>
+
+    # <PUBLIC METHODS>
+    def load(self, thread_pool: qtc.QThreadPool) -> None:
+        """Creates the child tiled item of a large page."""
+        if self._tiled_image_item is None:
+            self._tiled_image_item = TiledImageItem(
+                self._file_path, self._image_size, thread_pool, parent=self
+            )
+
+    def set_image(self, image: qtg.QImage) -> None:
+        self._pixmap = qtg.QPixmap.fromImage(image)
+        self.update()
+
+    def unload(self) -> None:
+        """Drops the pixmap or the tiled item, falling back to the placeholder."""
+        self._pixmap = None
+        if self._tiled_image_item is not None:
+            self.scene().removeItem(self._tiled_image_item)
+            self._tiled_image_item.deleteLater()
+            self._tiled_image_item = None
+        self.update()
+
+    # </PUBLIC METHODS>
+
+    # <PROPERTIES>
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def is_large(self) -> bool:
+        return is_large_image(self._image_size)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._pixmap is not None or self._tiled_image_item is not None
+
+    # </PROPERTIES>
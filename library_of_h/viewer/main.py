@@ -1,3 +1,4 @@
+import bisect
 import os
 from typing import Optional
 
@@ -5,13 +6,26 @@ from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 from PySide6 import QtWidgets as qtw
 
+from library_of_h.importer.constants import SIDECAR_FILE_NAME
 from library_of_h.signals_hub.signals_hub import browser_signals
+from library_of_h.viewer.constants import (CONTINUOUS_EVICT_MARGIN,
+                                           CONTINUOUS_LOAD_MARGIN,
+                                           CONTINUOUS_PAGE_SPACING,
+                                           CURRENT_PAGE_PRIORITY,
+                                           PREFETCH_PAGE_PRIORITY,
+                                           PREFETCH_PAGES_AHEAD,
+                                           PREFETCH_PAGES_BEHIND)
+from library_of_h.viewer.continuous_page_item import ContinuousPageItem
+from library_of_h.viewer.page_cache import PageCache
+from library_of_h.viewer.tiled_image_item import TiledImageItem
+from library_of_h.viewer.workers.decode_page import is_large_image
 
 
 class Viewer(qtw.QGraphicsView):
     _current_gallery_location: str = ''
     _current_page_number: int = 0
     _files: list[str] = []
+    _continuous: bool = False  # Whether all pages are laid out vertically.
     _ZOOM_IN_FACTOR = 1.2
     _ZOOM_OUT_FACTOR = 0.7
 
@@ -30,14 +44,153 @@ class Viewer(qtw.QGraphicsView):
         self._scene.addItem(self._pixmap_item)
         self.setScene(self._scene)
 
+        self._tiled_image_item: Optional[TiledImageItem] = None
+
+        self._continuous_page_items: list[ContinuousPageItem] = []
+        self._continuous_page_items_by_file_path: dict[str, ContinuousPageItem] = {}
+        self._continuous_page_tops: list[float] = []
+        self._loaded_continuous_pages: set[int] = set()
+        self.verticalScrollBar().valueChanged.connect(self._update_continuous_pages)
+
+        self._page_cache = PageCache(self)
+        self._page_cache.page_decoded_signal.connect(self._page_decoded_slot)
+
         browser_signals.view_new_item_signal.connect(self._load_gallery)
 
     def _load_gallery(self, location: str) -> None:
-        self._files = sorted(os.listdir(location))
+        self._page_cache.clear()
+        self._files = sorted(
+            name
+            for name in os.listdir(location)
+            if not name.startswith(SIDECAR_FILE_NAME)
+        )
         self._current_gallery_location = location
-        self._change_page(1)
+        if self._continuous:
+            self._current_page_number = 1
+            self._create_continuous_layout()
+        else:
+            self._change_page(1)
+
+    def _create_continuous_layout(self) -> None:
+        self._remove_continuous_layout()
+
+        # Pages are sized from their headers, nothing is decoded here.
+        top = 0
+        width = 0
+        image_size = qtc.QSize(1, 1)
+        for file in self._files:
+            file_path = os.path.join(self._current_gallery_location, file)
+            header_size = qtg.QImageReader(file_path).size()
+            if header_size.isValid():
+                # Otherwise keep the size of the previous page.
+                image_size = header_size
+            item = ContinuousPageItem(file_path, image_size)
+            item.setY(top)
+            self._scene.addItem(item)
+            self._continuous_page_items.append(item)
+            self._continuous_page_items_by_file_path[file_path] = item
+            self._continuous_page_tops.append(top)
+            top += image_size.height() + CONTINUOUS_PAGE_SPACING
+            width = max(width, image_size.width())
+
+        for item in self._continuous_page_items:
+            item.setX((width - item.boundingRect().width()) / 2)
+        self.setSceneRect(0, 0, width, max(0, top - CONTINUOUS_PAGE_SPACING))
+
+        self._scroll_to_page(self._current_page_number)
+        self._update_continuous_pages()
+
+    def _remove_continuous_layout(self) -> None:
+        for item in self._continuous_page_items:
+            item.unload()
+            self._scene.removeItem(item)
+        self._continuous_page_items = []
+        self._continuous_page_items_by_file_path = {}
+        self._continuous_page_tops = []
+        self._loaded_continuous_pages = set()
+
+    def _scroll_to_page(self, page_number: int) -> None:
+        if not 1 <= page_number <= len(self._continuous_page_items):
+            return
+        item = self._continuous_page_items[page_number - 1]
+        top = self.mapFromScene(qtc.QPointF(0, item.y())).y()
+        self.verticalScrollBar().setValue(self.verticalScrollBar().value() + top)
+
+    def _set_continuous(self, continuous: bool) -> None:
+        self._continuous = continuous
+        if not self._files:
+            return
+
+        if continuous:
+            self._remove_tiled_image_item()
+            self._pixmap_item.setPixmap(qtg.QPixmap())
+            self._create_continuous_layout()
+        else:
+            self._remove_continuous_layout()
+            self._change_page(self._current_page_number)
+
+    def _update_continuous_pages(self) -> None:
+        if not self._continuous or not self._continuous_page_items:
+            return
+
+        visible_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        height = visible_rect.height()
+        self._current_page_number = max(
+            1, bisect.bisect_right(self._continuous_page_tops, visible_rect.center().y())
+        )
+
+        def _page_range(margin: int) -> range:
+            return range(
+                max(
+                    0,
+                    bisect.bisect_right(
+                        self._continuous_page_tops, visible_rect.top() - height * margin
+                    )
+                    - 1,
+                ),
+                bisect.bisect_right(
+                    self._continuous_page_tops, visible_rect.bottom() + height * margin
+                ),
+            )
+
+        evict_range = _page_range(CONTINUOUS_EVICT_MARGIN)
+        for index in tuple(self._loaded_continuous_pages):
+            if index not in evict_range:
+                self._continuous_page_items[index].unload()
+                self._loaded_continuous_pages.discard(index)
+
+        visible_range = _page_range(0)
+        for index in _page_range(CONTINUOUS_LOAD_MARGIN):
+            item = self._continuous_page_items[index]
+            if item.is_loaded:
+                continue
+            if item.is_large:
+                item.load(self._page_cache.thread_pool)
+                self._loaded_continuous_pages.add(index)
+            elif (image := self._page_cache.get(item.file_path)) is not None:
+                item.set_image(image)
+                self._loaded_continuous_pages.add(index)
+            else:
+                # Set by `_page_decoded_slot` once decoded.
+                self._page_cache.request(
+                    item.file_path,
+                    CURRENT_PAGE_PRIORITY
+                    if index in visible_range
+                    else PREFETCH_PAGE_PRIORITY,
+                )
+
+    def _get_page_file_path(self, page_number: int) -> Optional[str]:
+        if not 1 <= page_number <= len(self._files):
+            return None
+        return os.path.join(self._current_gallery_location, self._files[page_number - 1])
 
     def _change_page(self, requested_page_number: int) -> None:
+        if self._continuous:
+            if 1 <= requested_page_number <= len(self._files):
+                self._current_page_number = requested_page_number
+                self._scroll_to_page(requested_page_number)
+            return
+
         page_number_backup = self._current_page_number
         self._current_page_number = requested_page_number
         try:
@@ -47,18 +200,79 @@ class Viewer(qtw.QGraphicsView):
         except IndexError:
             self._current_page_number = page_number_backup
         else:
-            new_pixmap = qtg.QPixmap(os.path.join(self._current_gallery_location, new_file))
-            self._pixmap_item.setPixmap(new_pixmap)
-            self.setSceneRect(0, 0, new_pixmap.width(), new_pixmap.height())
+            file_path = os.path.join(self._current_gallery_location, new_file)
+            image = self._page_cache.get(file_path)
+            if image is not None:
+                self._show_image(image)
+            elif is_large_image(image_size := qtg.QImageReader(file_path).size()):
+                self._show_tiled_image(file_path, image_size)
+            else:
+                # Shown by `_page_decoded_slot` once decoded.
+                self._page_cache.request(file_path, CURRENT_PAGE_PRIORITY)
+            self._prefetch()
+
+    def _prefetch(self) -> None:
+        offsets = [*range(1, PREFETCH_PAGES_AHEAD + 1)] + [
+            -offset for offset in range(1, PREFETCH_PAGES_BEHIND + 1)
+        ]
+        for offset in offsets:
+            file_path = self._get_page_file_path(self._current_page_number + offset)
+            if file_path is not None:
+                self._page_cache.request(file_path)
+
+    def _page_decoded_slot(self, file_path: str, image: qtg.QImage) -> None:
+        if self._continuous:
+            item = self._continuous_page_items_by_file_path.get(file_path)
+            if item is not None and not image.isNull():
+                item.set_image(image)
+                self._loaded_continuous_pages.add(
+                    self._continuous_page_items.index(item)
+                )
+            return
+
+        if file_path != self._get_page_file_path(self._current_page_number):
+            return
+        if image.isNull() and self._tiled_image_item is not None:
+            # Large pages are not decoded whole, the tiled item shows them.
+            return
+        self._show_image(image)
+
+    def _remove_tiled_image_item(self) -> None:
+        if self._tiled_image_item is not None:
+            self._scene.removeItem(self._tiled_image_item)
+            self._tiled_image_item.deleteLater()
+            self._tiled_image_item = None
+
+    def _show_tiled_image(self, file_path: str, image_size: qtc.QSize) -> None:
+        self._remove_tiled_image_item()
+        self._pixmap_item.setPixmap(qtg.QPixmap())
+        self._tiled_image_item = TiledImageItem(
+            file_path, image_size, self._page_cache.thread_pool
+        )
+        self._scene.addItem(self._tiled_image_item)
+        self.setSceneRect(0, 0, image_size.width(), image_size.height())
+
+    def _show_image(self, image: qtg.QImage) -> None:
+        self._remove_tiled_image_item()
+        new_pixmap = qtg.QPixmap.fromImage(image)
+        self._pixmap_item.setPixmap(new_pixmap)
+        self.setSceneRect(0, 0, new_pixmap.width(), new_pixmap.height())
 
     def _zoom_in(self, cursor_hover: Optional[qtc.QPoint] = None) -> None:
         self.scale(self._ZOOM_IN_FACTOR, self._ZOOM_IN_FACTOR)
+        self._update_continuous_pages()
 
     def _zoom_out(self, cursor_hover: Optional[qtc.QPoint] = None) -> None:
         self.scale(self._ZOOM_OUT_FACTOR, self._ZOOM_OUT_FACTOR)
+        self._update_continuous_pages()
 
     def _fit_in_view(self):
-        self.fitInView(self._pixmap_item, qtc.Qt.AspectRatioMode.KeepAspectRatio)
+        if self._continuous and self._continuous_page_items:
+            item = self._continuous_page_items[self._current_page_number - 1]
+        else:
+            item = self._tiled_image_item or self._pixmap_item
+        self.fitInView(item, qtc.Qt.AspectRatioMode.KeepAspectRatio)
+        self._update_continuous_pages()
 
     def contextMenuEvent(self, event: qtg.QContextMenuEvent):
         menu = qtw.QMenu(self)
@@ -88,10 +302,28 @@ class Viewer(qtw.QGraphicsView):
             "&Copy image",
             self._action_copy_image
         )
+        continuous_action = menu.addAction(
+            "Co&ntinuous scroll",
+            self._set_continuous
+        )
+        continuous_action.setCheckable(True)
+        continuous_action.setChecked(self._continuous)
 
         menu.popup(event.globalPos())
 
     def _action_copy_image(self):
+        if self._continuous and self._continuous_page_items:
+            qtg.QGuiApplication.clipboard().setImage(
+                qtg.QImage(
+                    self._continuous_page_items[self._current_page_number - 1].file_path
+                )
+            )
+            return
+        if self._tiled_image_item is not None:
+            qtg.QGuiApplication.clipboard().setImage(
+                qtg.QImage(self._tiled_image_item.file_path)
+            )
+            return
         qtg.QGuiApplication.clipboard().setPixmap(self._pixmap_item.pixmap())
 
     def keyPressEvent(self, event: qtg.QKeyEvent) -> None:
@@ -103,6 +335,11 @@ class Viewer(qtw.QGraphicsView):
         if event.key() == qtc.Qt.Key.Key_F:
             self._fit_in_view()
 
+        if event.key() == qtc.Qt.Key.Key_C:
+            self._set_continuous(not self._continuous)
+            event.accept()
+            return
+
         if (
             event.key() == qtc.Qt.Key.Key_Minus
             or event.key() == qtc.Qt.Key.Key_Underscore
@@ -148,6 +385,10 @@ class Viewer(qtw.QGraphicsView):
         super().keyPressEvent(event)
         return
 
+    def resizeEvent(self, event: qtg.QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._update_continuous_pages()
+
     def wheelEvent(self, event: qtg.QWheelEvent) -> None:
         if event.modifiers() & qtc.Qt.Modifier.CTRL:
             x = event.angleDelta().x()
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+
+from library_of_h.viewer.constants import (PAGE_CACHE_MAX_BYTES,
+                                           PAGE_DECODE_THREADS,
+                                           PREFETCH_PAGE_PRIORITY)
+from library_of_h.viewer.workers.decode_page import DecodePageWorker
+
+
+class PageCache(qtc.QObject):
+    """
+    Decodes gallery pages into `QImage`s on a dedicated thread pool and keeps
+    them in a least recently used cache bounded by `PAGE_CACHE_MAX_BYTES` of
+    decoded image data.
+    """
+
+    page_decoded_signal = qtc.Signal(str, qtg.QImage)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._images: OrderedDict[str, qtg.QImage] = OrderedDict()
+        self._size_in_bytes = 0
+        # Runnables and priorities of the pages being decoded.
+        self._pending: dict[str, tuple[qtc.QRunnable, int]] = {}
+        # Runnables by worker, kept until the worker reports, also across a
+        # `clear`, as they are not deleted by the thread pool.
+        self._runnables: dict[DecodePageWorker, qtc.QRunnable] = {}
+        # Incremented on `clear`, pages decoded for a previous gallery are
+        # discarded.
+        self._generation = 0
+
+        self._thread_pool = qtc.QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(PAGE_DECODE_THREADS)
+
+    @property
+    def thread_pool(self) -> qtc.QThreadPool:
+        return self._thread_pool
+
+    def _evict(self, keep: str) -> None:
+        for file_path in tuple(self._images):
+            if self._size_in_bytes <= PAGE_CACHE_MAX_BYTES:
+                return
+            if file_path == keep:
+                continue
+            self._size_in_bytes -= self._images.pop(file_path).sizeInBytes()
+
+    def clear(self) -> None:
+        self._generation += 1
+        for worker, runnable in tuple(self._runnables.items()):
+            if self._thread_pool.tryTake(runnable):
+                del self._runnables[worker]
+                worker.deleteLater()
+        self._thread_pool.clear()
+        self._images.clear()
+        self._size_in_bytes = 0
+        self._pending.clear()
+
+    def get(self, file_path: str) -> Optional[qtg.QImage]:
+        """
+        Returns the decoded image of `file_path` if it is in the cache, marking it
+        as the most recently used, None otherwise.
+        """
+        image = self._images.get(file_path)
+        if image is not None:
+            self._images.move_to_end(file_path)
+        return image
+
+    def request(self, file_path: str, priority: int = PREFETCH_PAGE_PRIORITY) -> None:
+        """
+        Starts decoding `file_path` in the background unless it is already
+        decoded or being decoded, in which case its decoding is moved up if
+        `priority` is higher and it did not start yet. `page_decoded_signal` is
+        emitted when done.
+        """
+        if file_path in self._images:
+            return
+
+        if file_path in self._pending:
+            runnable, pending_priority = self._pending[file_path]
+            # A prefetched page that became the current one.
+            if priority > pending_priority and self._thread_pool.tryTake(runnable):
+                self._pending[file_path] = (runnable, priority)
+                self._thread_pool.start(runnable, priority)
+            return
+
+        worker = DecodePageWorker(
+            parent=self, generation=self._generation, file_path=file_path
+        )
+        worker.page_decoded_signal.connect(self._page_decoded_slot)
+        runnable = qtc.QRunnable.create(worker.decode_page)
+        runnable.setAutoDelete(False)
+        self._runnables[worker] = runnable
+        self._pending[file_path] = (runnable, priority)
+        self._thread_pool.start(runnable, priority)
+
+    def _page_decoded_slot(self, generation: int, file_path: str, image: qtg.QImage):
+        del self._runnables[self.sender()]
+        self.sender().deleteLater()
+        if generation != self._generation:
+            return
+
+        del self._pending[file_path]
+        if not image.isNull():
+            self._images[file_path] = image
+            self._size_in_bytes += image.sizeInBytes()
+            self._evict(keep=file_path)
+
+        self.page_decoded_signal.emit(file_path, image)
@@ -0,0 +1,237 @@
+import math
+from collections import OrderedDict
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+from PySide6 import QtWidgets as qtw
+
+from library_of_h.viewer.constants import (TILE_CACHE_MAX_BYTES, TILE_SIZE,
+                                           TILED_IMAGE_PREVIEW_MAX_PIXELS)
+from library_of_h.viewer.workers.decode_page import DecodePageWorker
+from library_of_h.viewer.workers.decode_tiles import DecodeTilesWorker
+
+
+class TiledImageItem(qtw.QGraphicsObject):
+    """
+    Graphics item for images too large to be decoded whole.
+
+    A low resolution preview is decoded first and drawn under everything. Only
+    the tiles intersecting the exposed area are decoded, at the power of two
+    downscale level closest to the current zoom, on `thread_pool`. Decoded tiles
+    are kept in a least recently used cache bounded by `TILE_CACHE_MAX_BYTES`.
+
+    Formats that can't decode a region, like PNG and WebP, would be decoded whole
+    for every batch of tiles. Their image is instead decoded once per level and
+    cut into bands of whole rows, which are cached and drawn like tiles.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        image_size: qtc.QSize,
+        thread_pool: qtc.QThreadPool,
+        parent: Optional[qtw.QGraphicsItem] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.setFlag(
+            qtw.QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True
+        )
+
+        self._file_path = file_path
+        self._image_size = image_size
+        self._thread_pool = thread_pool
+        self._bands = not qtg.QImageReader(file_path).supportsOption(
+            qtg.QImageIOHandler.ImageOption.ClipRect
+        )
+
+        self._tiles: OrderedDict[tuple[int, int, int], qtg.QImage] = OrderedDict()
+        self._tiles_size_in_bytes = 0
+        self._pending_tiles: set[tuple[int, int, int]] = set()
+        # Not requested again, the preview is drawn instead.
+        self._failed_tiles: set[tuple[int, int, int]] = set()
+        # Incremented on `clear`, tiles decoded before are discarded.
+        self._generation = 0
+        # The workers have no parent so that removing the item from the scene
+        # while they are running doesn't delete them from under their thread.
+        self._workers: set[qtc.QObject] = set()
+
+        self._preview: Optional[qtg.QImage] = None
+        self._preview_scale = min(
+            1,
+            math.sqrt(
+                TILED_IMAGE_PREVIEW_MAX_PIXELS
+                / max(1, image_size.width() * image_size.height())
+            ),
+        )
+        worker = DecodePageWorker(
+            parent=None,
+            generation=self._generation,
+            file_path=file_path,
+            scaled_size=qtc.QSize(
+                max(1, round(image_size.width() * self._preview_scale)),
+                max(1, round(image_size.height() * self._preview_scale)),
+            ),
+        )
+        worker.page_decoded_signal.connect(self._preview_decoded_slot)
+        self._workers.add(worker)
+        self._thread_pool.start(worker.decode_page)
+
+    # <PARENT OVERRIDES>
+    def boundingRect(self) -> qtc.QRectF:
+        return qtc.QRectF(0, 0, self._image_size.width(), self._image_size.height())
+
+    def paint(
+        self,
+        painter: qtg.QPainter,
+        option: qtw.QStyleOptionGraphicsItem,
+        widget: Optional[qtw.QWidget] = None,
+    ) -> None:
+        exposed_rect = option.exposedRect.intersected(self.boundingRect())
+        if exposed_rect.isEmpty():
+            return
+
+        if self._preview is not None:
+            painter.drawImage(
+                exposed_rect,
+                self._preview,
+                qtc.QRectF(
+                    exposed_rect.topLeft() * self._preview_scale,
+                    exposed_rect.size() * self._preview_scale,
+                ),
+            )
+
+        level_of_detail = option.levelOfDetailFromTransform(painter.worldTransform())
+        if level_of_detail <= self._preview_scale:
+            # The preview is detailed enough at this zoom.
+            return
+
+        level = 2 ** max(0, math.floor(math.log2(1 / level_of_detail)))
+        source_tile_size = TILE_SIZE * level
+        visible_tiles = set()
+        missing_tiles = []
+        for row in range(
+            math.floor(exposed_rect.top() / source_tile_size),
+            math.ceil(exposed_rect.bottom() / source_tile_size),
+        ):
+            for column in (
+                range(1)
+                if self._bands
+                else range(
+                    math.floor(exposed_rect.left() / source_tile_size),
+                    math.ceil(exposed_rect.right() / source_tile_size),
+                )
+            ):
+                key = (level, column, row)
+                visible_tiles.add(key)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    if key not in self._pending_tiles and key not in self._failed_tiles:
+                        missing_tiles.append((column, row))
+                    continue
+
+                self._tiles.move_to_end(key)
+                painter.drawImage(
+                    qtc.QRectF(
+                        column * source_tile_size,
+                        row * source_tile_size,
+                        tile.width() * level,
+                        tile.height() * level,
+                    ),
+                    tile,
+                )
+
+        if missing_tiles:
+            self._request_tiles(level, missing_tiles)
+        self._evict(keep=visible_tiles)
+
+    # </PARENT OVERRIDES>
+
+    # <PRIVATE METHODS>
+    def _evict(self, keep: set[tuple[int, int, int]]) -> None:
+        for key in tuple(self._tiles):
+            if self._tiles_size_in_bytes <= TILE_CACHE_MAX_BYTES:
+                return
+            if key in keep:
+                continue
+            self._tiles_size_in_bytes -= self._tiles.pop(key).sizeInBytes()
+
+    def _request_tiles(self, level: int, tiles: list[tuple[int, int]]) -> None:
+        if self._bands:
+            # The whole image is decoded anyway, every band of the level not
+            # cached is, the ones nearest to the missing ones last so that they
+            # are evicted last.
+            missing_rows = [row for _, row in tiles]
+            tiles = sorted(
+                (
+                    (0, row)
+                    for row in range(
+                        math.ceil(self._image_size.height() / (TILE_SIZE * level))
+                    )
+                    if (level, 0, row) not in self._tiles
+                    and (level, 0, row) not in self._pending_tiles
+                ),
+                key=lambda tile: -min(abs(tile[1] - row) for row in missing_rows),
+            )
+        self._pending_tiles.update((level, column, row) for column, row in tiles)
+        worker = DecodeTilesWorker(
+            parent=None,
+            generation=self._generation,
+            file_path=self._file_path,
+            level=level,
+            tile_size=TILE_SIZE,
+            tiles=tiles,
+            bands=self._bands,
+        )
+        worker.tiles_decoded_signal.connect(self._tiles_decoded_slot)
+        self._workers.add(worker)
+        self._thread_pool.start(worker.decode_tiles)
+
+    # </PRIVATE METHODS>
+
+    # <PUBLIC METHODS>
+    def clear(self) -> None:
+        """Drops all decoded tiles, keeping the preview."""
+        self._generation += 1
+        self._tiles.clear()
+        self._tiles_size_in_bytes = 0
+        self._pending_tiles.clear()
+        self._failed_tiles.clear()
+
+    # </PUBLIC METHODS>
+
+    # <PROPERTIES>
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    # </PROPERTIES>
+
+    # <SLOTS>
+    def _preview_decoded_slot(self, generation: int, file_path: str, image: qtg.QImage):
+        self._workers.discard(self.sender())
+        if image.isNull():
+            return
+        self._preview = image
+        self.update()
+
+    def _tiles_decoded_slot(
+        self,
+        generation: int,
+        level: int,
+        tiles: list[tuple[tuple[int, int, int], qtg.QImage]],
+    ):
+        self._workers.discard(self.sender())
+        if generation != self._generation:
+            return
+
+        for key, tile in tiles:
+            self._pending_tiles.discard(key)
+            if tile.isNull():
+                self._failed_tiles.add(key)
+                continue
+            self._tiles[key] = tile
+            self._tiles_size_in_bytes += tile.sizeInBytes()
+        self.update()
+
+    # </SLOTS>
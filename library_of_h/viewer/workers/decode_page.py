@@ -0,0 +1,68 @@
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+
+from library_of_h.viewer.constants import (TILED_IMAGE_MIN_PIXELS,
+                                           TILED_IMAGE_MIN_SIDE)
+
+
+def is_large_image(size: qtc.QSize) -> bool:
+    """Whether an image of `size` should be rendered in tiles."""
+    return (
+        size.width() * size.height() > TILED_IMAGE_MIN_PIXELS
+        or max(size.width(), size.height()) > TILED_IMAGE_MIN_SIDE
+    )
+
+
+class DecodePageWorker(qtc.QObject):
+
+    page_decoded_signal = qtc.Signal(int, str, qtg.QImage)
+
+    def __init__(
+        self,
+        parent: Optional[qtc.QObject],
+        generation: int,
+        file_path: str,
+        scaled_size: Optional[qtc.QSize] = None,
+    ):
+        """
+        Parameters
+        -----------
+            parent (Optional[qtc.QObject]):
+                Parent of the worker.
+            generation (int):
+                Generation of the cache requesting the page.
+            file_path (str):
+                Path of the image.
+            scaled_size (Optional[qtc.QSize]):
+                Size to decode the image at. If None, the image is decoded at its
+                full size, unless it is large enough to be rendered in tiles, in
+                which case a null image is emitted.
+        """
+        super().__init__(parent=parent)
+        self._generation = generation
+        self._file_path = file_path
+        self._scaled_size = scaled_size
+
+    def decode_page(self):
+        reader = qtg.QImageReader(self._file_path)
+        reader.setAutoTransform(True)
+        if self._scaled_size is not None:
+            reader.setScaledSize(self._scaled_size)
+        elif is_large_image(reader.size()):
+            self.page_decoded_signal.emit(
+                self._generation, self._file_path, qtg.QImage()
+            )
+            return
+
+        image = reader.read()
+        if not image.isNull():
+            # Convert to the format used by the paint engine so that the
+            # conversion to a `QPixmap` on the GUI thread is cheap.
+            image = image.convertToFormat(
+                qtg.QImage.Format.Format_ARGB32_Premultiplied
+                if image.hasAlphaChannel()
+                else qtg.QImage.Format.Format_RGB32
+            )
+        self.page_decoded_signal.emit(self._generation, self._file_path, image)
@@ -0,0 +1,122 @@
+from typing import Optional
+
+from PySide6 import QtCore as qtc
+from PySide6 import QtGui as qtg
+
+
+class DecodeTilesWorker(qtc.QObject):
+
+    # Emitted with the generation, the level and a list of
+    # ((level, column, row), tile) tuples, the tiles are null images if the
+    # region could not be read.
+    tiles_decoded_signal = qtc.Signal(int, int, object)
+
+    def __init__(
+        self,
+        parent: Optional[qtc.QObject],
+        generation: int,
+        file_path: str,
+        level: int,
+        tile_size: int,
+        tiles: list[tuple[int, int]],
+        bands: bool = False,
+    ):
+        """
+        Parameters
+        -----------
+            parent (Optional[qtc.QObject]):
+                Parent of the worker.
+            generation (int):
+                Generation of the item requesting the tiles.
+            file_path (str):
+                Path of the image.
+            level (int):
+                Downscale factor of the tiles, a tile covers `tile_size * level`
+                source pixels.
+            tile_size (int):
+                Side of a decoded tile in pixels.
+            tiles (list[tuple[int, int]]):
+                (column, row) of the tiles to decode.
+            bands (bool):
+                Whether the tiles are bands of whole rows, their column is 0. For
+                formats that can't decode a region, the whole image is decoded
+                and the bands are cut from it, in the order of `tiles`.
+        """
+        super().__init__(parent=parent)
+        self._generation = generation
+        self._file_path = file_path
+        self._level = level
+        self._tile_size = tile_size
+        self._tiles = tiles
+        self._bands = bands
+
+    def decode_tiles(self):
+        reader = qtg.QImageReader(self._file_path)
+        if self._bands:
+            self._decode_bands(reader)
+        else:
+            self._decode_region(reader)
+
+    def _decode_bands(self, reader: qtg.QImageReader) -> None:
+        image_size = reader.size()
+        reader.setScaledSize(
+            qtc.QSize(
+                max(1, round(image_size.width() / self._level)),
+                max(1, round(image_size.height() / self._level)),
+            )
+        )
+        image = reader.read()
+
+        tiles = []
+        for _, row in self._tiles:
+            if image.isNull():
+                band = qtg.QImage()
+            else:
+                band = image.copy(
+                    qtc.QRect(
+                        0, row * self._tile_size, image.width(), self._tile_size
+                    ).intersected(image.rect())
+                )
+            tiles.append(((self._level, 0, row), band))
+
+        self.tiles_decoded_signal.emit(self._generation, self._level, tiles)
+
+    def _decode_region(self, reader: qtg.QImageReader) -> None:
+        image_size = reader.size()
+        source_tile_size = self._tile_size * self._level
+
+        # Decode the rectangle covering all the requested tiles at once.
+        columns = [column for column, _ in self._tiles]
+        rows = [row for _, row in self._tiles]
+        clip_rect = qtc.QRect(
+            min(columns) * source_tile_size,
+            min(rows) * source_tile_size,
+            (max(columns) - min(columns) + 1) * source_tile_size,
+            (max(rows) - min(rows) + 1) * source_tile_size,
+        ).intersected(qtc.QRect(qtc.QPoint(0, 0), image_size))
+        reader.setClipRect(clip_rect)
+        reader.setScaledSize(
+            qtc.QSize(
+                max(1, round(clip_rect.width() / self._level)),
+                max(1, round(clip_rect.height() / self._level)),
+            )
+        )
+        region = reader.read()
+
+        tiles = []
+        region_origin = clip_rect.topLeft() / self._level
+        for column, row in self._tiles:
+            if region.isNull():
+                tile = qtg.QImage()
+            else:
+                tile = region.copy(
+                    qtc.QRect(
+                        column * self._tile_size - region_origin.x(),
+                        row * self._tile_size - region_origin.y(),
+                        self._tile_size,
+                        self._tile_size,
+                    ).intersected(region.rect())
+                )
+            tiles.append(((self._level, column, row), tile))
+
+        self.tiles_decoded_signal.emit(self._generation, self._level, tiles)